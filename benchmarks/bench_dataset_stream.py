@@ -0,0 +1,110 @@
+"""
+Dataset streaming benchmark: a large JSONL regression set through the experiment executor.
+
+Writes a synthetic JSONL dataset, then streams it through DatasetReader and
+ExperimentExecutor.stream with a cheap stand-in for the per-item work (a
+short sleep plus a content hash). Reports time to first result, throughput
+and peak RSS. The peak is taken while streaming and again after loading the
+same items whole, as json.load did before, to show the memory the stream
+avoids.
+
+Usage:
+    .venv/bin/python -m benchmarks.bench_dataset_stream
+    .venv/bin/python -m benchmarks.bench_dataset_stream --items 1000000 --workers 16
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import contextlib
+
+from src.dataset_loader import DatasetReader
+from src.experiment_runner import ExperimentExecutor
+from benchmarks.common import environment_info, peak_rss_mb, default_output_path, write_results
+
+
+def write_dataset(path: str, items: int) -> None:
+    with open(path, "w") as f:
+        for i in range(items):
+            f.write(json.dumps({
+                "topic": f"Regression topic {i}: edge inference latency under load",
+                "expected_sections": ["Executive Summary", "Introduction", "Key Findings", "Conclusion"],
+                "min_word_count": 500,
+                "expected_keywords": ["edge", "latency", "inference", f"case-{i}"],
+                "quality_threshold": 0.6,
+            }) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming JSONL dataset benchmark.")
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--work-ms", type=float, default=0.0, help="simulated per-item work")
+    parser.add_argument("--output", help="JSON result path (default benchmarks/results/dataset_stream-<commit>.json)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "dataset.jsonl")
+        write_dataset(path, args.items)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"  dataset: {args.items} items, {size_mb:.1f} MB", file=sys.stderr)
+        baseline_rss = peak_rss_mb()
+
+        def process(index, item, attempt):
+            if args.work_ms:
+                time.sleep(args.work_ms / 1000)
+            return hashlib.sha256(item["topic"].encode("utf-8")).hexdigest()[:8]
+
+        reader = DatasetReader(path)
+        executor = ExperimentExecutor(workers=args.workers)
+        start = time.perf_counter()
+        first_result_s = None
+        results = 0
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):  # per-item progress lines
+            for _ in executor.stream(reader, process, lambda i, item, e: None):
+                first_result_s = first_result_s or time.perf_counter() - start
+                results += 1
+        stream_s = time.perf_counter() - start
+        stream_rss = peak_rss_mb()
+
+        start = time.perf_counter()
+        with open(path, "r") as f:
+            loaded = [json.loads(line) for line in f]
+        load_s = time.perf_counter() - start
+        load_rss = peak_rss_mb()
+        del loaded
+
+    summary = {
+        "items": results,
+        "dataset_mb": size_mb,
+        "first_result_ms": (first_result_s or 0.0) * 1000,
+        "stream_s": stream_s,
+        "items_per_s": results / stream_s if stream_s else 0.0,
+        "stream_rss_growth_mb": stream_rss - baseline_rss,
+        "full_load_s": load_s,
+        "full_load_rss_growth_mb": load_rss - baseline_rss,
+    }
+
+    print(f"\n{'='*60}")
+    print(f"  DATASET STREAM — {args.items} items, {args.workers} workers")
+    print(f"{'='*60}")
+    print(f"  First result:  {summary['first_result_ms']:.1f} ms")
+    print(f"  Stream:        {summary['stream_s']:.1f}s ({summary['items_per_s']:.0f} items/s), "
+          f"peak RSS +{summary['stream_rss_growth_mb']:.1f} MB")
+    print(f"  Full load:     {summary['full_load_s']:.1f}s to parse, "
+          f"peak RSS +{summary['full_load_rss_growth_mb']:.1f} MB (before any result)")
+
+    write_results({
+        "benchmark": "dataset_stream",
+        "env": environment_info(),
+        "config": vars(args),
+        "summary": summary,
+    }, args.output or default_output_path("dataset_stream"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+LLM-judge benchmark: separate judge calls vs one combined structured-output call.
+
+Scores the same reports in both JUDGE_MODEs and reports, per mode, the
+prompt/completion tokens spent and the judge-stage wall time (separate
+judges run concurrently, as in run_eval_suite), plus how closely the
+combined verdicts agree with the separate ones on each criterion.
+
+Runs against the in-process stub LLM server by default (token and latency
+figures are meaningful, agreement is not: stub scores are random); pass
+--live to use the configured OpenAI endpoint for real agreement numbers.
+
+Usage:
+    .venv/bin/python -m benchmarks.bench_judges
+    .venv/bin/python -m benchmarks.bench_judges --reports 20 --latency-ms 800
+    .venv/bin/python -m benchmarks.bench_judges --live --reports 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from typing import List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.metrics import percentile
+from benchmarks.bench_tools import synthetic_text
+from benchmarks.common import (
+    environment_info,
+    default_output_path,
+    write_results,
+    load_results,
+    format_delta,
+)
+
+MODES = ("separate", "combined")
+
+
+class TokenCounter(BaseCallbackHandler):
+    """Sums prompt and completion tokens over every LLM call it sees."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.completion_tokens += usage.get("completion_tokens", 0)
+
+
+def _configure_backend(args: argparse.Namespace):
+    # Must run before src.evals is imported: the judge model and cache are built at import time
+    os.environ["LLM_CACHE"] = "off"
+    if args.live:
+        return None
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    from src.stub_llm_server import StubConfig, start_stub_server
+    server = start_stub_server(StubConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        ms_per_token=args.ms_per_token,
+        seed=args.seed,
+    ))
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    return server
+
+
+def _judge(evals, counter: TokenCounter, mode: str, report: str, research: str) -> dict:
+    counter.reset()
+    start = time.perf_counter()
+    results = evals.start_llm_judges(report, research, mode=mode)()
+    return {
+        "wall_s": time.perf_counter() - start,
+        "calls": counter.calls,
+        "prompt_tokens": counter.prompt_tokens,
+        "completion_tokens": counter.completion_tokens,
+        "scores": {name: r["score"] for name, r in results.items()},
+        "failed": sorted(name for name, r in results.items() if r["reason"].startswith("Failed")),
+    }
+
+
+def _summarize(runs: List[dict], criteria: List[str]) -> dict:
+    summary = {}
+    for mode in MODES:
+        rows = [r[mode] for r in runs]
+        walls = [row["wall_s"] for row in rows]
+        summary[mode] = {
+            "p50_wall_s": percentile(walls, 50),
+            "p95_wall_s": percentile(walls, 95),
+            "mean_calls": sum(row["calls"] for row in rows) / len(rows),
+            "mean_prompt_tokens": sum(row["prompt_tokens"] for row in rows) / len(rows),
+            "mean_completion_tokens": sum(row["completion_tokens"] for row in rows) / len(rows),
+            "failures": sum(len(row["failed"]) for row in rows),
+        }
+
+    # Agreement on the 1-10 scale, over reports where both modes produced a verdict
+    agreement = {}
+    for name in criteria:
+        diffs = [
+            abs(r["separate"]["scores"][name] - r["combined"]["scores"][name]) * 10
+            for r in runs
+            if name not in r["separate"]["failed"] and name not in r["combined"]["failed"]
+        ]
+        agreement[name] = {
+            "compared": len(diffs),
+            "mean_abs_diff": sum(diffs) / len(diffs) if diffs else None,
+            "within_1": sum(1 for d in diffs if d <= 1.0 + 1e-9) / len(diffs) if diffs else None,
+        }
+    summary["agreement"] = agreement
+    return summary
+
+
+def _print_report(summary: dict, baseline: Optional[dict]) -> None:
+    base = (baseline or {}).get("summary", {})
+    print(f"\n{'='*78}")
+    print("  LLM JUDGES — separate calls vs combined structured output (per report)")
+    print(f"{'='*78}")
+    print(f"  {'mode':<10}{'calls':>7}{'prompt tok':>12}{'compl tok':>11}{'p50 wall':>11}{'p95 wall':>11}{'failed':>8}")
+    for mode in MODES:
+        s = summary[mode]
+        line = (f"  {mode:<10}{s['mean_calls']:>7.1f}{s['mean_prompt_tokens']:>12.0f}{s['mean_completion_tokens']:>11.0f}"
+                f"{s['p50_wall_s']:>10.3f}s{s['p95_wall_s']:>10.3f}s{s['failures']:>8}")
+        if mode in base:
+            line += f"   p50 {format_delta(s['p50_wall_s'], base[mode]['p50_wall_s'])}"
+        print(line)
+
+    sep, comb = summary["separate"], summary["combined"]
+    sep_tokens = sep["mean_prompt_tokens"] + sep["mean_completion_tokens"]
+    comb_tokens = comb["mean_prompt_tokens"] + comb["mean_completion_tokens"]
+    if sep_tokens:
+        print(f"\n  Tokens:     combined uses {comb_tokens / sep_tokens:.0%} of separate "
+              f"({sep_tokens - comb_tokens:.0f} tokens saved per report)")
+    print("  Agreement:  " + ", ".join(
+        f"{name} {a['mean_abs_diff']:.2f} mean |Δ|, {a['within_1']:.0%} within ±1"
+        if a["compared"] else f"{name} n/a"
+        for name, a in summary["agreement"].items()
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Separate vs combined LLM-judge benchmark.")
+    parser.add_argument("--reports", type=int, default=10, help="reports scored in each mode")
+    parser.add_argument("--report-chars", type=int, default=4000)
+    parser.add_argument("--live", action="store_true", help="use the configured OpenAI endpoint instead of the stub")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="stub median latency per call")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="stub lognormal latency spread")
+    parser.add_argument("--ms-per-token", type=float, default=10.0, help="stub latency per completion token")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON result path (default benchmarks/results/judges-<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="previous result JSON to print deltas against")
+    args = parser.parse_args()
+
+    server = _configure_backend(args)
+    from src import evals
+
+    counter = TokenCounter()
+    evals.llm_judge.callbacks = [counter]
+
+    runs = []
+    for i in range(args.reports):
+        report = synthetic_text(args.report_chars, seed=args.seed + i)
+        research = synthetic_text(2000, seed=args.seed + 10_000 + i)
+        order = MODES if i % 2 == 0 else MODES[::-1]  # alternate so neither mode always goes first
+        run = {mode: _judge(evals, counter, mode, report, research) for mode in order}
+        runs.append(run)
+        print(f"  report {i + 1}/{args.reports}: separate {run['separate']['wall_s']:.3f}s, "
+              f"combined {run['combined']['wall_s']:.3f}s", file=sys.stderr)
+    if server:
+        server.shutdown()
+
+    summary = _summarize(runs, list(evals.COMBINED_CRITERIA))
+    baseline = load_results(args.compare) if args.compare else None
+    _print_report(summary, baseline)
+    write_results({
+        "benchmark": "judges",
+        "env": environment_info(),
+        "config": {**vars(args), "backend": "live" if args.live else "stub"},
+        "summary": summary,
+        "runs": runs,
+    }, args.output or default_output_path("judges"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+End-to-end pipeline benchmark.
+
+Runs the compiled LangGraph app from src/graph.py over N topics against the
+in-process stub LLM server (default) or a replayed cassette, and reports per
+node wall time split into LLM time, tool time and in-node Python, plus graph
+overhead (checkpointing, routing, scheduling), feedback-loop counts and peak
+memory. Results are written as JSON so commits can be compared.
+
+Usage:
+    .venv/bin/python -m benchmarks.bench_pipeline --topics 6
+    .venv/bin/python -m benchmarks.bench_pipeline --latency-ms 300 --reject-rate 0.3
+    .venv/bin/python -m benchmarks.bench_pipeline --replay cassettes/default.jsonl
+    .venv/bin/python -m benchmarks.bench_pipeline --compare benchmarks/results/pipeline-abc1234.json
+"""
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from benchmarks.common import (
+    environment_info,
+    peak_rss_mb,
+    default_output_path,
+    write_results,
+    load_results,
+    format_delta,
+)
+
+TOPICS = [
+    "Future of Edge Computing in 2026",
+    "Quantum Machine Learning: Promise vs Reality in 2026",
+    "Global AI Regulation Landscape in 2026",
+]
+
+
+class NodeTimer(BaseCallbackHandler):
+    """
+    Collects per-node wall time plus the LLM and tool time nested inside each node.
+
+    LangGraph tags every run inside a task with `metadata["langgraph_node"]`;
+    the node's own chain run is the one whose name matches that tag.
+    """
+
+    run_inline = True  # time callbacks on the calling thread, also under ainvoke
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open: Dict[object, Tuple[str, str, float]] = {}
+        self.node_wall: Dict[str, float] = defaultdict(float)
+        self.node_calls: Dict[str, int] = defaultdict(int)
+        self.llm_time: Dict[str, float] = defaultdict(float)
+        self.llm_calls: Dict[str, int] = defaultdict(int)
+        self.tool_time: Dict[str, float] = defaultdict(float)
+        self.tool_calls: Dict[str, int] = defaultdict(int)
+        self.intervals: List[Tuple[float, float]] = []
+
+    def _start(self, run_id, kind: str, metadata: Optional[dict]) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node:
+            with self._lock:
+                self._open[run_id] = (kind, node, time.perf_counter())
+
+    def _end(self, run_id) -> None:
+        end = time.perf_counter()
+        with self._lock:
+            opened = self._open.pop(run_id, None)
+            if opened is None:
+                return
+            kind, node, start = opened
+            if kind == "node":
+                self.node_wall[node] += end - start
+                self.node_calls[node] += 1
+                self.intervals.append((start, end))
+            elif kind == "llm":
+                self.llm_time[node] += end - start
+                self.llm_calls[node] += 1
+            else:
+                self.tool_time[node] += end - start
+                self.tool_calls[node] += 1
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        if kwargs.get("name") == (metadata or {}).get("langgraph_node"):
+            self._start(run_id, "node", metadata)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, "llm", metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, "llm", metadata)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, "tool", metadata)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def busy_time(self) -> float:
+        """Wall time covered by at least one node (parallel branches counted once)."""
+        total, cursor = 0.0, float("-inf")
+        for start, end in sorted(self.intervals):
+            if end <= cursor:
+                continue
+            total += end - max(start, cursor)
+            cursor = end
+        return total
+
+    def node_breakdown(self) -> Dict[str, Dict[str, float]]:
+        breakdown = {}
+        for node in sorted(self.node_wall):
+            wall = self.node_wall[node]
+            llm, tool = self.llm_time[node], self.tool_time[node]
+            breakdown[node] = {
+                "calls": self.node_calls[node],
+                "wall_s": wall,
+                "llm_s": llm,
+                "llm_calls": self.llm_calls[node],
+                "tool_s": tool,
+                "tool_calls": self.tool_calls[node],
+                "python_s": max(wall - llm - tool, 0.0),
+            }
+        return breakdown
+
+
+# ─── Backend setup ───────────────────────────────────────────
+# Must run before src.graph is imported: the ChatOpenAI clients, the response
+# cache and the checkpointer are all built at import time from env vars.
+
+def _configure_backend(args: argparse.Namespace, workdir: str):
+    os.environ["LLM_CACHE"] = "off"
+    os.environ["CHECKPOINT_DB"] = os.path.join(workdir, "checkpoints.sqlite")
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    if args.replay:
+        from src.cassette import activate
+        return None, activate("replay", args.replay)
+
+    from src.stub_llm_server import StubConfig, start_stub_server
+    server = start_stub_server(StubConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        reject_rate=args.reject_rate,
+        seed=args.seed,
+    ))
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    return server, None
+
+
+# ─── Runs ────────────────────────────────────────────────────
+
+def _run_topic(app, initial_state, thread_config, task: str, use_async: bool, quiet: bool) -> dict:
+    timer = NodeTimer()
+    config = {"callbacks": [timer], **thread_config(uuid.uuid4().hex)}
+    sink = open(os.devnull, "w") if quiet else None
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+        if use_async:
+            result = asyncio.run(app.ainvoke(initial_state(task), config))
+        else:
+            result = app.invoke(initial_state(task), config)
+    wall = time.perf_counter() - start
+    if sink:
+        sink.close()
+
+    from src.metrics import loop_counts, tool_time_saved
+    nodes = timer.node_breakdown()
+    iteration_log = result.get("iteration_log", [])
+    return {
+        "topic": task,
+        "wall_s": wall,
+        "node_wall_s": sum(n["wall_s"] for n in nodes.values()),
+        "llm_s": sum(n["llm_s"] for n in nodes.values()),
+        "tool_s": sum(n["tool_s"] for n in nodes.values()),
+        "tool_saved_s": tool_time_saved(result.get("tool_timings", []))["saved_s"],
+        "graph_overhead_s": max(wall - timer.busy_time(), 0.0),
+        "loops": loop_counts(iteration_log),
+        "steps": len(iteration_log),
+        "nodes": nodes,
+    }
+
+
+def _aggregate(runs: List[dict]) -> dict:
+    from src.metrics import percentile
+    nodes: Dict[str, Dict[str, float]] = {}
+    for run in runs:
+        for name, stats in run["nodes"].items():
+            agg = nodes.setdefault(name, {key: 0 for key in stats})
+            for key, value in stats.items():
+                agg[key] += value
+
+    n = len(runs)
+    walls = [r["wall_s"] for r in runs]
+    return {
+        "runs": n,
+        "mean_wall_s": sum(walls) / n,
+        "p50_wall_s": percentile(walls, 50),
+        "p95_wall_s": percentile(walls, 95),
+        "mean_llm_s": sum(r["llm_s"] for r in runs) / n,
+        "mean_tool_s": sum(r["tool_s"] for r in runs) / n,
+        "mean_tool_saved_s": sum(r["tool_saved_s"] for r in runs) / n,
+        "mean_graph_overhead_s": sum(r["graph_overhead_s"] for r in runs) / n,
+        "loops": {
+            gate: sum(r["loops"][gate] for r in runs) for gate in runs[0]["loops"]
+        },
+        "nodes": {
+            name: {key: value / n for key, value in stats.items()} for name, stats in nodes.items()
+        },
+    }
+
+
+def _print_report(summary: dict, memory: dict, baseline: Optional[dict]) -> None:
+    base_nodes = (baseline or {}).get("summary", {}).get("nodes", {})
+
+    print(f"\n{'='*78}")
+    print(f"  PIPELINE BENCHMARK — {summary['runs']} runs (per-run means)")
+    print(f"{'='*78}")
+    header = f"  {'node':<22}{'calls':>6}{'wall':>9}{'llm':>9}{'tool':>9}{'python':>9}"
+    print(header + ("   vs base" if baseline else ""))
+    for name, stats in summary["nodes"].items():
+        line = (
+            f"  {name:<22}{stats['calls']:>6.1f}{stats['wall_s']:>8.3f}s{stats['llm_s']:>8.3f}s"
+            f"{stats['tool_s']:>8.3f}s{stats['python_s']:>8.3f}s"
+        )
+        if name in base_nodes:
+            line += f"   {format_delta(stats['wall_s'], base_nodes[name]['wall_s'])}"
+        print(line)
+
+    print(f"\n  Wall:            p50 {summary['p50_wall_s']:.3f}s | p95 {summary['p95_wall_s']:.3f}s | mean {summary['mean_wall_s']:.3f}s")
+    print(f"  LLM / tool:      {summary['mean_llm_s']:.3f}s / {summary['mean_tool_s']:.3f}s per run "
+          f"({summary['mean_tool_saved_s']:.3f}s saved by concurrent tool calls)")
+    print(f"  Graph overhead:  {summary['mean_graph_overhead_s']:.3f}s per run (checkpointing, routing, scheduling)")
+    print(f"  Loops:           " + ", ".join(f"{gate} {count}" for gate, count in summary["loops"].items()))
+    print(f"  Peak memory:     {memory['peak_rss_mb']:.1f} MB RSS"
+          + (f", {memory['tracemalloc_peak_mb']:.1f} MB Python heap" if memory.get("tracemalloc_peak_mb") is not None else ""))
+
+    if baseline:
+        base = baseline["summary"]
+        print(f"\n  vs {baseline['env'].get('commit')}: "
+              f"wall {format_delta(summary['mean_wall_s'], base['mean_wall_s'])}, "
+              f"graph overhead {format_delta(summary['mean_graph_overhead_s'], base['mean_graph_overhead_s'])}, "
+              f"tool {format_delta(summary['mean_tool_s'], base['mean_tool_s'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with per-node timings.")
+    parser.add_argument("--topics", type=int, default=len(TOPICS), help="number of runs (topics are cycled)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before measuring")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="drive the graph with ainvoke")
+    parser.add_argument("--replay", metavar="CASSETTE", help="replay a recorded cassette instead of the stub server")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stub LLM median latency (0 isolates orchestration cost)")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="stub LLM lognormal latency spread")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="stub reviewer reject rate, exercises feedback loops")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="also track the Python heap peak (slows the run)")
+    parser.add_argument("--output", help="JSON result path (default benchmarks/results/pipeline-<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="previous result JSON to print deltas against")
+    parser.add_argument("--verbose", action="store_true", help="keep the agents' console output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server, _ = _configure_backend(args, workdir)
+
+        from src.graph import app
+        from src.states import initial_state
+        from src.checkpoint import thread_config
+
+        tasks = [TOPICS[i % len(TOPICS)] for i in range(args.warmup + args.topics)]
+        for task in tasks[:args.warmup]:
+            _run_topic(app, initial_state, thread_config, task, args.use_async, not args.verbose)
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        runs = []
+        for i, task in enumerate(tasks[args.warmup:]):
+            run = _run_topic(app, initial_state, thread_config, task, args.use_async, not args.verbose)
+            print(f"  run {i + 1}/{args.topics}: {run['wall_s']:.3f}s  {task}", file=sys.stderr)
+            runs.append(run)
+
+        memory = {"peak_rss_mb": peak_rss_mb(), "tracemalloc_peak_mb": None}
+        if args.tracemalloc:
+            memory["tracemalloc_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        if server:
+            server.shutdown()
+
+    results = {
+        "benchmark": "pipeline",
+        "env": environment_info(),
+        "config": {
+            "topics": args.topics,
+            "warmup": args.warmup,
+            "async": args.use_async,
+            "backend": f"replay:{args.replay}" if args.replay else "stub",
+            "latency_ms": args.latency_ms,
+            "latency_sigma": args.latency_sigma,
+            "reject_rate": args.reject_rate,
+            "seed": args.seed,
+        },
+        "memory": memory,
+        "summary": _aggregate(runs),
+        "runs": runs,
+    }
+    baseline = load_results(args.compare) if args.compare else None
+    _print_report(results["summary"], memory, baseline)
+    write_results(results, args.output or default_output_path("pipeline"))
+
+
+if __name__ == "__main__":
+    main()
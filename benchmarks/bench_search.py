@@ -0,0 +1,130 @@
+"""
+Search index benchmark: BM25 over a synthetic corpus of 100k+ documents.
+
+Generates a JSONL corpus with a Zipf-distributed vocabulary (so common terms
+have long posting lists, like real text), then reports index build time,
+cold open time, and query latency percentiles for search_tool-style queries.
+
+Usage:
+    .venv/bin/python -m benchmarks.bench_search
+    .venv/bin/python -m benchmarks.bench_search --docs 500000 --queries 500
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import argparse
+import tempfile
+
+from src.search_index import SearchIndex, build_index
+from src.metrics import percentile
+from benchmarks.common import environment_info, peak_rss_mb, default_output_path, write_results
+
+_TOPIC_WORDS = [
+    "edge", "computing", "quantum", "machine", "learning", "regulation", "governance", "policy",
+    "latency", "security", "privacy", "cloud", "network", "hardware", "model", "market",
+    "growth", "energy", "compliance", "autonomous", "vehicle", "sensor", "inference", "training",
+]
+
+
+def _vocabulary(size: int, rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set(_TOPIC_WORDS)
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def write_corpus(path: str, docs: int, vocab_size: int, seed: int):
+    """Writes the corpus and returns its (vocabulary, cumulative Zipf weights) for drawing queries."""
+    rng = random.Random(seed)
+    vocab = _vocabulary(vocab_size, rng)
+    rng.shuffle(vocab)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocab))))  # Zipf, s = 1
+
+    with open(path, "w") as f:
+        for i in range(docs):
+            title = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(4, 9))).title()
+            snippet = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(20, 45))) + "."
+            f.write(json.dumps({"url": f"https://corpus.example.com/doc/{i}", "title": title, "snippet": snippet}) + "\n")
+    return vocab, cum_weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 search index benchmark.")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON result path (default benchmarks/results/search-<commit>.json)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = os.path.join(workdir, "corpus.jsonl")
+        index_dir = os.path.join(workdir, "index")
+
+        start = time.perf_counter()
+        vocab, cum_weights = write_corpus(corpus, args.docs, args.vocab, args.seed)
+        print(f"  corpus: {args.docs} docs, {os.path.getsize(corpus) / 1024 / 1024:.1f} MB "
+              f"({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+
+        start = time.perf_counter()
+        build_index(corpus, index_dir)
+        build_s = time.perf_counter() - start
+        index_mb = sum(os.path.getsize(os.path.join(index_dir, n)) for n in os.listdir(index_dir)) / 1024 / 1024
+
+        start = time.perf_counter()
+        index = SearchIndex.open(corpus, index_dir)
+        open_s = time.perf_counter() - start
+
+        # Topic words plus corpus terms drawn by frequency, so queries hit long posting lists too
+        rng = random.Random(args.seed + 1)
+        queries = [
+            " ".join(rng.sample(_TOPIC_WORDS, rng.randint(1, 4)) + rng.choices(vocab, cum_weights=cum_weights, k=2))
+            for _ in range(args.queries)
+        ]
+
+        latencies = []
+        first_results = None
+        for query in queries:
+            start = time.perf_counter()
+            results = index.search(query, k=args.k)
+            latencies.append(time.perf_counter() - start)
+            first_results = first_results or [r["url"] for _, r in results]
+        repeat = [r["url"] for _, r in index.search(queries[0], k=args.k)]
+
+    summary = {
+        "docs": args.docs,
+        "index_mb": index_mb,
+        "build_s": build_s,
+        "open_ms": open_s * 1000,
+        "p50_query_ms": percentile(latencies, 50) * 1000,
+        "p95_query_ms": percentile(latencies, 95) * 1000,
+        "max_query_ms": max(latencies) * 1000,
+        "deterministic": repeat == first_results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    print(f"\n{'='*60}")
+    print(f"  SEARCH INDEX — {args.docs} docs, {args.queries} queries")
+    print(f"{'='*60}")
+    print(f"  Build:     {summary['build_s']:.1f}s → {summary['index_mb']:.1f} MB on disk")
+    print(f"  Open:      {summary['open_ms']:.2f} ms (memory-mapped)")
+    print(f"  Query:     p50 {summary['p50_query_ms']:.2f} ms | p95 {summary['p95_query_ms']:.2f} ms | max {summary['max_query_ms']:.2f} ms")
+    print(f"  Stable:    {'yes' if summary['deterministic'] else 'NO'} (repeat query returns identical results)")
+    print(f"  Peak RSS:  {summary['peak_rss_mb']:.1f} MB")
+
+    write_results({
+        "benchmark": "search",
+        "env": environment_info(),
+        "config": vars(args),
+        "summary": summary,
+    }, args.output or default_output_path("search"))
+
+
+if __name__ == "__main__":
+    main()
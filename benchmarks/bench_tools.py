@@ -0,0 +1,250 @@
+"""
+Scaling microbenchmarks for the tools in src/tools.py.
+
+Runs each tool's underlying function on synthetic report-like text from 1 KB
+up to 10 MB and records throughput (MB/s), peak traced allocation and GC
+churn per call, plus the scaling exponent between successive sizes (1.0 is
+linear; anything well above it is a quadratic or per-word hot spot).
+
+CPython has no counter for total allocations, so allocation cost is reported
+as the tracemalloc peak during the call (and its ratio to the input size)
+together with the number of garbage collections the call triggered — each
+generation-0 collection corresponds to ~700 net container allocations.
+
+Usage:
+    .venv/bin/python -m benchmarks.bench_tools
+    .venv/bin/python -m benchmarks.bench_tools --tools readability_score_tool,plagiarism_check_tool --sizes 1K,1M
+    .venv/bin/python -m benchmarks.bench_tools --compare benchmarks/results/tools-abc1234.json
+"""
+
+import gc
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import statistics
+import tracemalloc
+import contextlib
+from typing import Callable, Dict, List, Optional
+
+from src import tools
+from src.text_profile import clear_profile_cache
+from src.tool_cache import clear_tool_cache
+from benchmarks.common import (
+    environment_info,
+    default_output_path,
+    write_results,
+    load_results,
+    format_delta,
+)
+
+MB = 1024 * 1024
+DEFAULT_SIZES = "1K,10K,100K,1M,10M"
+
+# Sentence pool for synthetic drafts: numbers, percentages, money, ranges and
+# sentiment words in roughly the proportions the Writer produces.
+_SENTENCES = [
+    "Edge computing is expected to process 75% of enterprise data by 2026.",
+    "The global market is projected to reach $150 billion by 2028, growing at a CAGR of 30%.",
+    "Security remains a serious challenge because devices are physically accessible.",
+    "Hybrid quantum-classical algorithms show a 100x speedup for specific optimization problems.",
+    "Error rates remain between 0.1-1% on current noisy hardware.",
+    "Regulators now require conformity assessments for high-risk systems.",
+    "This breakthrough could accelerate innovation and create new opportunity for robust products.",
+    "Fragmentation of hardware accelerators is a costly barrier to standardization.",
+    "Analysts describe the outlook as promising but warn of vendor risk.",
+    "Google's 72-qubit processor demonstrated quantum advantage on combinatorial problems.",
+    "Companies training models above 10^26 FLOPs must report to the government within 270 days.",
+    "Will latency improvements continue once 6G networks reach mass deployment?",
+    "Privacy concerns and energy use are growing as deployments scale!",
+    "The report concludes that careful pilots remain the most efficient path forward.",
+]
+
+
+def synthetic_text(size: int, seed: int) -> str:
+    """Report-like text of exactly `size` characters, with a cited URL every ~20 sentences."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        sentence = rng.choice(_SENTENCES)
+        if rng.random() < 0.05:
+            ref = rng.randrange(1000)
+            sentence += f" See https://source-{ref}.example.com/report/{ref} for details."
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[:size]
+
+
+def _text_args(arg: str) -> Callable[[int], dict]:
+    return lambda size: {arg: synthetic_text(size, seed=1)}
+
+
+# How to build a call of a given input size for each tool. Two-input tools get
+# two texts of that size drawn from the same pool, so they genuinely overlap.
+TOOL_INPUTS: Dict[str, Callable[[int], dict]] = {
+    "search_tool": _text_args("query"),
+    "scrape_tool": _text_args("url"),
+    "keyword_extraction_tool": _text_args("text"),
+    "word_count_tool": _text_args("text"),
+    "sentiment_analysis_tool": _text_args("text"),
+    "readability_score_tool": _text_args("text"),
+    "plagiarism_check_tool": lambda size: {
+        "draft": synthetic_text(size, seed=1),
+        "source_text": synthetic_text(size, seed=2),
+    },
+    "citation_formatter_tool": _text_args("text"),
+    "translation_quality_tool": lambda size: {
+        "original": synthetic_text(size, seed=1),
+        "translation": synthetic_text(size, seed=3),
+    },
+    "headline_generator_tool": _text_args("topic"),
+    "statistics_extractor_tool": _text_args("text"),
+    "text_summarizer_tool": _text_args("text"),
+}
+
+
+def parse_size(value: str) -> int:
+    units = {"K": 1024, "M": MB}
+    value = value.strip().upper().rstrip("B")
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    if size >= MB:
+        return f"{size / MB:g}MB"
+    return f"{size / 1024:g}KB"
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        yield
+
+
+def _time_call(func: Callable, kwargs: dict, repeat: int, min_time: float) -> List[float]:
+    """Times `func` at least once and repeats while the total stays under `min_time`."""
+    timings: List[float] = []
+    with _quiet():
+        while len(timings) < repeat:
+            clear_profile_cache()  # measure a cold analysis, not a memoized one
+            clear_tool_cache()
+            start = time.perf_counter()
+            func(**kwargs)
+            timings.append(time.perf_counter() - start)
+            if sum(timings) >= min_time:
+                break
+    return timings
+
+
+def _alloc_call(func: Callable, kwargs: dict) -> Dict[str, float]:
+    """Peak traced allocation and GC collections for one call."""
+    collections = [0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            collections[0] += 1
+
+    clear_profile_cache()
+    clear_tool_cache()
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        with _quiet():
+            func(**kwargs)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+    return {"peak_alloc_bytes": peak, "gc_collections": collections[0]}
+
+
+def bench_tool(name: str, sizes: List[int], repeat: int, min_time: float, budget: float) -> List[dict]:
+    func = getattr(tools, name).func
+    rows: List[dict] = []
+    for size in sizes:
+        kwargs = TOOL_INPUTS[name](size)
+        input_bytes = sum(len(v.encode("utf-8")) for v in kwargs.values())
+        timings = _time_call(func, kwargs, repeat, min_time)
+        seconds = statistics.median(timings)
+        row = {
+            "size": size,
+            "input_bytes": input_bytes,
+            "seconds": seconds,
+            "repeats": len(timings),
+            "mb_per_s": input_bytes / MB / seconds if seconds > 0 else float("inf"),
+            **_alloc_call(func, kwargs),
+        }
+        row["alloc_ratio"] = row["peak_alloc_bytes"] / input_bytes
+        if rows:
+            prev = rows[-1]
+            row["scaling_exponent"] = math.log(seconds / prev["seconds"]) / math.log(input_bytes / prev["input_bytes"])
+        rows.append(row)
+        print(f"  {name:<28}{format_size(size):>7}  {seconds * 1000:10.2f} ms  {row['mb_per_s']:9.2f} MB/s", file=sys.stderr)
+
+        if seconds > budget:
+            print(f"  {name:<28}skipping larger sizes ({seconds:.1f}s > {budget:.0f}s budget)", file=sys.stderr)
+            break
+    return rows
+
+
+def _print_report(results: Dict[str, List[dict]], baseline: Optional[dict]) -> None:
+    base_tools = (baseline or {}).get("tools", {})
+    print(f"\n{'='*96}")
+    print("  TOOL MICROBENCHMARKS")
+    print(f"{'='*96}")
+    print(f"  {'tool':<28}{'size':>7}{'time':>12}{'MB/s':>10}{'peak alloc':>12}{'x input':>9}{'GCs':>6}{'scaling':>9}"
+          + ("   vs base" if baseline else ""))
+    for name, rows in results.items():
+        base_rows = {r["size"]: r for r in base_tools.get(name, [])}
+        for row in rows:
+            exponent = row.get("scaling_exponent")
+            flag = " !" if exponent is not None and exponent > 1.3 else "  "
+            line = (
+                f"  {name:<28}{format_size(row['size']):>7}{row['seconds'] * 1000:>10.2f}ms"
+                f"{row['mb_per_s']:>10.2f}{row['peak_alloc_bytes'] / MB:>10.2f}MB{row['alloc_ratio']:>9.1f}"
+                f"{row['gc_collections']:>6}{(f'{exponent:.2f}' if exponent is not None else '—'):>7}{flag}"
+            )
+            if row["size"] in base_rows:
+                line += f"  {format_delta(row['mb_per_s'], base_rows[row['size']]['mb_per_s'])}"
+            print(line)
+    print("\n  scaling: time exponent vs the previous size (1.0 = linear, '!' marks > 1.3)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling microbenchmarks for src/tools.py.")
+    parser.add_argument("--tools", help="comma-separated tool names (default: all)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated input sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=5, help="max timed calls per size; the median is reported")
+    parser.add_argument("--min-time", type=float, default=0.2, help="stop repeating once this many seconds are spent")
+    parser.add_argument("--budget", type=float, default=10.0, help="skip larger sizes once a call exceeds this many seconds")
+    parser.add_argument("--output", help="JSON result path (default benchmarks/results/tools-<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="previous result JSON to print MB/s deltas against")
+    args = parser.parse_args()
+
+    names = args.tools.split(",") if args.tools else list(TOOL_INPUTS)
+    unknown = [n for n in names if n not in TOOL_INPUTS]
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(unknown)}")
+    sizes = sorted(parse_size(s) for s in args.sizes.split(","))
+
+    results = {name: bench_tool(name, sizes, args.repeat, args.min_time, args.budget) for name in names}
+
+    baseline = load_results(args.compare) if args.compare else None
+    _print_report(results, baseline)
+    write_results({
+        "benchmark": "tools",
+        "env": environment_info(),
+        "config": {"sizes": sizes, "repeat": args.repeat, "min_time": args.min_time, "budget": args.budget},
+        "tools": results,
+    }, args.output or default_output_path("tools"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Shared helpers for the benchmark suites: run metadata, memory probes and
+JSON result files that can be diffed across commits.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import subprocess
+from typing import Dict, Optional
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=10, check=True)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip()
+
+
+def environment_info() -> Dict[str, object]:
+    """Commit, interpreter and host details recorded alongside every result."""
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def default_output_path(name: str) -> str:
+    commit = _git("rev-parse", "--short", "HEAD") or "nogit"
+    return os.path.join(RESULTS_DIR, f"{name}-{commit}.json")
+
+
+def write_results(results: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {path}")
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def format_delta(current: float, baseline: float) -> str:
+    if not baseline:
+        return "   n/a"
+    return f"{(current - baseline) / baseline:+6.1%}"
@@ -1,15 +1,26 @@
 import os
 import uuid
 import time
+import asyncio
+import argparse
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from langchain_core.messages import HumanMessage
 from langfuse.langchain import CallbackHandler
 from langfuse import Langfuse
 from src.graph import app
+from src.checkpoint import thread_config
+from src.states import initial_state
 from src.evals import run_eval_suite
+from src.metrics import throughput_summary, tool_time_saved, loop_counts
+from src import tool_cache
+from src.score_batcher import close_score_batcher, format_batcher_stats
+from src.llm_cache import get_response_cache, format_cache_stats
+from src.eval_cache import get_eval_cache, format_eval_cache_stats
+from src.results_store import get_results_store, experiment_name
+from src.usage import usage_tracker, summarize as summarize_usage, annotate_trace, format_usage, format_nodes
+from src.cassette import add_cassette_args, activate_from_args, format_cassette_stats
 
 
 # ─── Research Topics for Multi-Session Demo ─────────────────
@@ -29,8 +40,8 @@ TOPICS = [
 ]
 
 
-def run_single_topic(langfuse: Langfuse, session_id: str, topic: dict, run_index: int):
-    """Runs the full 9-agent pipeline for a single topic."""
+def _start_run(langfuse: Langfuse, session_id: str, topic: dict, run_index: int):
+    """Prints the run header and creates the trace + callback config for one topic."""
     task = topic["task"]
     tags = ["stress-test", "v3-enhanced"] + topic["tags"]
 
@@ -50,86 +61,181 @@ def run_single_topic(langfuse: Langfuse, session_id: str, topic: dict, run_index
         update_trace=True,
     )
 
-    # Initial state
-    initial_state = {
+    # Session + tags ride on the root run's metadata, so every trace stays
+    # linked to its own session even when several runs share the process.
+    # The trace id doubles as the checkpoint thread id, so `--resume <trace>`
+    # picks the run back up on the same trace.
+    return trace_id, {
+        "callbacks": [langfuse_handler],
+        "metadata": {"langfuse_session_id": session_id, "langfuse_tags": tags},
+        **thread_config(trace_id),
+    }
+
+
+def _finish_run(langfuse: Langfuse, trace_id: str, task: str, result: dict, latency: float) -> dict:
+    """Prints the run results, runs the 8-score eval suite and returns the run summary."""
+    # Extract results
+    final_draft = result.get("draft", "")
+    exec_summary = result.get("executive_summary", "")
+    translations = result.get("translated_summaries", {})
+    seo_kw = result.get("seo_keywords", [])
+    iteration_log = result.get("iteration_log", [])
+
+    print(f"\n  --- Results ---")
+    print(f"  Draft:        {len(final_draft)} chars")
+    print(f"  Latency:      {latency:.1f}s")
+    print(f"  SEO Keywords: {seo_kw}")
+    print(f"  Iterations:   {' → '.join(iteration_log)}")
+    tools = tool_time_saved(result.get("tool_timings", []))
+    if tools["calls"]:
+        print(f"  Tool calls:   {tools['calls']} in {tools['batches']} batches, "
+              f"{tools['wall_s']:.2f}s wall ({tools['saved_s']:.2f}s saved by running concurrently)")
+    memo = tool_cache.summarize(result.get("tool_cache", []))
+    if memo["hits"] + memo["misses"]:
+        print(f"  Tool cache:   {memo['hits']} hits / {memo['misses']} misses ({memo['hit_rate']:.0%} hit rate)")
+    usage = summarize_usage(result.get("llm_usage", []))
+    print(f"  LLM usage:    {format_usage(usage)}")
+    if usage["nodes"]:
+        print(f"  Cost by node: {format_nodes(usage)}")
+    annotate_trace(langfuse, trace_id, usage)
+    print(f"  Exec Summary: {exec_summary[:150]}...")
+
+    if translations:
+        for lang, text in translations.items():
+            print(f"  Translation [{lang}]: {str(text)[:80]}...")
+
+    # Run 8-score evaluation suite
+    research_str = "\n".join(result.get("research_data", []))
+    scores = run_eval_suite(
+        trace_id=trace_id,
+        output_text=final_draft,
+        research_data=research_str,
+        latency=latency,
+        cost=usage["cost_usd"],
+    )
+
+    return {
+        "trace_id": trace_id,
         "task": task,
-        "topic_label": task,
-        "research_data": [],
-        "analysis": "",
-        "draft": "",
-        "critique": "",
-        "revision_count": 0,
-        "compliance_notes": "",
-        "compliance_revision_count": 0,
-        "seo_keywords": [],
-        "executive_summary": "",
-        "translated_summaries": {},
-        "final_output": "",
-        "iteration_log": [],
-        "messages": [HumanMessage(content=task)],
-        # ── New fields for enhanced pipeline ──
-        "enrichment_data": [],
-        "quality_score": 0.0,
-        "quality_revision_count": 0,
-        "sentiment_scores": {},
-        "readability_grade": 0.0,
+        "latency": latency,
+        "draft_length": len(final_draft),
+        "iterations": len(iteration_log),
+        "loops": loop_counts(iteration_log),
+        "scores": scores,
+        "tokens": usage["total_tokens"],
+        "cost": usage["cost_usd"],
     }
 
+
+def _failed_run(trace_id: str, task: str, run_index: int, e: Exception) -> dict:
+    import traceback
+    traceback.print_exc()
+    print(f"\n  ERROR in run {run_index + 1}: {e}")
+    return {"trace_id": trace_id, "task": task, "error": str(e)}
+
+
+def run_single_topic(langfuse: Langfuse, session_id: str, topic: dict, run_index: int):
+    """Runs the full 11-agent pipeline for a single topic."""
+    trace_id, config = _start_run(langfuse, session_id, topic, run_index)
     start_time = time.time()
 
     try:
-        result = app.invoke(
-            initial_state,
-            config={"callbacks": [langfuse_handler]},
-        )
-
-        end_time = time.time()
-        latency = end_time - start_time
-
-        # Extract results
-        final_draft = result.get("draft", "")
-        exec_summary = result.get("executive_summary", "")
-        translations = result.get("translated_summaries", {})
-        seo_kw = result.get("seo_keywords", [])
-        iteration_log = result.get("iteration_log", [])
-
-        print(f"\n  --- Results ---")
-        print(f"  Draft:        {len(final_draft)} chars")
-        print(f"  Latency:      {latency:.1f}s")
-        print(f"  SEO Keywords: {seo_kw}")
-        print(f"  Iterations:   {' → '.join(iteration_log)}")
-        print(f"  Exec Summary: {exec_summary[:150]}...")
-
-        if translations:
-            for lang, text in translations.items():
-                print(f"  Translation [{lang}]: {str(text)[:80]}...")
-
-        # Run 8-score evaluation suite
-        research_str = "\n".join(result.get("research_data", []))
-        run_eval_suite(
-            trace_id=trace_id,
-            output_text=final_draft,
-            research_data=research_str,
-            latency=latency,
-            cost=0.03 * (run_index + 1),  # simulated varying cost per run
-        )
-
-        return {
-            "trace_id": trace_id,
-            "task": task,
-            "latency": latency,
-            "draft_length": len(final_draft),
-            "iterations": len(iteration_log),
-        }
+        result = app.invoke(initial_state(topic["task"]), config=config)
+        latency = time.time() - start_time
+        return _finish_run(langfuse, trace_id, topic["task"], result, latency)
 
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        print(f"\n  ERROR in run {run_index + 1}: {e}")
-        return {"trace_id": trace_id, "task": task, "error": str(e)}
+        return _failed_run(trace_id, topic["task"], run_index, e)
+
+
+async def arun_single_topic(langfuse: Langfuse, session_id: str, topic: dict, run_index: int):
+    """Async variant of run_single_topic: drives the graph with app.ainvoke.
+
+    The eval suite still makes blocking judge calls, so it runs in a worker
+    thread to keep the event loop free for other pipelines.
+    """
+    trace_id, config = _start_run(langfuse, session_id, topic, run_index)
+    start_time = time.time()
+
+    try:
+        result = await app.ainvoke(initial_state(topic["task"]), config=config)
+        latency = time.time() - start_time
+        return await asyncio.to_thread(_finish_run, langfuse, trace_id, topic["task"], result, latency)
+
+    except Exception as e:
+        return _failed_run(trace_id, topic["task"], run_index, e)
+
+
+def resume_run(langfuse: Langfuse, trace_id: str) -> dict:
+    """Resumes a checkpointed run from the last node that completed."""
+    print(f"\n{'#'*70}")
+    print(f"# RESUME: {trace_id}")
+    print(f"{'#'*70}")
+
+    config = {
+        "callbacks": [CallbackHandler(trace_context={"trace_id": trace_id}, update_trace=True)],
+        **thread_config(trace_id),
+    }
+    snapshot = app.get_state(config)
+    if not snapshot.values:
+        raise SystemExit(f"No checkpoint found for trace {trace_id}")
+
+    task = snapshot.values["task"]
+    # Carry the original session/tags over — they were saved with the checkpoint
+    config["metadata"] = {
+        key: snapshot.metadata[key]
+        for key in ("langfuse_session_id", "langfuse_tags")
+        if key in snapshot.metadata
+    }
+
+    start_time = time.time()
+    try:
+        if snapshot.next:
+            print(f"  Task:     {task}")
+            print(f"  Resuming: {', '.join(snapshot.next)}")
+            result = app.invoke(None, config=config)
+        else:
+            print(f"  Run already complete, re-evaluating final state")
+            result = snapshot.values
+        latency = time.time() - start_time
+        return _finish_run(langfuse, trace_id, task, result, latency)
+
+    except Exception as e:
+        return _failed_run(trace_id, task, 0, e)
+
+
+async def arun_topics(langfuse: Langfuse, session_id: str, concurrency: int = 1) -> list:
+    """Runs every topic on one event loop, at most `concurrency` at a time.
+
+    Results come back in TOPICS order regardless of completion order.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def bounded(topic: dict, run_index: int) -> dict:
+        async with semaphore:
+            return await arun_single_topic(langfuse, session_id, topic, run_index)
+
+    return await asyncio.gather(*(bounded(topic, i) for i, topic in enumerate(TOPICS)))
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the research pipeline for every topic.")
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        help="drive the graph with app.ainvoke on a single event loop",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=1, metavar="N",
+        help="run up to N topics at once (implies --async)",
+    )
+    parser.add_argument(
+        "--resume", metavar="TRACE_ID",
+        help="resume a failed run from its last checkpointed node",
+    )
+    add_cassette_args(parser)
+    args = parser.parse_args()
+    cassette = activate_from_args(args)
+
     print("=" * 70)
     print("  MULTI-AGENT RESEARCH SYSTEM — Enhanced Langfuse Demo")
     print("  11 Agents | 12 Tools | 3 Topics | 3 Feedback Loops | 8 Evaluations per Trace")
@@ -145,15 +251,21 @@ def main():
     results = []
     total_start = time.time()
 
-    for i, topic in enumerate(TOPICS):
-        result = run_single_topic(langfuse, session_id, topic, i)
-        results.append(result)
+    if args.resume:
+        results = [resume_run(langfuse, args.resume)]
+    elif args.use_async or args.concurrency > 1:
+        print(f"Concurrency: {args.concurrency}")
+        results = asyncio.run(arun_topics(langfuse, session_id, args.concurrency))
+    else:
+        for i, topic in enumerate(TOPICS):
+            result = run_single_topic(langfuse, session_id, topic, i)
+            results.append(result)
 
     total_time = time.time() - total_start
 
     # ─── Final Summary ───────────────────────────────────────
     print(f"\n{'='*70}")
-    print(f"  ALL RUNS COMPLETE — {len(TOPICS)} topics in {total_time:.1f}s")
+    print(f"  ALL RUNS COMPLETE — {len(results)} topics in {total_time:.1f}s")
     print(f"{'='*70}")
 
     for r in results:
@@ -164,11 +276,51 @@ def main():
         else:
             print(f"     Error: {r['error']}")
 
+    throughput = throughput_summary([r["latency"] for r in results if "error" not in r], total_time)
+    print(f"\n  Throughput:   {throughput['runs_per_min']:.2f} runs/min "
+          f"({throughput['runs']} ok / {len(results)} runs in {total_time:.1f}s)")
+    print(f"  Latency:      p50 {throughput['p50_latency']:.1f}s | p95 {throughput['p95_latency']:.1f}s "
+          f"| max {throughput['max_latency']:.1f}s")
+
+    response_cache = get_response_cache()
+    if response_cache:
+        print(f"  LLM cache:    {format_cache_stats(response_cache.stats())}")
+
+    eval_cache = get_eval_cache()
+    if eval_cache:
+        print(f"  Eval cache:   {format_eval_cache_stats(eval_cache.stats())}")
+
+    if cassette:
+        print(f"  Cassette:     {format_cassette_stats(cassette)}")
+
+    print(f"  LLM usage:    {format_usage(usage_tracker.stats())} (pipeline + judges)")
+
+    store = get_results_store()
+    if store:
+        experiment = experiment_name("research-pipeline")
+        recorder = store.begin_run(experiment, run_id=session_id)
+        for r in results:
+            recorder.record(
+                r["task"],
+                trace_id=r["trace_id"],
+                error=r.get("error"),
+                latency=r.get("latency"),
+                loops=r.get("loops"),
+                scores=r.get("scores"),
+                tokens=r.get("tokens"),
+                cost=r.get("cost"),
+            )
+        print(f"  Results DB:   {recorder.recorded} runs in {store.path} as {experiment}@{session_id[:12]}")
+
     print(f"\n  Session: {session_id}")
-    print(f"  Total scores submitted: {len(results) * 8}")
 
-    # Final flush
-    langfuse.flush()
+    # Single flush for the session: queued scores go out with the traces.
+    # Langfuse clients share one exporter per project, so this covers both.
+    score_stats = close_score_batcher()
+    if score_stats:
+        print(f"  Scores:       {format_batcher_stats(score_stats)}")
+    else:
+        langfuse.flush()
     print(f"\n  ✅ All data flushed to Langfuse. Check your dashboard!")
     print(f"  URL: {os.getenv('LANGFUSE_BASE_URL', 'http://localhost:3000')}")
 
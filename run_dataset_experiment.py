@@ -2,157 +2,266 @@
 Langfuse Dataset Experiment Runner
 
 This script demonstrates Langfuse's Dataset & Experiment features:
-1. Creates a dataset in Langfuse with research topics.
-2. Runs each dataset item through the 9-agent pipeline.
+1. Streams research topics from a dataset file (JSONL is read line by line).
+2. Upserts each item into a Langfuse dataset if new or changed, and runs it
+   through the 9-agent pipeline.
 3. Evaluates each run with 8 scores.
 4. Links runs to dataset items as experiment results.
+5. Appends each item's result to the local results store, so runs can be
+   compared with `python -m src.results_store compare`.
 
 Usage:
     .venv/bin/python run_dataset_experiment.py
+    .venv/bin/python run_dataset_experiment.py --async
+    .venv/bin/python run_dataset_experiment.py --workers 8
+    .venv/bin/python run_dataset_experiment.py --dataset regression.jsonl --workers 16
+    EXPERIMENT_NAME=candidate .venv/bin/python run_dataset_experiment.py
 """
 
 import os
-import json
 import time
+import asyncio
+import argparse
+from typing import Iterable, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from langchain_core.messages import HumanMessage
 from langfuse.langchain import CallbackHandler
 from langfuse import Langfuse
 from src.graph import app
+from src.checkpoint import thread_config
+from src.states import initial_state
 from src.evals import run_eval_suite
+from src.metrics import loop_counts
+from src.llm_cache import get_response_cache, format_cache_stats
+from src.eval_cache import get_eval_cache, format_eval_cache_stats
+from src.score_batcher import close_score_batcher, format_batcher_stats
+from src.dataset_loader import DatasetReader, dataset_path
+from src.dataset_sync import DatasetSyncer, link_run, format_sync_stats
+from src.experiment_runner import ExperimentExecutor, DEFAULT_MAX_RETRIES, format_executor_stats
+from src.results_store import RunRecorder, get_results_store, experiment_name
+from src.usage import usage_tracker, summarize as summarize_usage, annotate_trace, format_usage
+from src.cassette import add_cassette_args, activate_from_args, format_cassette_stats
 
 
 DATASET_NAME = "research-topics-benchmark-v1"
-EXPERIMENT_NAME = "9-agent-pipeline-v3"
-
-
-def create_or_get_dataset(langfuse: Langfuse) -> None:
-    """Create the dataset in Langfuse and populate it from eval_dataset.json."""
-    print(f"\n📦 Creating dataset: {DATASET_NAME}")
-
-    with open("eval_dataset.json", "r") as f:
-        items = json.load(f)
-
-    try:
-        langfuse.create_dataset(
-            name=DATASET_NAME,
-            description="Research topics for benchmarking the 9-agent pipeline",
-        )
-        print(f"  Created new dataset: {DATASET_NAME}")
-    except Exception:
-        print(f"  Dataset '{DATASET_NAME}' already exists, reusing it")
-
-    for i, item in enumerate(items):
-        langfuse.create_dataset_item(
-            dataset_name=DATASET_NAME,
-            input={"topic": item["topic"]},
-            expected_output={
-                "expected_sections": item["expected_sections"],
-                "min_word_count": item["min_word_count"],
-                "expected_keywords": item["expected_keywords"],
-            },
-            metadata={"quality_threshold": item["quality_threshold"], "index": i},
-        )
-        print(f"  Added item {i+1}: {item['topic']}")
-
-    langfuse.flush()
-    print(f"  ✅ Dataset populated with {len(items)} items\n")
-
-
-def run_experiment(langfuse: Langfuse):
-    """Run each dataset item through the pipeline and link to experiment."""
-    print(f"🧪 Running experiment: {EXPERIMENT_NAME}")
-
-    dataset = langfuse.get_dataset(DATASET_NAME)
-    results = []
-
-    for i, item in enumerate(dataset.items):
-        topic = item.input["topic"]
-        expected = item.expected_output
-
-        print(f"\n{'─'*60}")
-        print(f"  Item {i+1}/{len(dataset.items)}: {topic}")
-        print(f"{'─'*60}")
-
-        # Create trace for this run
-        trace_id = langfuse.create_trace_id()
-
-        langfuse_handler = CallbackHandler(
-            trace_context={"trace_id": trace_id},
-            update_trace=True,
+EXPERIMENT_NAME = experiment_name("9-agent-pipeline-v3")
+
+
+def create_or_get_dataset(langfuse: Langfuse, verify_remote: bool = False) -> DatasetSyncer:
+    """Opens the sync for the Langfuse dataset; items are uploaded only if new or changed, as the run reaches them."""
+    print(f"\n📦 Dataset: {DATASET_NAME}")
+    return DatasetSyncer(
+        langfuse,
+        DATASET_NAME,
+        key=lambda item: item["input"]["topic"],
+        description="Research topics for benchmarking the 9-agent pipeline",
+        verify_remote=verify_remote,
+    )
+
+
+def _dataset_item(record: dict) -> dict:
+    """
+    A validated dataset record in Langfuse dataset-item shape.
+
+    Only the item's content goes in, not its position in the file, so its
+    content hash is unchanged when other lines are added, removed or moved.
+    """
+    return {
+        "input": {"topic": record["topic"]},
+        "expected_output": {
+            "expected_sections": record["expected_sections"],
+            "min_word_count": record["min_word_count"],
+            "expected_keywords": record["expected_keywords"],
+        },
+        "metadata": {"quality_threshold": record["quality_threshold"]},
+    }
+
+
+def _start_item(langfuse: Langfuse, item: dict, index: int):
+    """Prints the item header and creates the trace + callback config for one item."""
+    topic = item["input"]["topic"]
+
+    print(f"\n{'─'*60}")
+    print(f"  Item {index+1}: {topic}")
+    print(f"{'─'*60}")
+
+    # Create trace for this run
+    trace_id = langfuse.create_trace_id()
+
+    langfuse_handler = CallbackHandler(
+        trace_context={"trace_id": trace_id},
+        update_trace=True,
+    )
+
+    return trace_id, {"callbacks": [langfuse_handler], **thread_config(trace_id)}
+
+
+def _evaluate_item(langfuse: Langfuse, item: dict, trace_id: str, result: dict, latency: float) -> dict:
+    """
+    Scores a finished run, adds its usage to the trace and returns its summary.
+
+    Call this once per item: the scores and the llm-usage span it queues
+    are not idempotent, so a retry of the link step must reuse the summary.
+    """
+    topic = item["input"]["topic"]
+    draft = result.get("draft", "")
+    research = "\n".join(result.get("research_data", []))
+
+    # Token usage and cost, from the llm_usage entries the nodes added to the state
+    usage = summarize_usage(result.get("llm_usage", []))
+
+    # Run evaluations
+    scores = run_eval_suite(
+        trace_id=trace_id,
+        output_text=draft,
+        research_data=research,
+        latency=latency,
+        cost=usage["cost_usd"],
+    )
+
+    annotate_trace(langfuse, trace_id, usage)
+
+    # Additional dataset-specific checks
+    check_results = check_expected_output(draft, item["expected_output"])
+
+    print(f"  ✅ Completed in {latency:.1f}s ({len(draft)} chars), {format_usage(usage)}")
+    for check_name, passed in check_results.items():
+        print(f"     {'✅' if passed else '❌'} {check_name}")
+
+    return {
+        "topic": topic,
+        "trace_id": trace_id,
+        "latency": latency,
+        "draft_length": len(draft),
+        "checks": check_results,
+        "loops": loop_counts(result.get("iteration_log", [])),
+        "scores": scores,
+        "tokens": usage["total_tokens"],
+        "cost": usage["cost_usd"],
+    }
+
+
+def _failed_item(item: dict, trace_id: str, e: Exception) -> dict:
+    import traceback
+    traceback.print_exc()
+    print(f"  ❌ Failed: {e}")
+    return {"topic": item["input"]["topic"], "trace_id": trace_id, "error": str(e)}
+
+
+def _graph_input(snapshot, topic: str):
+    """Fresh state on a first attempt; None (resume from the last checkpoint) on a retry."""
+    return initial_state(topic) if not snapshot.values else None
+
+
+def _report(result: dict, totals: dict, recorder: Optional[RunRecorder]) -> None:
+    """Prints a finished item's summary line, adds it to the running totals and records it."""
+    totals["runs"] += 1
+    if recorder:
+        recorder.record(
+            result["topic"],
+            trace_id=result["trace_id"],
+            error=result.get("error"),
+            latency=result.get("latency"),
+            checks=result.get("checks"),
+            loops=result.get("loops"),
+            scores=result.get("scores"),
+            tokens=result.get("tokens"),
+            cost=result.get("cost"),
         )
-
-        initial_state = {
-            "task": topic,
-            "topic_label": topic,
-            "research_data": [],
-            "analysis": "",
-            "draft": "",
-            "critique": "",
-            "revision_count": 0,
-            "compliance_notes": "",
-            "compliance_revision_count": 0,
-            "seo_keywords": [],
-            "executive_summary": "",
-            "translated_summaries": {},
-            "final_output": "",
-            "iteration_log": [],
-            "messages": [HumanMessage(content=topic)],
-        }
-
-        start = time.time()
-
-        try:
-            result = app.invoke(
-                initial_state,
-                config={"callbacks": [langfuse_handler]},
-            )
-
-            latency = time.time() - start
-            draft = result.get("draft", "")
-            research = "\n".join(result.get("research_data", []))
-
-            # Run evaluations
-            run_eval_suite(
-                trace_id=trace_id,
-                output_text=draft,
-                research_data=research,
-                latency=latency,
-                cost=0.03,
-            )
-
-            # Link this run to the dataset item
-            item.link(
-                trace_id=trace_id,
-                run_name=EXPERIMENT_NAME,
-            )
-
-            # Additional dataset-specific checks
-            check_results = check_expected_output(draft, expected)
-
-            results.append({
-                "topic": topic,
-                "trace_id": trace_id,
-                "latency": latency,
-                "draft_length": len(draft),
-                "checks": check_results,
-            })
-
-            print(f"  ✅ Completed in {latency:.1f}s ({len(draft)} chars)")
-            for check_name, passed in check_results.items():
-                print(f"     {'✅' if passed else '❌'} {check_name}")
-
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            results.append({"topic": topic, "trace_id": trace_id, "error": str(e)})
-            print(f"  ❌ Failed: {e}")
-
-    langfuse.flush()
-    return results
+    if "error" in result:
+        print(f"  ❌ {result['topic']}: {result['error']}")
+        return
+    totals["succeeded"] += 1
+    checks_passed = sum(1 for v in result["checks"].values() if v)
+    print(f"  ✅ {result['topic']}: {result['latency']:.1f}s, {checks_passed}/{len(result['checks'])} checks passed, "
+          f"${result['cost']:.4f}")
+
+
+def run_experiment(langfuse: Langfuse, executor: ExperimentExecutor, syncer: DatasetSyncer, items: Iterable[dict],
+                   recorder: Optional[RunRecorder] = None) -> dict:
+    """Streams the dataset items through the pipeline on the executor's worker pool, linking each to the experiment.
+
+    Items are read lazily and results reported as they finish, so memory
+    stays flat however long the dataset is. A retry after a rate-limit
+    error resumes the item's graph from its last checkpoint on the same
+    trace instead of starting over.
+    """
+    print(f"🧪 Running experiment: {EXPERIMENT_NAME} ({executor.workers} workers)")
+
+    runs = {}  # index → [trace_id, config, seconds spent in the graph, summary once evaluated], for items in flight
+
+    def process(i: int, item: dict, attempt: int) -> dict:
+        item_id = syncer.ensure(item)
+        if i not in runs:
+            runs[i] = [*_start_item(langfuse, item, i), 0.0, None]
+        trace_id, config, _, summary = runs[i]
+        if summary is None:
+            start = time.time()
+            try:
+                snapshot = app.get_state(config)
+                if snapshot.values and not snapshot.next:
+                    result = snapshot.values  # graph finished; only the eval step failed
+                else:
+                    result = app.invoke(_graph_input(snapshot, item["input"]["topic"]), config=config)
+            finally:
+                runs[i][2] += time.time() - start
+            summary = runs[i][3] = _evaluate_item(langfuse, item, trace_id, result, runs[i][2])
+        # Link this run to the dataset item; a retry after a failed link skips straight here
+        link_run(langfuse, item_id, trace_id, EXPERIMENT_NAME)
+        del runs[i]
+        return summary
+
+    def fail(i: int, item: dict, e: Exception) -> dict:
+        trace_id = runs.pop(i)[0] if i in runs else None
+        return _failed_item(item, trace_id, e)
+
+    totals = {"runs": 0, "succeeded": 0}
+    for _, result in executor.stream(items, process, fail):
+        _report(result, totals, recorder)
+    return totals
+
+
+async def arun_experiment(langfuse: Langfuse, executor: ExperimentExecutor, syncer: DatasetSyncer, items: Iterable[dict],
+                          recorder: Optional[RunRecorder] = None) -> dict:
+    """Async variant of run_experiment: drives the graph with app.ainvoke.
+
+    Dataset upserts, evaluation and linking are blocking SDK calls, so they
+    run in a worker thread to keep the event loop free.
+    """
+    print(f"🧪 Running experiment (async): {EXPERIMENT_NAME} ({executor.workers} workers)")
+
+    runs = {}
+
+    async def process(i: int, item: dict, attempt: int) -> dict:
+        item_id = await asyncio.to_thread(syncer.ensure, item)
+        if i not in runs:
+            runs[i] = [*_start_item(langfuse, item, i), 0.0, None]
+        trace_id, config, _, summary = runs[i]
+        if summary is None:
+            start = time.time()
+            try:
+                snapshot = await app.aget_state(config)
+                if snapshot.values and not snapshot.next:
+                    result = snapshot.values
+                else:
+                    result = await app.ainvoke(_graph_input(snapshot, item["input"]["topic"]), config=config)
+            finally:
+                runs[i][2] += time.time() - start
+            summary = runs[i][3] = await asyncio.to_thread(_evaluate_item, langfuse, item, trace_id, result, runs[i][2])
+        await asyncio.to_thread(link_run, langfuse, item_id, trace_id, EXPERIMENT_NAME)
+        del runs[i]
+        return summary
+
+    def fail(i: int, item: dict, e: Exception) -> dict:
+        trace_id = runs.pop(i)[0] if i in runs else None
+        return _failed_item(item, trace_id, e)
+
+    totals = {"runs": 0, "succeeded": 0}
+    async for _, result in executor.astream(items, process, fail):
+        _report(result, totals, recorder)
+    return totals
 
 
 def check_expected_output(draft: str, expected: dict) -> dict:
@@ -178,6 +287,31 @@ def check_expected_output(draft: str, expected: dict) -> dict:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the Langfuse dataset experiment.")
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        help="drive the graph with app.ainvoke on a single event loop",
+    )
+    parser.add_argument(
+        "--dataset", default=dataset_path(), metavar="PATH",
+        help="dataset file: .jsonl is streamed line by line, .json is loaded whole (default $EVAL_DATASET or eval_dataset.json)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="run up to N dataset items at once (lowered automatically on rate limits)",
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=DEFAULT_MAX_RETRIES, metavar="N",
+        help="retries per item after a rate-limit error, with exponential backoff",
+    )
+    parser.add_argument(
+        "--verify-dataset", action="store_true",
+        help="compare the dataset against the remote Langfuse dataset instead of the local manifest",
+    )
+    add_cassette_args(parser)
+    args = parser.parse_args()
+    cassette = activate_from_args(args)
+
     print("=" * 70)
     print("  LANGFUSE DATASET EXPERIMENT RUNNER")
     print("  Pipeline: 9-Agent Research System")
@@ -185,31 +319,55 @@ def main():
 
     langfuse = Langfuse(timeout=120)
 
-    # Step 1: Create/populate dataset
-    create_or_get_dataset(langfuse)
+    # Step 1: Open the dataset sync; items are upserted as the run reaches them
+    syncer = create_or_get_dataset(langfuse, verify_remote=args.verify_dataset)
 
-    # Step 2: Run experiment
-    results = run_experiment(langfuse)
+    # Step 2: Stream the dataset file through the experiment
+    reader = DatasetReader(args.dataset)
+    items = (_dataset_item(record) for record in reader)
+    executor = ExperimentExecutor(workers=args.workers, max_retries=args.max_retries)
+    store = get_results_store()
+    recorder = store.begin_run(EXPERIMENT_NAME) if store else None
+    if args.use_async:
+        totals = asyncio.run(arun_experiment(langfuse, executor, syncer, items, recorder))
+    else:
+        totals = run_experiment(langfuse, executor, syncer, items, recorder)
 
     # Step 3: Summary
     print(f"\n{'='*70}")
     print(f"  EXPERIMENT COMPLETE: {EXPERIMENT_NAME}")
     print(f"{'='*70}")
 
-    passed = sum(1 for r in results if "error" not in r)
-    print(f"\n  Results: {passed}/{len(results)} runs succeeded")
-    for r in results:
-        if "error" not in r:
-            checks_passed = sum(1 for v in r["checks"].values() if v)
-            total_checks = len(r["checks"])
-            print(f"  ✅ {r['topic']}: {r['latency']:.1f}s, {checks_passed}/{total_checks} checks passed")
-        else:
-            print(f"  ❌ {r['topic']}: {r['error']}")
+    print(f"\n  Results:   {totals['succeeded']}/{totals['runs']} runs succeeded"
+          + (f" ({reader.invalid} invalid items skipped)" if reader.invalid else ""))
+    print(f"  Dataset:   {format_sync_stats(syncer.stats())}")
+    print(f"  Executor:  {format_executor_stats(executor.summary())}")
+    print(f"  LLM usage: {format_usage(usage_tracker.stats())} (pipeline + judges)")
+
+    response_cache = get_response_cache()
+    if response_cache:
+        print(f"  LLM cache: {format_cache_stats(response_cache.stats())}")
+
+    eval_cache = get_eval_cache()
+    if eval_cache:
+        print(f"  Eval cache: {format_eval_cache_stats(eval_cache.stats())}")
+
+    if cassette:
+        print(f"  Cassette:  {format_cassette_stats(cassette)}")
+
+    # One flush for the whole experiment: queued scores, traces and dataset links
+    score_stats = close_score_batcher()
+    if score_stats:
+        print(f"  Scores:    {format_batcher_stats(score_stats)}")
+    else:
+        langfuse.flush()
 
     print(f"\n  Dashboard: {os.getenv('LANGFUSE_BASE_URL', 'http://localhost:3000')}")
-    print(f"  Dataset:   {DATASET_NAME}")
+    print(f"  Dataset:   {DATASET_NAME} ({args.dataset})")
     print(f"  Experiment: {EXPERIMENT_NAME}")
-    langfuse.flush()
+    if recorder:
+        print(f"  Results DB: {recorder.recorded} items in {store.path} as {EXPERIMENT_NAME}@{recorder.run_id}")
+        print(f"  Compare:   python -m src.results_store compare {EXPERIMENT_NAME}")
 
 
 if __name__ == "__main__":
@@ -1,12 +1,15 @@
 from http.client import REQUEST_TIMEOUT
-import json
 import os
 import asyncio
-import time
-from typing import List, Dict, Any
+import argparse
+from typing import Dict, Any
 from dotenv import load_dotenv
 from langfuse import Langfuse
 from src.openai_client import get_client, invoke
+from src.cassette import add_cassette_args, activate_from_args, format_cassette_stats
+from src.dataset_loader import DatasetReader, dataset_path
+from src.dataset_sync import DatasetSyncer, dataset_item_run, format_sync_stats
+from src.experiment_runner import ExperimentExecutor, DEFAULT_MAX_RETRIES, format_executor_stats, is_rate_limited
 from agent_poc import ReActAgent
 
 # Load environment variables
@@ -17,43 +20,27 @@ langfuse = Langfuse(timeout=120)
 client = get_client()
 
 DATASET_NAME = "agent-poc-dataset-v2"
-EVAL_DATASET_PATH = "eval_dataset.json"
 
-def load_dataset_items(path: str) -> List[Dict[str, Any]]:
-    with open(path, 'r') as f:
-        return json.load(f)
+def load_dataset_items(path: str) -> DatasetReader:
+    # Lazy for .jsonl: items are read and validated as the executor asks for them
+    return DatasetReader(path)
 
-def get_or_create_dataset(items: List[Dict[str, Any]]) -> Any:
-    # Check if dataset exists, if so return it; else create it.
-    try:
-        # We use get_dataset to check existence, but it throws if not found?  
-        # Actually SDK usually returns object. Let's try to just create it, 
-        # normally upsert logic is safer or handled.
-        # But for POC we just create. 
-        # If it exists, create_dataset might error or return existing?
-        # Let's rely on create_datasetitem taking dataset_name.
-        langfuse.create_dataset(name=DATASET_NAME)
-        print(f"Dataset '{DATASET_NAME}' created.")
-    except Exception as e:
-        print(f"Dataset might already exist or error: {e}")
-    
-    # Upsert items
-    for i, item in enumerate(items):
-        langfuse.create_dataset_item(
-            dataset_name=DATASET_NAME,
-            input=item["topic"],
-            expected_output={
-                "expected_sections": item.get("expected_sections", []),
-                "min_word_count": item.get("min_word_count", 500),
-                "expected_keywords": item.get("expected_keywords", []),
-            },
-            metadata={"quality_threshold": item.get("quality_threshold")},
-        )
-    
-    # Return the dataset object for iteration? 
-    # Actually get_dataset returns the full object with items if configured?
-    # No, usually need to fetch items.
-    return langfuse.get_dataset(DATASET_NAME)
+def _dataset_item(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "input": record["topic"],
+        "expected_output": {
+            "expected_sections": record["expected_sections"],
+            "min_word_count": record["min_word_count"],
+            "expected_keywords": record["expected_keywords"],
+        },
+        "metadata": {"quality_threshold": record["quality_threshold"]},
+    }
+
+def get_or_create_dataset() -> DatasetSyncer:
+    # Upload only new or changed items, as the run reaches them; ids are
+    # derived from the topic, so re-runs update items in place instead of
+    # duplicating them
+    return DatasetSyncer(langfuse, DATASET_NAME, key=lambda item: item["input"])
 
 def evaluate_response(input_text: str, actual_output: str, expected_output: str) -> float:
     """
@@ -81,26 +68,30 @@ def evaluate_response(input_text: str, actual_output: str, expected_output: str)
         score = float(score_str)
         return max(0.0, min(1.0, score))
     except Exception as e:
+        if is_rate_limited(e):
+            raise  # retried by the executor rather than scored as wrong
         print(f"Error during evaluation: {e}")
         return 0.0
 
-def run_evals():
-    print("Loading test data...")
-    items = load_dataset_items(EVAL_DATASET_PATH)
+def run_evals(executor: ExperimentExecutor, path: str):
+    print(f"Streaming test data from {path}...")
+    reader = load_dataset_items(path)
     
     print("Setting up Langfuse dataset...")
-    # 1. Create/Update the dataset in Langfuse
-    dataset = get_or_create_dataset(items)
+    # 1. Items are created/updated in the Langfuse dataset as they are run
+    syncer = get_or_create_dataset()
     
     # 2. Initialize Agent
     agent = ReActAgent()
     
     print("Starting evaluation run...")
     
-    # Iterate through the items from the fetched dataset
-    for item in dataset.items:
-        input_data = item.input # The input stored in the dataset
-        expected_output = item.expected_output
+    # Items run on the executor's worker pool; rate-limited calls back off
+    # and retry inside the item, so each item keeps a single linked trace
+    def process(index, item, attempt):
+        input_data = item["input"] # The input stored in the dataset
+        expected_output = item["expected_output"]
+        item_id = executor.call(lambda: syncer.ensure(item))
         
         print(f"\nRunning item: {input_data}")
         
@@ -119,9 +110,11 @@ def run_evals():
         # trace = langfuse.trace(...)
         # item.link(trace, run_name="...")
         
-        # 3. Create Trace linked to Dataset Item using item.run() context manager
+        # 3. Create Trace linked to Dataset Item using the dataset_item_run() context manager
         # This automatically links the trace to the dataset item and handles lifecycle.
-        with item.run(
+        with dataset_item_run(
+            langfuse,
+            item_id,
             run_name="evaluation-run3",
             run_metadata={"model": "gpt-4o-mini"},
         ) as trace:
@@ -134,7 +127,7 @@ def run_evals():
             # If `trace` here sets the context, @observe should pick it up as parent.
             
             try:
-                actual_output = agent.run(input_data)
+                actual_output = executor.call(lambda: agent.run(input_data))
             except Exception as e:
                 actual_output = f"Error: {e}"
                 
@@ -145,7 +138,7 @@ def run_evals():
             print(f"  Actual: {actual_output}")
             print(f"  Expected: {expected_output}")
             
-            score = evaluate_response(input_data, actual_output, expected_output)
+            score = executor.call(lambda: evaluate_response(input_data, actual_output, expected_output))
             print(f"  Score: {score}")
             
             # 5. Log Score
@@ -154,13 +147,38 @@ def run_evals():
                 value=score,
                 comment=f"Expected: {expected_output}"
             )
-        
-        # Sleep to avoid rate limits
-        time.sleep(5)
+        return score
+
+    def fail(index, item, e):
+        print(f"  Item {item['input']} failed: {e}")
+        return None
+
+    # Results are consumed as they finish, so nothing accumulates per item
+    for _ in executor.stream((_dataset_item(record) for record in reader), process, fail):
+        pass
+    print(f"Dataset: {format_sync_stats(syncer.stats())}"
+          + (f", {reader.invalid} invalid items skipped" if reader.invalid else ""))
+    print(f"Executor: {format_executor_stats(executor.summary())}")
 
-    
     print("\nEvaluation complete. Flushing traces...")
     langfuse.flush()
 
+def main():
+    parser = argparse.ArgumentParser(description="Run the ReAct agent against the eval dataset.")
+    parser.add_argument("--dataset", default=dataset_path(), metavar="PATH",
+                        help="dataset file: .jsonl is streamed line by line (default $EVAL_DATASET or eval_dataset.json)")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="run up to N items at once (lowered automatically on rate limits)")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES, metavar="N",
+                        help="retries per rate-limited call, with exponential backoff")
+    add_cassette_args(parser)
+    args = parser.parse_args()
+    cassette = activate_from_args(args)
+
+    run_evals(ExperimentExecutor(workers=args.workers, max_retries=args.max_retries), args.dataset)
+
+    if cassette:
+        print(f"Cassette: {format_cassette_stats(cassette)}")
+
 if __name__ == "__main__":
-    run_evals()
+    main()
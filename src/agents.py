@@ -1,8 +1,20 @@
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+import os
+import re
+import time
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_openai import ChatOpenAI
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 
 from src.states import AgentState
+from src.llm_cache import get_response_cache
+from src.cassette import http_client, async_http_client
+from src.tool_cache import node_scope, scope_summary
+from src.usage import usage_tracker, usage_scope, scope_entry
 from src.tools import (
     search_tool,
     scrape_tool,
@@ -18,55 +30,283 @@ from src.tools import (
     text_summarizer_tool,
 )
 
-# Initialize models — two temperature profiles
+# Initialize models — two temperature profiles.
+# Only the deterministic (temperature 0) profile goes through the response
+# cache; creative sampling is meant to vary between runs. Both report token
+# usage to the usage tracker.
 llm_creative = ChatOpenAI(
     model="gpt-4o-mini",
     temperature=0.7,
+    callbacks=[usage_tracker],
+    http_client=http_client(),
+    http_async_client=async_http_client(),
 )
 
 llm_precise = ChatOpenAI(
     model="gpt-4o-mini",
     temperature=0.0,
+    cache=get_response_cache(),
+    callbacks=[usage_tracker],
+    http_client=http_client(),
+    http_async_client=async_http_client(),
 )
 
 
 # ──────────────────────────────────────────────────────────────
-# 1. RESEARCHER — uses search + scrape tools
+# NODE DRIVERS
+#   Each agent body below is a generator that yields ``(runnable, input)``
+#   for every LLM or network-bound tool call and receives the result back.
+#   The same body is driven with ``invoke`` for ``app.invoke`` and with
+#   ``ainvoke`` for ``app.ainvoke``, so the two paths cannot drift apart.
 # ──────────────────────────────────────────────────────────────
-def researcher_node(state: AgentState, config: RunnableConfig):
+#   Both drivers also tally memoized tool hits and LLM token usage for the
+#   node and add them to its update as ``tool_cache`` and ``llm_usage``
+#   entries, so hit rates and cost show up in the node's trace output and in
+#   the final state.
+def _with_node_stats(update: dict, config: RunnableConfig, tally, usage) -> dict:
+    node = (config or {}).get("metadata", {}).get("langgraph_node", "")
+    update = dict(update)
+    entry = scope_summary(node, tally)
+    if entry:
+        update["tool_cache"] = [entry]
+    entry = scope_entry(node, usage)
+    if entry:
+        update["llm_usage"] = [entry]
+    return update
+
+
+def _run_node(steps, config: RunnableConfig):
+    with node_scope() as tally, usage_scope() as usage:
+        try:
+            runnable, payload = next(steps)
+            while True:
+                runnable, payload = steps.send(runnable.invoke(payload, config=config))
+        except StopIteration as done:
+            return _with_node_stats(done.value, config, tally, usage)
+
+
+async def _arun_node(steps, config: RunnableConfig):
+    with node_scope() as tally, usage_scope() as usage:
+        try:
+            runnable, payload = next(steps)
+            while True:
+                runnable, payload = steps.send(await runnable.ainvoke(payload, config=config))
+        except StopIteration as done:
+            return _with_node_stats(done.value, config, tally, usage)
+
+
+# Cap on concurrent tool calls within one node (one LLM turn's tool_calls)
+TOOL_CONCURRENCY = max(int(os.getenv("TOOL_CONCURRENCY", "4")), 1)
+
+
+class ToolBatch(Runnable):
+    """
+    Runs the independent tool calls of one LLM turn concurrently.
+
+    Input is a list of ``(tool, tool_input)`` pairs. ``follow_up(call,
+    result)`` may return further calls as each result arrives; they are
+    started straight away, without waiting for the rest of the batch.
+
+    Output is ``(executed, timing)``: ``(call, result)`` pairs for the given
+    calls in order, then the follow-ups in the order they were started.
+    ``timing`` holds the batch's wall time, the summed per-call time (what
+    running them one by one would have cost) and the difference saved.
+    Threads carry the caller's context, so callbacks and the active cassette
+    see every call.
+    """
+
+    def __init__(self, max_concurrency: int = TOOL_CONCURRENCY,
+                 follow_up: Optional[Callable[[tuple, object], List[tuple]]] = None):
+        self.max_concurrency = max_concurrency
+        self.follow_up = follow_up
+
+    def _finish(self, started: float, calls: List[tuple], outcomes: Dict[int, tuple]):
+        wall = time.perf_counter() - started
+        serial = sum(d for _, d in outcomes.values())
+        timing = {"calls": len(calls), "wall_s": wall, "serial_s": serial, "saved_s": max(serial - wall, 0.0)}
+        return [(call, outcomes[i][0]) for i, call in enumerate(calls)], timing
+
+    def invoke(self, calls: List[Tuple[Runnable, object]], config: RunnableConfig = None, **kwargs):
+        def timed(call):
+            start = time.perf_counter()
+            result = call[0].invoke(call[1], config=config)
+            return result, time.perf_counter() - start
+
+        started = time.perf_counter()
+        calls = list(calls)
+        outcomes: Dict[int, tuple] = {}
+        if self.follow_up is None and (len(calls) <= 1 or self.max_concurrency == 1):
+            outcomes = {i: timed(call) for i, call in enumerate(calls)}
+            return self._finish(started, calls, outcomes)
+
+        with ContextThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            pending = {pool.submit(timed, call): i for i, call in enumerate(calls)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=pending.get):
+                    i = pending.pop(future)
+                    outcomes[i] = future.result()
+                    for extra in self.follow_up(calls[i], outcomes[i][0]) if self.follow_up else ():
+                        pending[pool.submit(timed, extra)] = len(calls)
+                        calls.append(extra)
+        return self._finish(started, calls, outcomes)
+
+    async def ainvoke(self, calls: List[Tuple[Runnable, object]], config: RunnableConfig = None, **kwargs):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def timed(call):
+            async with semaphore:
+                start = time.perf_counter()
+                result = await call[0].ainvoke(call[1], config=config)
+                return result, time.perf_counter() - start
+
+        started = time.perf_counter()
+        calls = list(calls)
+        outcomes: Dict[int, tuple] = {}
+        pending = {asyncio.ensure_future(timed(call)): i for i, call in enumerate(calls)}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=pending.get):
+                    i = pending.pop(task)
+                    outcomes[i] = task.result()
+                    for extra in self.follow_up(calls[i], outcomes[i][0]) if self.follow_up else ():
+                        pending[asyncio.ensure_future(timed(extra))] = len(calls)
+                        calls.append(extra)
+        finally:
+            for task in pending:
+                task.cancel()
+        return self._finish(started, calls, outcomes)
+
+
+# Tool-call name → (tool, the argument it takes)
+_RESEARCH_TOOLS = {"search_tool": (search_tool, "query"), "scrape_tool": (scrape_tool, "url")}
+
+# Bounds on the Researcher's multi-turn loop, per topic
+RESEARCH_MAX_TURNS = int(os.getenv("RESEARCH_MAX_TURNS", "3"))
+RESEARCH_TOKEN_BUDGET = int(os.getenv("RESEARCH_TOKEN_BUDGET", "20000"))
+RESEARCH_TIME_BUDGET_S = float(os.getenv("RESEARCH_TIME_BUDGET_S", "60"))
+RESEARCH_SCRAPE_TOP = int(os.getenv("RESEARCH_SCRAPE_TOP", "2"))  # result URLs scraped per search
+
+_RESULT_URL_RE = re.compile(r"\]\((https?://[^)\s]+)\)")
+
+
+def _research_calls(tool_calls: List[dict]) -> List[Tuple[Runnable, str]]:
+    """The search/scrape calls of one LLM turn as ``(tool, input)`` pairs, in call order."""
+    calls = []
+    for tool_call in tool_calls:
+        if tool_call["name"] in _RESEARCH_TOOLS:
+            tool_fn, arg = _RESEARCH_TOOLS[tool_call["name"]]
+            calls.append((tool_fn, tool_call["args"][arg]))
+    return calls
+
+
+def _scrape_stage(pages: Dict[str, str], calls: List[tuple], deadline: float):
+    """
+    ToolBatch follow-up that scrapes the top result URLs of each search as
+    soon as it returns, skipping pages already fetched or requested and
+    starting nothing new once the time budget is spent.
+    """
+    claimed = set(pages) | {arg for tool_fn, arg in calls if tool_fn is scrape_tool}
+
+    def follow_up(call, result):
+        if call[0] is not search_tool or time.monotonic() >= deadline:
+            return []
+        urls = [u for u in _RESULT_URL_RE.findall(result)[:RESEARCH_SCRAPE_TOP] if u not in claimed]
+        claimed.update(urls)
+        return [(scrape_tool, url) for url in urls]
+
+    return follow_up
+
+
+# ──────────────────────────────────────────────────────────────
+# 1. RESEARCHER — multi-turn search + scrape loop
+#   Each LLM turn's tool calls run as one concurrent batch, and every
+#   search's top result URLs are scraped while the rest of the batch is
+#   still running. Tool results go back to the LLM so the next turn can
+#   follow up on them; the loop ends when the LLM stops calling tools or
+#   the turn, token or time budget runs out.
+# ──────────────────────────────────────────────────────────────
+def _researcher_steps(state: AgentState):
     print("--- 1. Researcher ---")
     task = state["task"]
+    deadline = time.monotonic() + RESEARCH_TIME_BUDGET_S
 
     researcher_llm = llm_creative.bind_tools([search_tool, scrape_tool])
-    msg = researcher_llm.invoke(
-        f"Research this topic deeply. Use both search and scrape tools: {task}"
-    )
+    messages = [HumanMessage(content=f"Research this topic deeply. Use both search and scrape tools: {task}")]
 
     findings = []
-
-    if msg.tool_calls:
+    tool_timings = []
+    pages: Dict[str, str] = {}  # scraped URL → content, across turns
+    tokens = 0
+    turns = 0
+
+    while turns < RESEARCH_MAX_TURNS:
+        msg = yield researcher_llm, messages
+        turns += 1
+        tokens += (msg.usage_metadata or {}).get("total_tokens", 0)
+        if not msg.tool_calls:
+            if msg.content:
+                findings.append(("LLM knowledge: " if turns == 1 else "Research notes: ") + msg.content)
+            break
+
+        # Pages fetched on an earlier turn are answered without another call
+        calls = [c for c in _research_calls(msg.tool_calls) if not (c[0] is scrape_tool and c[1] in pages)]
+        executed, timing = yield ToolBatch(follow_up=_scrape_stage(pages, calls, deadline)), calls
+        tool_timings.append({"node": "researcher", "turn": turns, **timing})
+
+        # Findings in call order, each search followed by the pages scraped from its results
+        searches: Dict[str, str] = {}
+        fetched = {arg: res for (_, arg), res in executed[len(calls):]}
+        for (tool_fn, arg), res in executed[:len(calls)]:
+            if tool_fn is search_tool:
+                searches[arg] = res
+                findings.append(f"Search '{arg}':\n{res}")
+                for url in _RESULT_URL_RE.findall(res):
+                    if url in fetched and url not in pages:
+                        pages[url] = fetched[url]
+                        findings.append(f"Scraped {url}:\n{pages[url]}")
+            elif arg not in pages:
+                pages[arg] = res
+                findings.append(f"Scraped {arg}:\n{res}")
+
+        # Every tool call needs a reply; searches carry the pages scraped from their results
+        messages.append(msg)
         for tool_call in msg.tool_calls:
-            name = tool_call["name"]
-            args = tool_call["args"]
+            name, args = tool_call["name"], tool_call["args"]
             if name == "search_tool":
-                res = search_tool.invoke(args["query"])
-                findings.append(f"Search '{args['query']}':\n{res}")
+                scraped = [f"Scraped {u}:\n{pages[u]}" for u in _RESULT_URL_RE.findall(searches.get(args["query"], "")) if u in pages]
+                content = "\n\n".join([searches.get(args["query"], "")] + scraped)
             elif name == "scrape_tool":
-                res = scrape_tool.invoke(args["url"])
-                findings.append(f"Scraped {args['url']}:\n{res}")
-    else:
-        findings.append("LLM knowledge: " + msg.content)
+                content = pages.get(args["url"], "")
+            else:
+                content = f"Unknown tool: {name}"
+            messages.append(ToolMessage(content=content, tool_call_id=tool_call["id"]))
+
+        if tokens >= RESEARCH_TOKEN_BUDGET or time.monotonic() >= deadline:
+            print(f"  Research budget reached after {turns} turns ({tokens} tokens)")
+            break
 
+    print(f"  Research: {turns} turns, {len(pages)} pages scraped, {tokens} tokens")
     return {
         "research_data": findings,
-        "iteration_log": state.get("iteration_log", []) + ["researcher"],
+        "tool_timings": tool_timings,
+        "iteration_log": ["researcher"],
     }
 
 
+def researcher_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_researcher_steps(state), config)
+
+
+async def aresearcher_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_researcher_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 2. ANALYST — uses sentiment_analysis_tool + statistics_extractor_tool
 # ──────────────────────────────────────────────────────────────
-def analyst_node(state: AgentState, config: RunnableConfig):
+def _analyst_steps(state: AgentState):
     print("--- 2. Analyst ---")
     research_data = "\n\n".join(state["research_data"])
     task = state["task"]
@@ -98,7 +338,7 @@ Research Data:
 
 Produce a structured analysis. Be specific and cite data points."""
 
-    response = llm_precise.invoke(prompt, config=config)
+    response = yield llm_precise, prompt
 
     # Parse sentiment scores for state
     sentiment_scores = {"raw": sentiment_result}
@@ -106,42 +346,48 @@ Produce a structured analysis. Be specific and cite data points."""
     return {
         "analysis": response.content,
         "sentiment_scores": sentiment_scores,
-        "iteration_log": state.get("iteration_log", []) + ["analyst"],
+        "iteration_log": ["analyst"],
     }
 
 
+def analyst_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_analyst_steps(state), config)
+
+
+async def aanalyst_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_analyst_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 3. DATA ENRICHER — second research pass using search + scrape
 # ──────────────────────────────────────────────────────────────
-def data_enricher_node(state: AgentState, config: RunnableConfig):
+def _data_enricher_steps(state: AgentState):
     print("--- 3. Data Enricher ---")
     analysis = state["analysis"]
     task = state["task"]
 
     enricher_llm = llm_precise.bind_tools([search_tool, scrape_tool])
-    msg = enricher_llm.invoke(
+    msg = yield enricher_llm, (
         f"""Based on this analysis of "{task}", identify the TOP knowledge gap and search for additional data to fill it.
 
 Analysis:
 {analysis[:2000]}
 
 Use search_tool to find additional sources, then scrape_tool to get full content.
-Focus on gaps, missing data points, or areas that need deeper research.""",
-        config=config,
+Focus on gaps, missing data points, or areas that need deeper research."""
     )
 
     enrichments = []
+    tool_timings = []
 
     if msg.tool_calls:
-        for tool_call in msg.tool_calls:
-            name = tool_call["name"]
-            args = tool_call["args"]
-            if name == "search_tool":
-                res = search_tool.invoke(args["query"])
-                enrichments.append(f"Enrichment search '{args['query']}':\n{res}")
-            elif name == "scrape_tool":
-                res = scrape_tool.invoke(args["url"])
-                enrichments.append(f"Enrichment scraped {args['url']}:\n{res}")
+        executed, timing = yield ToolBatch(), _research_calls(msg.tool_calls)
+        tool_timings.append({"node": "data_enricher", **timing})
+        for (tool_fn, arg), res in executed:
+            if tool_fn is search_tool:
+                enrichments.append(f"Enrichment search '{arg}':\n{res}")
+            else:
+                enrichments.append(f"Enrichment scraped {arg}:\n{res}")
     else:
         enrichments.append("Enrichment LLM knowledge: " + msg.content)
 
@@ -151,14 +397,23 @@ Focus on gaps, missing data points, or areas that need deeper research.""",
     return {
         "research_data": combined_research,
         "enrichment_data": enrichments,
-        "iteration_log": state.get("iteration_log", []) + ["data_enricher"],
+        "tool_timings": tool_timings,
+        "iteration_log": ["data_enricher"],
     }
 
 
+def data_enricher_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_data_enricher_steps(state), config)
+
+
+async def adata_enricher_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_data_enricher_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 4. WRITER — uses headline_generator_tool
 # ──────────────────────────────────────────────────────────────
-def writer_node(state: AgentState, config: RunnableConfig):
+def _writer_steps(state: AgentState):
     print("--- 4. Writer ---")
     analysis = state["analysis"]
     critique = state.get("critique", "")
@@ -188,25 +443,34 @@ Here are suggested headline options from the headline generator tool — pick th
     if critique and critique != "None":
         prompt += f"\n\nIMPORTANT — Address this critique from the Fact-Checker:\n{critique}\nFix all issues raised."
 
-    response = llm_creative.invoke(prompt, config=config)
+    response = yield llm_creative, prompt
     return {
         "draft": response.content,
-        "iteration_log": state.get("iteration_log", []) + ["writer"],
+        "iteration_log": ["writer"],
     }
 
 
+def writer_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_writer_steps(state), config)
+
+
+async def awriter_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_writer_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 5. FACT-CHECKER — uses plagiarism_check_tool
 # ──────────────────────────────────────────────────────────────
-def fact_checker_node(state: AgentState, config: RunnableConfig):
+def _fact_checker_steps(state: AgentState):
     print("--- 5. Fact-Checker ---")
     draft = state["draft"]
     research_data = "\n\n".join(state["research_data"])
 
-    # Run plagiarism check tool
+    # Plagiarism check runs on the full draft against every research and
+    # enrichment document (MinHash/LSH index, built once per topic)
     plagiarism_result = plagiarism_check_tool.invoke({
-        "draft": draft[:3000],
-        "source_text": research_data[:3000],
+        "draft": draft,
+        "sources": state["research_data"],
     })
 
     prompt = f"""You are a strict Fact-Checker. Compare the draft against the original research data.
@@ -230,7 +494,7 @@ If there are significant errors, list them clearly as a critique.
 If the draft is factually sound, reply with EXACTLY: "APPROVED"
 """
 
-    response = llm_precise.invoke(prompt, config=config)
+    response = yield llm_precise, prompt
     content = response.content
 
     rev_count = state.get("revision_count", 0)
@@ -239,20 +503,28 @@ If the draft is factually sound, reply with EXACTLY: "APPROVED"
     if "APPROVED" in content.upper():
         return {
             "critique": "None",
-            "iteration_log": state.get("iteration_log", []) + [log_entry + "_approved"],
+            "iteration_log": [log_entry + "_approved"],
         }
     else:
         return {
             "critique": content,
             "revision_count": rev_count + 1,
-            "iteration_log": state.get("iteration_log", []) + [log_entry + "_rejected"],
+            "iteration_log": [log_entry + "_rejected"],
         }
 
 
+def fact_checker_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_fact_checker_steps(state), config)
+
+
+async def afact_checker_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_fact_checker_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 6. EDITOR — uses citation_formatter_tool
 # ──────────────────────────────────────────────────────────────
-def editor_node(state: AgentState, config: RunnableConfig):
+def _editor_steps(state: AgentState):
     print("--- 6. Editor ---")
     draft = state["draft"]
     compliance_notes = state.get("compliance_notes", "")
@@ -281,17 +553,25 @@ Draft:
     if compliance_notes and compliance_notes != "None":
         prompt += f"\n\nCOMPLIANCE ISSUES TO FIX:\n{compliance_notes}\nAddress ALL compliance issues."
 
-    response = llm_creative.invoke(prompt, config=config)
+    response = yield llm_creative, prompt
     return {
         "draft": response.content,
-        "iteration_log": state.get("iteration_log", []) + ["editor"],
+        "iteration_log": ["editor"],
     }
 
 
+def editor_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_editor_steps(state), config)
+
+
+async def aeditor_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_editor_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 7. SEO OPTIMIZER — uses keyword_extraction_tool (unchanged)
 # ──────────────────────────────────────────────────────────────
-def seo_optimizer_node(state: AgentState, config: RunnableConfig):
+def _seo_optimizer_steps(state: AgentState):
     print("--- 7. SEO Optimizer ---")
     draft = state["draft"]
 
@@ -312,18 +592,26 @@ Suggest:
 
 Output as structured text."""
 
-    response = seo_llm.invoke(prompt, config=config)
+    yield seo_llm, prompt
 
     return {
         "seo_keywords": keywords,
-        "iteration_log": state.get("iteration_log", []) + ["seo_optimizer"],
+        "iteration_log": ["seo_optimizer"],
     }
 
 
+def seo_optimizer_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_seo_optimizer_steps(state), config)
+
+
+async def aseo_optimizer_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_seo_optimizer_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 8. COMPLIANCE REVIEWER — uses word_count_tool + readability_score_tool
 # ──────────────────────────────────────────────────────────────
-def compliance_reviewer_node(state: AgentState, config: RunnableConfig):
+def _compliance_reviewer_steps(state: AgentState):
     print("--- 8. Compliance Reviewer ---")
     draft = state["draft"]
 
@@ -352,7 +640,7 @@ Report:
 If ALL rules pass, reply with EXACTLY: "COMPLIANT"
 If ANY rule fails, list the violations clearly."""
 
-    response = llm_precise.invoke(prompt, config=config)
+    response = yield llm_precise, prompt
     content = response.content
 
     comp_rev = state.get("compliance_revision_count", 0)
@@ -367,21 +655,29 @@ If ANY rule fails, list the violations clearly."""
         return {
             "compliance_notes": "None",
             "readability_grade": readability_grade,
-            "iteration_log": state.get("iteration_log", []) + [log_entry + "_passed"],
+            "iteration_log": [log_entry + "_passed"],
         }
     else:
         return {
             "compliance_notes": content,
             "compliance_revision_count": comp_rev + 1,
             "readability_grade": readability_grade,
-            "iteration_log": state.get("iteration_log", []) + [log_entry + "_failed"],
+            "iteration_log": [log_entry + "_failed"],
         }
 
 
+def compliance_reviewer_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_compliance_reviewer_steps(state), config)
+
+
+async def acompliance_reviewer_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_compliance_reviewer_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 9. EXECUTIVE SUMMARIZER — uses text_summarizer_tool
 # ──────────────────────────────────────────────────────────────
-def exec_summarizer_node(state: AgentState, config: RunnableConfig):
+def _exec_summarizer_steps(state: AgentState):
     print("--- 9. Executive Summarizer ---")
     draft = state["draft"]
 
@@ -404,17 +700,25 @@ Report:
 
 Output ONLY the 3-sentence summary, nothing else."""
 
-    response = llm_precise.invoke(prompt, config=config)
+    response = yield llm_precise, prompt
     return {
         "executive_summary": response.content,
-        "iteration_log": state.get("iteration_log", []) + ["exec_summarizer"],
+        "iteration_log": ["exec_summarizer"],
     }
 
 
+def exec_summarizer_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_exec_summarizer_steps(state), config)
+
+
+async def aexec_summarizer_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_exec_summarizer_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 10. TRANSLATOR — uses translation_quality_tool
 # ──────────────────────────────────────────────────────────────
-def translator_node(state: AgentState, config: RunnableConfig):
+def _translator_steps(state: AgentState):
     print("--- 10. Translator ---")
     summary = state.get("executive_summary", "")
 
@@ -430,7 +734,7 @@ SPANISH:
 FRENCH:
 [translation]"""
 
-    response = llm_precise.invoke(prompt, config=config)
+    response = yield llm_precise, prompt
     content = response.content
 
     translations = {"raw": content}
@@ -460,15 +764,23 @@ FRENCH:
     return {
         "translated_summaries": translations,
         "final_output": state["draft"],
-        "iteration_log": state.get("iteration_log", []) + ["translator"],
+        "iteration_log": ["translator"],
     }
 
 
+def translator_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_translator_steps(state), config)
+
+
+async def atranslator_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_translator_steps(state), config)
+
+
 # ──────────────────────────────────────────────────────────────
 # 11. QUALITY GATE — uses word_count_tool + readability_score_tool
 #     Final quality check with feedback loop to Editor
 # ──────────────────────────────────────────────────────────────
-def quality_gate_node(state: AgentState, config: RunnableConfig):
+def _quality_gate_steps(state: AgentState):
     print("--- 11. Quality Gate ---")
     draft = state["draft"]
     exec_summary = state.get("executive_summary", "")
@@ -502,7 +814,7 @@ If quality needs improvement, respond with a score 1-7, the word "FAILED", and l
 
 Format: SCORE: [number] | VERDICT: [PASSED/FAILED] | NOTES: [details]"""
 
-    response = llm_precise.invoke(prompt, config=config)
+    response = yield llm_precise, prompt
     content = response.content
 
     # Parse score
@@ -516,12 +828,20 @@ Format: SCORE: [number] | VERDICT: [PASSED/FAILED] | NOTES: [details]"""
     if "PASSED" in content.upper():
         return {
             "quality_score": quality_score,
-            "iteration_log": state.get("iteration_log", []) + [log_entry + "_passed"],
+            "iteration_log": [log_entry + "_passed"],
         }
     else:
         return {
             "quality_score": quality_score,
             "quality_revision_count": quality_rev + 1,
             "compliance_notes": f"Quality Gate feedback: {content}",
-            "iteration_log": state.get("iteration_log", []) + [log_entry + "_failed"],
+            "iteration_log": [log_entry + "_failed"],
         }
+
+
+def quality_gate_node(state: AgentState, config: RunnableConfig):
+    return _run_node(_quality_gate_steps(state), config)
+
+
+async def aquality_gate_node(state: AgentState, config: RunnableConfig):
+    return await _arun_node(_quality_gate_steps(state), config)
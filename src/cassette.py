@@ -0,0 +1,272 @@
+"""
+Record/replay cassettes for LLM and tool interactions.
+
+Record mode writes every OpenAI HTTP exchange (ChatOpenAI agents and judges,
+plus src.openai_client.invoke) and every recorded tool call to a JSONL file.
+Replay mode serves those responses back without touching the network, so a
+full pipeline run becomes deterministic and takes milliseconds.
+
+Interception happens at the httpx transport layer, so tool_calls, usage and
+every other response field round-trip exactly as the API returned them.
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import threading
+from collections import defaultdict, deque
+from functools import lru_cache, wraps
+from typing import Dict, Optional
+
+import httpx
+from openai import DefaultHttpxClient, DefaultAsyncHttpxClient
+
+DEFAULT_CASSETTE_PATH = os.path.join("cassettes", "default.jsonl")
+
+# Only headers that describe the (already decoded) body survive recording
+_KEPT_HEADERS = ("content-type",)
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """A JSONL file of recorded interactions, opened for recording or replay."""
+
+    def __init__(self, mode: str, path: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.mode = mode
+        self.path = path
+        self.recorded = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, deque] = defaultdict(deque)
+        self._last: Dict[str, dict] = {}
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            open(path, "w").close()
+        else:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No cassette at {path} — record one with --record first")
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry)
+
+    def record(self, entry: dict) -> None:
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.recorded += 1
+
+    def replay(self, key: str, description: str) -> dict:
+        """Serves recorded entries for `key` in order; the last one repeats once exhausted."""
+        with self._lock:
+            queue = self._entries.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            elif key in self._last:
+                entry = self._last[key]
+            else:
+                raise CassetteMissError(f"No recorded interaction for {description} in {self.path}")
+            self.replayed += 1
+            return entry
+
+
+_active: Optional[Cassette] = None
+
+
+def activate(mode: str, path: str = DEFAULT_CASSETTE_PATH) -> Cassette:
+    global _active
+    _active = Cassette(mode, path)
+    return _active
+
+
+def deactivate() -> None:
+    global _active
+    _active = None
+
+
+def active_cassette() -> Optional[Cassette]:
+    return _active
+
+
+# ─── HTTP interactions ───────────────────────────────────────
+
+def _request_key(request: httpx.Request) -> str:
+    body = request.content
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True).encode("utf-8")
+    except ValueError:
+        pass
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode("utf-8") + body)
+    return digest.hexdigest()
+
+
+def _http_entry(key: str, request: httpx.Request, response: httpx.Response) -> dict:
+    try:
+        request_body = json.loads(request.content)
+    except ValueError:
+        request_body = request.content.decode("utf-8", "replace")
+    return {
+        "kind": "http",
+        "key": key,
+        "request": {"method": request.method, "url": str(request.url), "body": request_body},
+        "response": {
+            "status_code": response.status_code,
+            "headers": {h: response.headers[h] for h in _KEPT_HEADERS if h in response.headers},
+            "body": response.content.decode("utf-8"),
+        },
+    }
+
+
+def _replayed_response(entry: dict, request: httpx.Request) -> httpx.Response:
+    recorded = entry["response"]
+    return httpx.Response(
+        recorded["status_code"],
+        headers=recorded["headers"],
+        content=recorded["body"].encode("utf-8"),
+        request=request,
+    )
+
+
+def _replay_http(cassette: Cassette, key: str, request: httpx.Request) -> httpx.Response:
+    try:
+        entry = cassette.replay(key, f"{request.method} {request.url.path}")
+    except CassetteMissError as e:
+        # A 404 surfaces as openai.NotFoundError straight away; raising here
+        # would be reported as a connection error and retried.
+        return httpx.Response(404, json={"error": {"message": str(e), "type": "cassette_miss"}}, request=request)
+    return _replayed_response(entry, request)
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """Sync transport: passes straight through unless a cassette is active."""
+
+    def __init__(self):
+        self._inner = httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = _active
+        if cassette is None:
+            return self._inner.handle_request(request)
+
+        key = _request_key(request)
+        if cassette.mode == "replay":
+            return _replay_http(cassette, key, request)
+
+        response = self._inner.handle_request(request)
+        response.read()
+        entry = _http_entry(key, request, response)
+        cassette.record(entry)
+        return _replayed_response(entry, request)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async twin of CassetteTransport for ChatOpenAI.ainvoke."""
+
+    def __init__(self):
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = _active
+        if cassette is None:
+            return await self._inner.handle_async_request(request)
+
+        key = _request_key(request)
+        if cassette.mode == "replay":
+            return _replay_http(cassette, key, request)
+
+        response = await self._inner.handle_async_request(request)
+        await response.aread()
+        entry = _http_entry(key, request, response)
+        cassette.record(entry)
+        return _replayed_response(entry, request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+@lru_cache(maxsize=None)
+def http_client() -> httpx.Client:
+    """Shared OpenAI httpx client routed through the cassette transport."""
+    return DefaultHttpxClient(transport=CassetteTransport())
+
+
+@lru_cache(maxsize=None)
+def async_http_client() -> httpx.AsyncClient:
+    """Shared async OpenAI httpx client routed through the cassette transport."""
+    return DefaultAsyncHttpxClient(transport=AsyncCassetteTransport())
+
+
+# ─── Tool interactions ───────────────────────────────────────
+
+def recorded_tool(func):
+    """
+    Records/replays a tool function's output, keyed by its name and arguments.
+
+    Apply it under `@tool` so LangChain still sees the original signature:
+
+        @tool
+        @recorded_tool
+        def search_tool(query: str) -> str: ...
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        cassette = _active
+        if cassette is None:
+            return func(*args, **kwargs)
+
+        call = {"args": list(args), "kwargs": kwargs}
+        key = hashlib.sha256(
+            f"tool {func.__name__}\n{json.dumps(call, sort_keys=True)}".encode("utf-8")
+        ).hexdigest()
+        if cassette.mode == "replay":
+            return cassette.replay(key, f"tool {func.__name__}")["output"]
+
+        output = func(*args, **kwargs)
+        cassette.record({"kind": "tool", "key": key, "tool": func.__name__, **call, "output": output})
+        return output
+
+    return wrapper
+
+
+# ─── CLI helpers ─────────────────────────────────────────────
+
+def add_cassette_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--record", nargs="?", const=DEFAULT_CASSETTE_PATH, metavar="CASSETTE",
+        help=f"record every LLM and tool interaction (default: {DEFAULT_CASSETTE_PATH})",
+    )
+    group.add_argument(
+        "--replay", nargs="?", const=DEFAULT_CASSETTE_PATH, metavar="CASSETTE",
+        help="serve LLM and tool interactions from a recorded cassette, no network",
+    )
+
+
+def activate_from_args(args: argparse.Namespace) -> Optional[Cassette]:
+    if args.record:
+        cassette = activate("record", args.record)
+    elif args.replay:
+        cassette = activate("replay", args.replay)
+    else:
+        return None
+    print(f"Cassette:   {cassette.mode} → {cassette.path}")
+    return cassette
+
+
+def format_cassette_stats(cassette: Cassette) -> str:
+    if cassette.mode == "record":
+        return f"recorded {cassette.recorded} interactions to {cassette.path}"
+    return f"replayed {cassette.replayed} interactions from {cassette.path}"
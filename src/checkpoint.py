@@ -0,0 +1,73 @@
+import os
+import sqlite3
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+DEFAULT_CHECKPOINT_DB = "checkpoints.sqlite"
+
+
+class SqliteCheckpointSaver(SqliteSaver):
+    """
+    SQLite checkpoint store usable from both app.invoke and app.ainvoke.
+
+    The stock SqliteSaver refuses the async API. Checkpoint writes are small,
+    local and already serialized behind the saver's lock, so the async methods
+    simply delegate to the sync ones instead of pulling in aiosqlite.
+    """
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+
+def get_checkpointer(path: Optional[str] = None) -> SqliteCheckpointSaver:
+    """
+    Returns a checkpoint store backed by a local SQLite file.
+
+    Args:
+        path: Database file. Falls back to CHECKPOINT_DB env var, then to
+              ./checkpoints.sqlite if None.
+    """
+    resolved_path = path or os.getenv("CHECKPOINT_DB") or DEFAULT_CHECKPOINT_DB
+    # check_same_thread=False is safe: SqliteSaver serializes access with a lock
+    conn = sqlite3.connect(resolved_path, check_same_thread=False)
+    return SqliteCheckpointSaver(conn)
+
+
+def thread_config(thread_id: str) -> RunnableConfig:
+    """Config fragment that keys a run's checkpoints by its trace id."""
+    return {"configurable": {"thread_id": thread_id}}
@@ -0,0 +1,100 @@
+"""
+Streaming reader for evaluation datasets.
+
+A `.jsonl` dataset holds one item per line and is read lazily, one line at a
+time, so a regression set of any size is processed in constant memory. Each
+item is validated as it is read. A `.json` file (a single array, like
+eval_dataset.json) is still accepted, but it is parsed in full up front.
+
+An item needs a non-empty `topic`; the other fields default as below:
+
+    {"topic": "...", "expected_sections": [], "min_word_count": 500,
+     "expected_keywords": [], "quality_threshold": null}
+
+Invalid items are reported with their line number and skipped.
+"""
+
+import os
+import json
+from typing import Iterator
+
+DEFAULT_DATASET_PATH = "eval_dataset.json"
+
+
+def dataset_path() -> str:
+    """The EVAL_DATASET env var, or eval_dataset.json."""
+    return os.getenv("EVAL_DATASET") or DEFAULT_DATASET_PATH
+
+
+def normalize_item(record) -> dict:
+    """Validates one raw item and fills in defaults; raises ValueError if it is unusable."""
+    if not isinstance(record, dict):
+        raise ValueError(f"expected an object, got {type(record).__name__}")
+    topic = record.get("topic")
+    if not isinstance(topic, str) or not topic.strip():
+        raise ValueError("missing or empty 'topic'")
+
+    item = {
+        "topic": topic.strip(),
+        "expected_sections": record.get("expected_sections", []),
+        "min_word_count": record.get("min_word_count", 500),
+        "expected_keywords": record.get("expected_keywords", []),
+        "quality_threshold": record.get("quality_threshold"),
+    }
+    for field in ("expected_sections", "expected_keywords"):
+        if not isinstance(item[field], list) or not all(isinstance(v, str) for v in item[field]):
+            raise ValueError(f"'{field}' must be a list of strings")
+    if not isinstance(item["min_word_count"], int) or item["min_word_count"] < 0:
+        raise ValueError("'min_word_count' must be a non-negative integer")
+    if item["quality_threshold"] is not None and not isinstance(item["quality_threshold"], (int, float)):
+        raise ValueError("'quality_threshold' must be a number")
+    return item
+
+
+class DatasetReader:
+    """
+    Iterates over the validated items of a dataset file.
+
+    Iteration is lazy for `.jsonl`, so the consumer sets the pace: when the
+    executor has enough items in flight, reading simply stops. `read` and
+    `invalid` count the items seen so far.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.read = 0
+        self.invalid = 0
+
+    def __iter__(self) -> Iterator[dict]:
+        if self.path.endswith(".json"):
+            with open(self.path, "r") as f:
+                records = enumerate(json.load(f), 1)
+                yield from self._validated(records, "item")
+            return
+
+        with open(self.path, "r") as f:
+            yield from self._validated(self._lines(f), "line")
+
+    def _lines(self, f):
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                self._skip(line_no, "line", f"invalid JSON ({e})")
+
+    def _validated(self, records, unit: str) -> Iterator[dict]:
+        for position, record in records:
+            try:
+                item = normalize_item(record)
+            except ValueError as e:
+                self._skip(position, unit, str(e))
+                continue
+            self.read += 1
+            yield item
+
+    def _skip(self, position: int, unit: str, reason: str) -> None:
+        self.invalid += 1
+        print(f"  ⚠️ {self.path} {unit} {position}: {reason}, skipped")
@@ -0,0 +1,204 @@
+"""
+Idempotent upload of local dataset items to a Langfuse dataset.
+
+Every item gets a deterministic id derived from the dataset name and the
+item's key (e.g. its topic), so uploading it again updates it in place
+instead of creating a duplicate. A SHA-256 of the item's content is stored
+in its metadata and in a local SQLite manifest, per Langfuse host, public
+key and dataset.
+
+`DatasetSyncer.ensure(item)` uploads an item only if its hash differs from
+the manifest, and is called per item as a run reaches it. Start-up cost is
+therefore zero, and a run uploads only the items that changed. Lookups go
+to SQLite, so memory stays flat however many items the dataset has. With no
+manifest entry for the dataset (e.g. a fresh checkout), or when
+`verify_remote` is set, the remote item listing is paged into the manifest
+once first.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+import contextlib
+from typing import Any, Callable, Dict, Optional
+
+from langfuse.api.resources.dataset_run_items.types.create_dataset_run_item_request import (
+    CreateDatasetRunItemRequest,
+)
+
+DEFAULT_MANIFEST_PATH = ".dataset_manifest.sqlite"
+REMOTE_PAGE_SIZE = 100
+
+
+def item_id(dataset_name: str, key: str) -> str:
+    """Stable, globally unique item id for `key` within `dataset_name`."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"langfuse-dataset:{dataset_name}/{key}"))
+
+
+def content_hash(item: dict) -> str:
+    """Hash of an item's input, expected output and metadata (excluding the hash itself)."""
+    content = {
+        "input": item.get("input"),
+        "expected_output": item.get("expected_output"),
+        "metadata": {k: v for k, v in (item.get("metadata") or {}).items() if k != "content_hash"},
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _manifest_scope(dataset_name: str) -> str:
+    host = os.getenv("LANGFUSE_BASE_URL") or os.getenv("LANGFUSE_HOST") or "http://localhost:3000"
+    return f"{host}|{os.getenv('LANGFUSE_PUBLIC_KEY', '')}|{dataset_name}"
+
+
+class DatasetSyncer:
+    """
+    Keeps one Langfuse dataset in step with local items, one item at a time.
+
+    Thread-safe: experiment workers call `ensure` concurrently, and uploads
+    for different items run in parallel.
+    """
+
+    def __init__(
+        self,
+        langfuse,
+        dataset_name: str,
+        key: Callable[[dict], str],
+        description: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+        verify_remote: bool = False,
+    ):
+        self.langfuse = langfuse
+        self.dataset_name = dataset_name
+        self.key = key
+        self.scope = _manifest_scope(dataset_name)
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "updated": 0, "unchanged": 0, "failed": 0, "upload_s": 0.0}
+        self._conn = sqlite3.connect(
+            manifest_path or os.getenv("DATASET_MANIFEST") or DEFAULT_MANIFEST_PATH,
+            check_same_thread=False,
+        )
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS datasets (
+                scope TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                scope TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (scope, item_id)
+            );"""
+        )
+        known = self._conn.execute("SELECT 1 FROM datasets WHERE scope = ?", (self.scope,)).fetchone()
+        if known is None or verify_remote:
+            self._load_remote(description)
+
+    def _load_remote(self, description: Optional[str]) -> None:
+        """Replaces this dataset's manifest rows with the remote listing, creating the dataset if needed."""
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE scope = ?", (self.scope,))
+            self._conn.commit()
+        page = 1
+        try:
+            while True:  # page by page, so memory stays flat on big datasets
+                listing = self.langfuse.api.dataset_items.list(
+                    dataset_name=self.dataset_name, page=page, limit=REMOTE_PAGE_SIZE,
+                )
+                rows = [(self.scope, i.id, (i.metadata or {}).get("content_hash", "")) for i in listing.data]
+                with self._lock:
+                    self._conn.executemany("INSERT OR REPLACE INTO items VALUES (?, ?, ?)", rows)
+                    self._conn.commit()
+                if listing.meta.total_pages <= page:
+                    break
+                page += 1
+        except Exception:
+            if page > 1:
+                raise
+            self.langfuse.create_dataset(name=self.dataset_name, description=description)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO datasets VALUES (?, ?)", (self.scope, time.time()))
+            self._conn.commit()
+
+    def ensure(self, item: dict) -> str:
+        """
+        Uploads `item` unless the manifest already has its current hash; returns its id.
+
+        A failed upload raises and leaves the manifest untouched, so the next
+        call retries it.
+        """
+        id_ = item_id(self.dataset_name, self.key(item))
+        digest = content_hash(item)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM items WHERE scope = ? AND item_id = ?", (self.scope, id_)
+            ).fetchone()
+            if row is not None and row[0] == digest:
+                self._stats["unchanged"] += 1
+                return id_
+
+        start = time.perf_counter()
+        try:
+            self.langfuse.create_dataset_item(
+                dataset_name=self.dataset_name,
+                id=id_,
+                input=item.get("input"),
+                expected_output=item.get("expected_output"),
+                metadata={**(item.get("metadata") or {}), "content_hash": digest},
+            )
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO items VALUES (?, ?, ?)", (self.scope, id_, digest))
+            self._conn.commit()
+            self._stats["updated" if row is not None else "created"] += 1
+            self._stats["upload_s"] += time.perf_counter() - start
+        return id_
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._stats)
+
+
+def link_run(langfuse, dataset_item_id: str, trace_id: str, run_name: str, run_metadata: Any = None) -> None:
+    """Links a trace to a dataset item as one result of the experiment `run_name`."""
+    langfuse.api.dataset_run_items.create(
+        request=CreateDatasetRunItemRequest(
+            runName=run_name,
+            datasetItemId=dataset_item_id,
+            traceId=trace_id,
+            metadata=run_metadata,
+        )
+    )
+
+
+@contextlib.contextmanager
+def dataset_item_run(langfuse, dataset_item_id: str, run_name: str, run_metadata: Any = None):
+    """
+    Opens a root span for one dataset item run and links its trace to the item.
+
+    The same as the SDK's `DatasetItemClient.run`, but needs only the item's
+    id, so items can come straight from a local file instead of a fetched
+    dataset.
+    """
+    trace_name = f"Dataset run: {run_name}"
+    with langfuse.start_as_current_span(name=trace_name) as span:
+        span.update_trace(
+            name=trace_name,
+            metadata={"dataset_item_id": dataset_item_id, "run_name": run_name},
+        )
+        link_run(langfuse, dataset_item_id, span.trace_id, run_name, run_metadata)
+        yield span
+
+
+def format_sync_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"{stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged"
+        + (f", {stats['failed']} failed uploads" if stats["failed"] else "")
+        + f" ({stats['upload_s']:.2f}s uploading)"
+    )
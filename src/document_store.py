@@ -0,0 +1,208 @@
+"""
+URL-keyed page store backing `scrape_tool`.
+
+Pages come from a JSONL file with one `{"url": ..., "text": ...}` object per
+line. A `url` may be a full page URL or a bare host, which then serves every
+page on that site that has no entry of its own. The store is built once per
+source version into:
+
+    meta.json       source fingerprint, page count
+    pages.blob      page texts, UTF-8, concatenated
+    pages.off       uint64 (start, end) offsets into pages.blob per key (2N)
+    keys.bin        sorted normalized URLs, UTF-8, concatenated
+    keys.off        uint64 offsets into keys.bin (N + 1)
+
+All files are memory-mapped, so a lookup is a binary search over the keys
+and one slice of the blob; nothing is parsed or held in memory per page.
+Decoded pages are kept in a small LRU cache bounded by total characters, so
+resident memory stays flat however large the store grows.
+"""
+
+import os
+import json
+import shutil
+import threading
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.search_index import mmap_array
+
+DEFAULT_PAGES_PATH = os.path.join("data", "scrape_pages.jsonl")
+DEFAULT_STORE_DIR = ".doc_store"
+STORE_VERSION = 1
+DEFAULT_CACHE_MB = 16
+
+
+def normalize_url(url: str) -> str:
+    """`https://www.Example.com/a/` → `example.com/a`: scheme, www., query and trailing slash dropped."""
+    url = url.strip()
+    parts = urlsplit(url if "//" in url else f"//{url}")
+    host = parts.netloc.lower().rsplit("@", 1)[-1]
+    if host.startswith("www."):
+        host = host[4:]
+    return host + parts.path.rstrip("/")
+
+
+def _fingerprint(pages_path: str) -> Dict[str, object]:
+    stat = os.stat(pages_path)
+    return {
+        "version": STORE_VERSION,
+        "source": os.path.abspath(pages_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def build_store(pages_path: str, store_dir: str) -> None:
+    """Streams the JSONL pages into the blob file and writes the sorted key index."""
+    tmp_dir = f"{store_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    spans: Dict[str, Tuple[int, int]] = {}  # later lines win for duplicate URLs
+    with open(pages_path, "rb") as src, open(os.path.join(tmp_dir, "pages.blob"), "wb") as blob:
+        offset = 0
+        for line in src:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            data = record.get("text", "").encode("utf-8")
+            blob.write(data)
+            spans[normalize_url(record["url"])] = (offset, offset + len(data))
+            offset += len(data)
+
+    keys_bin = bytearray()
+    keys_off = array("Q", [0])
+    pages_off = array("Q")
+    for key in sorted(spans, key=lambda k: k.encode("utf-8")):
+        start, end = spans[key]
+        keys_bin += key.encode("utf-8")
+        keys_off.append(len(keys_bin))
+        pages_off.extend((start, end))
+
+    for name, data in (("keys.bin", keys_bin), ("keys.off", keys_off), ("pages.off", pages_off)):
+        with open(os.path.join(tmp_dir, name), "wb") as f:
+            f.write(bytes(data))
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({**_fingerprint(pages_path), "pages": len(spans)}, f)
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+
+
+class DocumentStore:
+    """Memory-mapped page store with an LRU cache of decoded pages. Safe to share across threads."""
+
+    def __init__(self, pages_path: str, store_dir: str, cache_chars: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.pages_path = pages_path
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+
+        self._keys = mmap_array(os.path.join(store_dir, "keys.bin"), "B")
+        self._keys_off = mmap_array(os.path.join(store_dir, "keys.off"), "Q")
+        self._pages_off = mmap_array(os.path.join(store_dir, "pages.off"), "Q")  # (start, end) per key
+        self._blob = mmap_array(os.path.join(store_dir, "pages.blob"), "B")
+
+        self.cache_chars = cache_chars
+        self._cache: "OrderedDict[int, str]" = OrderedDict()
+        self._cached_chars = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def open(cls, pages_path: str, store_dir: str, **kwargs) -> "DocumentStore":
+        """Opens the store for `pages_path`, (re)building it if missing or stale."""
+        meta_path = os.path.join(store_dir, "meta.json")
+        stale = True
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            stale = any(meta.get(k) != v for k, v in _fingerprint(pages_path).items())
+        if stale:
+            build_store(pages_path, store_dir)
+        return cls(pages_path, store_dir, **kwargs)
+
+    def __len__(self) -> int:
+        return self.meta["pages"]
+
+    def _page_id(self, key: str) -> Optional[int]:
+        """Binary search over the sorted keys."""
+        target = key.encode("utf-8")
+        lo, hi = 0, self.meta["pages"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self._keys[self._keys_off[mid]:self._keys_off[mid + 1]].tobytes()
+            if current < target:
+                lo = mid + 1
+            elif current > target:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _page(self, page_id: int) -> str:
+        with self._lock:
+            text = self._cache.get(page_id)
+            if text is not None:
+                self._cache.move_to_end(page_id)
+                self._stats["hits"] += 1
+                return text
+            self._stats["misses"] += 1
+
+        start, end = self._pages_off[2 * page_id], self._pages_off[2 * page_id + 1]
+        text = str(self._blob[start:end], "utf-8")  # decodes straight from the mapped pages
+
+        if len(text) <= self.cache_chars:
+            with self._lock:
+                if page_id not in self._cache:
+                    self._cache[page_id] = text
+                    self._cached_chars += len(text)
+                while self._cached_chars > self.cache_chars:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_chars -= len(evicted)
+                    self._stats["evictions"] += 1
+        return text
+
+    def get(self, url: str) -> Optional[str]:
+        """Page text for `url`, falling back to a site-wide entry for its host; None if neither exists."""
+        key = normalize_url(url)
+        page_id = self._page_id(key)
+        if page_id is None:
+            page_id = self._page_id(key.split("/", 1)[0])
+        return None if page_id is None else self._page(page_id)
+
+    def cache_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._cache), "cached_chars": self._cached_chars}
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cached_chars = 0
+
+
+_open_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _open_store(pages_path: str, store_dir: str, cache_chars: int) -> DocumentStore:
+    with _open_lock:  # parallel tool calls must not build the store twice
+        return DocumentStore.open(pages_path, store_dir, cache_chars=cache_chars)
+
+
+def get_document_store() -> DocumentStore:
+    """
+    Returns the shared document store, building it on first use.
+
+    Configured via env vars:
+        SCRAPE_PAGES     — JSONL pages (default data/scrape_pages.jsonl).
+        SCRAPE_STORE_DIR — where the store files live (default ./.doc_store).
+        SCRAPE_CACHE_MB  — decoded-page cache budget, in millions of characters (default 16).
+    """
+    return _open_store(
+        os.getenv("SCRAPE_PAGES") or DEFAULT_PAGES_PATH,
+        os.getenv("SCRAPE_STORE_DIR") or DEFAULT_STORE_DIR,
+        int(float(os.getenv("SCRAPE_CACHE_MB") or DEFAULT_CACHE_MB) * 1024 * 1024),
+    )
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+from src.cassette import active_cassette
+
+DEFAULT_CACHE_PATH = ".eval_cache.sqlite"
+
+
+def eval_key(name: str, version: str, inputs: dict) -> str:
+    """
+    Content address for one evaluation: its name, its version and a hash of
+    everything it reads. Bumping the version orphans every earlier result.
+    """
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{name}:{version}:{digest}"
+
+
+class SQLiteEvalCache:
+    """
+    On-disk cache of eval results, so unchanged outputs are not re-judged.
+
+    Stores the `{"score", "reason"}` result of each eval under its `eval_key`.
+    Failed results are never stored, so a judge that timed out or errored is
+    retried on the next run. Like the LLM response cache, it stands aside
+    while a cassette is recording or replaying.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS eval_cache (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                score REAL NOT NULL,
+                reason TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def lookup(self, key: str) -> Optional[dict]:
+        if active_cassette():
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT score, reason FROM eval_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return {"score": row[0], "reason": row[1]}
+
+    def update(self, key: str, name: str, result: dict) -> None:
+        if active_cassette() or result["reason"].startswith("Failed"):
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO eval_cache (key, name, score, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, name, float(result["score"]), result["reason"], time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM eval_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for this process plus the number of stored results."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM eval_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_eval_cache() -> Optional[SQLiteEvalCache]:
+    """
+    Returns the shared eval result cache.
+
+    Configured via env vars:
+        EVAL_CACHE      — set to "off" to re-run every eval.
+        EVAL_CACHE_PATH — SQLite file (default ./.eval_cache.sqlite).
+
+    Returns:
+        The cache instance, or None when caching is disabled.
+    """
+    if os.getenv("EVAL_CACHE", "").lower() in ("off", "0", "false"):
+        return None
+    return SQLiteEvalCache(os.getenv("EVAL_CACHE_PATH") or DEFAULT_CACHE_PATH)
+
+
+def format_eval_cache_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"{stats['hits']} reused / {stats['misses']} evaluated "
+        f"({stats['hit_rate']:.0%} reuse), {stats['entries']} stored results"
+    )
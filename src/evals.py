@@ -1,16 +1,31 @@
+import os
 import re
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Annotated, Callable, Dict, List, Optional, TypedDict
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from langfuse import Langfuse
 from langchain_openai import ChatOpenAI
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from src.llm_cache import get_response_cache
+from src.cassette import http_client, async_http_client
+from src.text_profile import profile_text
+from src.score_batcher import get_score_batcher
+from src.eval_cache import get_eval_cache, eval_key
+from src.usage import usage_tracker, usage_scope, scope_entry, format_usage
 
 # Initialize Langfuse and LLM
 langfuse = Langfuse(timeout=120)
 llm_judge = ChatOpenAI(
     model="gpt-4o-mini",
     temperature=0.0,
+    cache=get_response_cache(),
+    callbacks=[usage_tracker],
+    http_client=http_client(),
+    http_async_client=async_http_client(),
 )
 
 
@@ -29,6 +44,7 @@ def _extract_score(text: str) -> float:
 def eval_format_compliance(text: str) -> dict:
     """Checks mandatory sections and forbidden phrases."""
     issues = []
+    text_lower = profile_text(text).lower
 
     required = [
         ("Executive Summary", ["## Executive Summary", "## executive summary"]),
@@ -36,12 +52,12 @@ def eval_format_compliance(text: str) -> dict:
         ("Conclusion", ["## Conclusion", "# Conclusion", "## Summary", "## Final Thoughts"]),
     ]
     for name, variations in required:
-        if not any(v.lower() in text.lower() for v in variations):
+        if not any(v.lower() in text_lower for v in variations):
             issues.append(f"Missing '{name}' section")
 
     forbidden = ["As an AI", "language model", "I cannot", "I'm sorry"]
     for phrase in forbidden:
-        if phrase.lower() in text.lower():
+        if phrase.lower() in text_lower:
             issues.append(f"Contains forbidden: '{phrase}'")
 
     score = 1.0 if not issues else 0.0
@@ -50,7 +66,7 @@ def eval_format_compliance(text: str) -> dict:
 
 def eval_word_count(text: str) -> dict:
     """Checks minimum word count (500 words)."""
-    count = len(text.split())
+    count = profile_text(text).word_count
     if count >= 500:
         return {"score": 1.0, "reason": f"Word count: {count} (≥500)"}
     return {"score": round(count / 500.0, 2), "reason": f"Word count: {count} (<500 minimum)"}
@@ -58,9 +74,9 @@ def eval_word_count(text: str) -> dict:
 
 def eval_has_references(text: str) -> dict:
     """Checks for presence of URLs or citation markers."""
-    url_pattern = r"https?://\S+"
-    urls = re.findall(url_pattern, text)
-    citation_markers = re.findall(r"\[\d+\]", text)
+    profile = profile_text(text)
+    urls = profile.urls
+    citation_markers = profile.citations
 
     total = len(urls) + len(citation_markers)
     if total >= 2:
@@ -142,6 +158,106 @@ Output ONLY a single integer 1-10."""
         return {"score": 0.0, "reason": f"Failed: {e}"}
 
 
+class JudgeVerdict(TypedDict):
+    score: Annotated[int, ..., "Integer score from 1 (poor) to 10 (excellent)"]
+    reason: Annotated[str, ..., "One sentence justifying the score"]
+
+
+class CombinedVerdict(TypedDict):
+    """Scores for every report-quality criterion, from a single judge call."""
+    analytical_rigor: JudgeVerdict
+    readability: JudgeVerdict
+    factual_consistency: JudgeVerdict
+
+
+# Criterion → label used in score reasons
+COMBINED_CRITERIA = {
+    "analytical_rigor": "Analytical rigor",
+    "readability": "Readability",
+    "factual_consistency": "Factual consistency",
+}
+
+
+def eval_combined_judges(text: str, research_data: str) -> Dict[str, dict]:
+    """
+    LLM judge: all COMBINED_CRITERIA in one structured-output call.
+
+    Sends the report once instead of once per criterion. Returns a result
+    per criterion, in the same {"score", "reason"} shape as the separate
+    judges.
+    """
+    prompt = f"""Rate this report on each criterion below on a scale of 1-10.
+
+ANALYTICAL RIGOR:
+- Does it go beyond surface-level observations?
+- Are specific data points cited (numbers, percentages, dates)?
+- Is there a logical argument structure?
+- Are counter-arguments or risks addressed?
+
+READABILITY:
+- Is the language clear and jargon-free (or jargon explained)?
+- Do paragraphs flow logically from one to the next?
+- Is the report scannable (good headings, short paragraphs)?
+- Would a non-expert understand the key points?
+
+FACTUAL CONSISTENCY (against the source research):
+- Do claims in the report match the research data?
+- Are there hallucinated facts not in the source?
+- Are numbers and statistics accurately represented?
+
+Source Research:
+{research_data[:2000]}
+
+Report (first 3000 chars):
+{text[:3000]}"""
+    try:
+        verdict = llm_judge.with_structured_output(CombinedVerdict, method="json_schema").invoke(prompt)
+        return {
+            name: {
+                "score": min(max(float(verdict[name]["score"]), 0.0) / 10.0, 1.0),
+                "reason": f"{label}: {verdict[name]['score']}/10 — {verdict[name]['reason']}",
+            }
+            for name, label in COMBINED_CRITERIA.items()
+        }
+    except Exception as e:
+        return {name: {"score": 0.0, "reason": f"Failed: {e}"} for name in COMBINED_CRITERIA}
+
+
+# Every LLM judge, called as judge(output_text, research_data). They run
+# concurrently in run_eval_suite; register new judges here.
+LLM_JUDGES: Dict[str, Callable[[str, str], dict]] = {
+    "analytical_rigor": lambda text, research: eval_analytical_rigor(text),
+    "readability": lambda text, research: eval_readability(text),
+    "factual_consistency": eval_factual_consistency,
+}
+
+# What each judge in LLM_JUDGES reads when run separately ("text" and/or
+# "research"); only these go into its eval cache key.
+JUDGE_INPUTS: Dict[str, tuple] = {
+    "analytical_rigor": ("text",),
+    "readability": ("text",),
+    "factual_consistency": ("text", "research"),
+}
+
+# Version of each eval's logic or prompt, part of its eval cache key.
+# Bump an entry when you change that eval so stale results are not reused.
+EVAL_VERSIONS: Dict[str, str] = {
+    "format_compliance": "1",
+    "word_count_check": "1",
+    "has_references": "1",
+    "analytical_rigor": "1",
+    "readability": "1",
+    "factual_consistency": "1",
+}
+
+# Seconds each judge may take before it is scored as failed
+JUDGE_TIMEOUT_S = float(os.getenv("JUDGE_TIMEOUT_S", "60"))
+
+# "separate": one call per judge. "combined": one eval_combined_judges call
+# covers COMBINED_CRITERIA; any other registered judges still run separately.
+JUDGE_MODE = os.getenv("JUDGE_MODE", "separate").lower()
+
+
 # ════════════════════════════════════════════════════════════════
 # PERFORMANCE EVALUATIONS
 # ════════════════════════════════════════════════════════════════
@@ -162,6 +278,68 @@ def eval_cost(cost: float, threshold: float = 0.10) -> dict:
     }
 
 
+def judge_cache_inputs(name: str, output_text: str, research_data: str, mode: str) -> dict:
+    """
+    The inputs judge `name` reads in `mode`, for its eval cache key.
+
+    A criterion covered by the combined call reads the report and the
+    research whichever criterion it is, and its verdict depends on the mode.
+    """
+    if mode == "combined" and name in COMBINED_CRITERIA:
+        return {"text": output_text, "research": research_data, "model": llm_judge.model_name, "mode": mode}
+    available = {"text": output_text, "research": research_data}
+    inputs = {field: available[field] for field in JUDGE_INPUTS.get(name, ("text", "research"))}
+    return {**inputs, "model": llm_judge.model_name}
+
+
+def start_llm_judges(
+    output_text: str,
+    research_data: str,
+    mode: str = None,
+    names: Optional[List[str]] = None,
+) -> Callable[[], Dict[str, dict]]:
+    """
+    Submits the LLM judges to a thread pool and returns a function that
+    waits for them, yielding {name: result} in LLM_JUDGES order.
+
+    `mode` defaults to JUDGE_MODE ("separate" unless set): one call per
+    judge. In "combined" mode one eval_combined_judges call covers
+    COMBINED_CRITERIA. `names` restricts the run to those judges
+    (default: all). A judge with no verdict within JUDGE_TIMEOUT_S is
+    scored 0, and the pool is released without waiting for it.
+    """
+    wanted = [name for name in LLM_JUDGES if names is None or name in names]
+    if not wanted:
+        return lambda: {}
+
+    # Each job returns {criterion: result} for the criteria it covers
+    jobs: Dict[tuple, Callable[[], Dict[str, dict]]] = {}
+    separate = {name: LLM_JUDGES[name] for name in wanted}
+    if (mode or JUDGE_MODE) == "combined" and any(name in COMBINED_CRITERIA for name in wanted):
+        jobs[tuple(COMBINED_CRITERIA)] = lambda: eval_combined_judges(output_text, research_data)
+        separate = {name: judge for name, judge in separate.items() if name not in COMBINED_CRITERIA}
+    for name, judge in separate.items():
+        jobs[(name,)] = lambda name=name, judge=judge: {name: judge(output_text, research_data)}
+
+    # Judge threads copy the caller's context, so their calls count towards its usage scope
+    pool = ContextThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="judge")
+    started = time.monotonic()
+    pending = {names: pool.submit(job) for names, job in jobs.items()}
+
+    def collect() -> Dict[str, dict]:
+        judged: Dict[str, dict] = {}
+        for names, future in pending.items():
+            try:
+                judged.update(future.result(timeout=max(started + JUDGE_TIMEOUT_S - time.monotonic(), 0.0)))
+            except FutureTimeout:
+                judged.update({name: {"score": 0.0, "reason": f"Failed: no verdict within {JUDGE_TIMEOUT_S:g}s"}
+                               for name in names})
+        pool.shutdown(wait=False, cancel_futures=True)  # don't hold the run for a timed-out judge
+        return {name: judged[name] for name in wanted}
+
+    return collect
+
+
 # ════════════════════════════════════════════════════════════════
 # MASTER EVAL RUNNER
 # ════════════════════════════════════════════════════════════════
@@ -172,33 +350,68 @@ def run_eval_suite(
     research_data: str,
     latency: float,
     cost: float,
-):
-    """Runs all 8 evaluations and posts scores to Langfuse."""
+) -> Dict[str, float]:
+    """
+    Runs the deterministic, LLM-judge and performance evals and queues their
+    scores on the shared ScoreBatcher. Scores are submitted in the background;
+    callers flush once at the end with `close_score_batcher()`. Returns the
+    scores by eval name, for the local results store.
+
+    Results for unchanged inputs are reused from the eval cache, keyed by
+    eval name, EVAL_VERSIONS entry and a hash of what the eval reads; only
+    the latency and cost checks are always recomputed. `cost` is the run's
+    LLM spend in USD (see src/usage.py); the judges' own usage is printed
+    separately and not included in it.
+    """
+    deterministic = {
+        "format_compliance": eval_format_compliance,
+        "word_count_check": eval_word_count,
+        "has_references": eval_has_references,
+    }
+    performance = {
+        "latency_check": lambda: eval_latency(latency),
+        "cost_check": lambda: eval_cost(cost),
+    }
+
     print(f"\n{'='*60}")
-    print(f"Running 8 evaluations for Trace: {trace_id}")
+    print(f"Running {len(deterministic) + len(LLM_JUDGES) + len(performance)} evaluations for Trace: {trace_id}")
     print(f"{'='*60}")
 
-    evals = [
-        ("format_compliance", eval_format_compliance(output_text)),
-        ("word_count_check", eval_word_count(output_text)),
-        ("has_references", eval_has_references(output_text)),
-        ("analytical_rigor", eval_analytical_rigor(output_text)),
-        ("readability", eval_readability(output_text)),
-        ("factual_consistency", eval_factual_consistency(output_text, research_data)),
-        ("latency_check", eval_latency(latency)),
-        ("cost_check", eval_cost(cost)),
-    ]
-
+    cache = get_eval_cache()
+    mode = JUDGE_MODE
+    text_inputs = {"text": output_text}
+    keys = {name: eval_key(name, EVAL_VERSIONS.get(name, "1"), text_inputs)
+            for name in deterministic}
+    keys.update({name: eval_key(name, EVAL_VERSIONS.get(name, "1"),
+                                judge_cache_inputs(name, output_text, research_data, mode))
+                 for name in LLM_JUDGES})
+    cached = {}
+    if cache:
+        cached = {name: result for name, key in keys.items() if (result := cache.lookup(key)) is not None}
+
+    # Judges go out first; the deterministic evals run while they are in flight
+    with usage_scope() as judge_usage:
+        collect_judges = start_llm_judges(output_text, research_data, mode=mode,
+                                          names=[name for name in LLM_JUDGES if name not in cached])
+        fresh = {name: check(output_text) for name, check in deterministic.items() if name not in cached}
+        fresh.update(collect_judges())
+    if cache:
+        for name, result in fresh.items():
+            cache.update(keys[name], name, result)
+
+    evals = [(name, cached.get(name) or fresh[name]) for name in [*deterministic, *LLM_JUDGES]]
+    evals += [(name, check()) for name, check in performance.items()]
+
+    batcher = get_score_batcher(langfuse)
     for name, result in evals:
-        langfuse.create_score(
-            trace_id=trace_id,
-            name=name,
-            value=result["score"],
-            comment=result["reason"],
-        )
+        batcher.add(trace_id=trace_id, name=name, value=result["score"], comment=result["reason"])
         status = "✅" if result["score"] >= 0.7 else "⚠️" if result["score"] >= 0.4 else "❌"
-        print(f"  {status} {name}: {result['score']:.2f}  ({result['reason']})")
+        reused = "  [cached]" if name in cached else ""
+        print(f"  {status} {name}: {result['score']:.2f}  ({result['reason']}){reused}")
 
-    langfuse.flush()
+    judged = scope_entry("judges", judge_usage)
+    if judged:
+        print(f"  Judge usage: {format_usage(judged)}")
     print(f"{'='*60}")
-    print(f"All 8 scores submitted to Langfuse.\n")
+    print(f"All {len(evals)} scores queued for Langfuse ({len(cached)} reused from the eval cache).\n")
+    return {name: result["score"] for name, result in evals}
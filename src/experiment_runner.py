@@ -0,0 +1,342 @@
+"""
+Worker-pool executor for dataset experiments.
+
+Items run on up to `workers` threads (or event-loop tasks). `stream` pulls
+items lazily from any iterable, reading at most two per worker ahead of
+what has finished. That is the backpressure that lets a JSONL file of any
+size run in constant memory. It yields results as items complete, while
+`run` collects them in item order. An item that fails with a rate-limit error is
+retried with exponential backoff and jitter, honouring Retry-After when the
+API sends one. Every rate-limit error also signals the shared
+`AdaptiveLimiter`. The limiter halves the number of items allowed in flight
+and pauses new starts; each success then adds back a fraction of a slot
+(AIMD). The pool runs as fast as the API allows, with no fixed sleeps.
+"""
+
+import time
+import random
+import asyncio
+import itertools
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_S = 2.0
+MAX_BACKOFF_S = 60.0
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """True for HTTP 429 / rate-limit errors, including ones wrapped by another exception."""
+    while error is not None:
+        response = getattr(error, "response", None)
+        status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+        if status == 429:
+            return True
+        text = f"{type(error).__name__} {error}".lower()
+        if "ratelimit" in text or "rate limit" in text or "too many requests" in text:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from the error's Retry-After header, if it carries one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_s: float = DEFAULT_BACKOFF_S, error: BaseException = None) -> float:
+    """`base_s * 2^attempt`, capped at MAX_BACKOFF_S, with full jitter over its upper half."""
+    delay = min(base_s * 2 ** attempt, MAX_BACKOFF_S)
+    delay = random.uniform(delay / 2, delay)
+    hinted = retry_after(error) if error is not None else None
+    return max(delay, hinted or 0.0)
+
+
+class AdaptiveLimiter:
+    """
+    Bounds how many items are in flight, shrinking the bound on rate limits.
+
+    Starts at `max_concurrency`. `on_rate_limit` halves the limit (never
+    below 1) and blocks new starts for the backoff delay. `on_success` grows
+    the limit by 1/limit, about one slot per window of successes, until it is
+    back at `max_concurrency`. Thread-safe; async callers poll `try_acquire`
+    so a waiting item never ties up a worker thread.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._stats = {"rate_limited": 0, "min_limit": self.max_concurrency}
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause <= 0 and self._in_flight < int(self.limit):
+                    break
+                self._cond.wait(timeout=pause if pause > 0 else None)
+            self._in_flight += 1
+
+    def try_acquire(self) -> float:
+        """Takes a slot and returns 0, or returns how long to wait before trying again."""
+        with self._cond:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                return pause
+            if self._in_flight >= int(self.limit):
+                return 0.05
+            self._in_flight += 1
+            return 0.0
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.limit = min(self.limit + 1.0 / self.limit, float(self.max_concurrency))
+            self._cond.notify_all()
+
+    def on_rate_limit(self, pause_s: float) -> None:
+        with self._cond:
+            self.limit = max(self.limit / 2.0, 1.0)
+            self._paused_until = max(self._paused_until, time.monotonic() + pause_s)
+            self._stats["rate_limited"] += 1
+            self._stats["min_limit"] = min(self._stats["min_limit"], int(self.limit))
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {**self._stats, "limit": int(self.limit)}
+
+
+class Progress:
+    """Prints `done/total`, items/min and an ETA each time an item finishes (no ETA if the total is unknown)."""
+
+    def __init__(self, total: Optional[int], limiter: Optional[AdaptiveLimiter] = None):
+        self.total = total
+        self.limiter = limiter
+        self.done = 0
+        self.failed = 0
+        self.retries = 0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def retried(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def item_done(self, ok: bool) -> None:
+        with self._lock:
+            self.done += 1
+            self.failed += int(not ok)
+            summary = self.summary()
+        line = (f"  ⏱  {summary['done']}{f'/{self.total}' if self.total is not None else ''} items"
+                + (f" ({summary['failed']} failed)" if summary["failed"] else "")
+                + f" · {summary['items_per_min']:.1f} items/min")
+        if self.total is not None:
+            line += f" · ETA {_format_eta(summary['eta_s'])}"
+        if self.limiter:
+            line += f" · limit {self.limiter.stats()['limit']}/{self.limiter.max_concurrency}"
+        print(line)
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = time.monotonic() - self._start
+        rate = self.done / elapsed * 60.0 if elapsed > 0 else 0.0
+        remaining = self.total - self.done if self.total is not None else 0
+        return {
+            "done": self.done,
+            "failed": self.failed,
+            "retries": self.retries,
+            "wall_s": elapsed,
+            "items_per_min": rate,
+            "eta_s": remaining / rate * 60.0 if rate else 0.0,
+        }
+
+
+def _format_eta(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{secs:02d}s"
+
+
+class ExperimentExecutor:
+    """
+    Runs `process(index, item, attempt)` for every item on a worker pool.
+
+    An exception that escapes `process` is retried with backoff if it is a
+    rate-limit error and retries remain. Otherwise `fail(index, item, error)`
+    supplies that item's result. `attempt` counts from 0, so `process` can
+    resume rather than restart on a retry.
+
+        executor = ExperimentExecutor(workers=8)
+        results = executor.run(items, process, fail)
+        results = await executor.arun(items, aprocess, fail)
+        for index, result in executor.stream(reader, process, fail): ...
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_s: float = DEFAULT_BACKOFF_S,
+    ):
+        self.workers = max(workers, 1)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.limiter = AdaptiveLimiter(self.workers)
+        self.progress: Optional[Progress] = None
+
+    def _should_retry(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Backoff delay before the next attempt, or None if `error` is final."""
+        if attempt >= self.max_retries or not is_rate_limited(error):
+            return None
+        delay = backoff_delay(attempt, self.backoff_s, error)
+        self.limiter.on_rate_limit(delay)
+        if self.progress:
+            self.progress.retried()
+        print(f"  ↻ Rate limited, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """Calls `fn` with the same rate-limit retry policy, for a step inside an item."""
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._should_retry(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def _run_one(self, index: int, item: Any, process: Callable, fail: Callable) -> Any:
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                result = process(index, item, attempt)
+                self.limiter.on_success()
+                self.progress.item_done(ok=True)
+                return result
+            except Exception as e:
+                delay = self._should_retry(e, attempt)
+                if delay is None:
+                    self.progress.item_done(ok=False)
+                    return fail(index, item, e)
+            finally:
+                self.limiter.release()
+            time.sleep(delay)
+            attempt += 1
+
+    def _indexed(self, index: int, item: Any, process: Callable, fail: Callable) -> Tuple[int, Any]:
+        return index, self._run_one(index, item, process, fail)
+
+    def stream(
+        self,
+        items: Iterable[Any],
+        process: Callable[[int, Any, int], Any],
+        fail: Callable[[int, Any, BaseException], Any],
+    ) -> Iterator[Tuple[int, Any]]:
+        """Runs items on a thread pool, yielding (index, result) as each one finishes."""
+        self.progress = Progress(len(items) if hasattr(items, "__len__") else None, self.limiter)
+        source = enumerate(items)
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="experiment") as pool:
+            def refill() -> None:
+                for index, item in itertools.islice(source, 2 * self.workers - len(pending)):
+                    pending.add(pool.submit(self._indexed, index, item, process, fail))
+
+            refill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+                refill()  # keep the workers busy while the caller handles these results
+                for future in done:
+                    yield future.result()
+
+    def run(
+        self,
+        items: Iterable[Any],
+        process: Callable[[int, Any, int], Any],
+        fail: Callable[[int, Any, BaseException], Any],
+    ) -> List[Any]:
+        """Like `stream`, but returns every result, in item order."""
+        return [result for _, result in sorted(self.stream(items, process, fail), key=lambda r: r[0])]
+
+    async def _arun_one(self, index: int, item: Any, process: Callable, fail: Callable) -> Any:
+        attempt = 0
+        while True:
+            while (wait := self.limiter.try_acquire()) > 0:
+                await asyncio.sleep(wait)
+            try:
+                result = await process(index, item, attempt)
+                self.limiter.on_success()
+                self.progress.item_done(ok=True)
+                return result
+            except Exception as e:
+                delay = self._should_retry(e, attempt)
+                if delay is None:
+                    self.progress.item_done(ok=False)
+                    return fail(index, item, e)
+            finally:
+                self.limiter.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _aindexed(self, index: int, item: Any, process: Callable, fail: Callable) -> Tuple[int, Any]:
+        return index, await self._arun_one(index, item, process, fail)
+
+    async def astream(
+        self,
+        items: Iterable[Any],
+        process: Callable[[int, Any, int], Awaitable[Any]],
+        fail: Callable[[int, Any, BaseException], Any],
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """Async variant of `stream`: one task per in-flight item on the running event loop."""
+        self.progress = Progress(len(items) if hasattr(items, "__len__") else None, self.limiter)
+        source = enumerate(items)
+        pending = set()
+
+        def refill() -> None:
+            for index, item in itertools.islice(source, 2 * self.workers - len(pending)):
+                pending.add(asyncio.ensure_future(self._aindexed(index, item, process, fail)))
+
+        refill()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            refill()
+            for task in done:
+                yield task.result()
+
+    async def arun(
+        self,
+        items: Iterable[Any],
+        process: Callable[[int, Any, int], Awaitable[Any]],
+        fail: Callable[[int, Any, BaseException], Any],
+    ) -> List[Any]:
+        """Async variant of `run`."""
+        results = [r async for r in self.astream(items, process, fail)]
+        return [result for _, result in sorted(results, key=lambda r: r[0])]
+
+    def summary(self) -> Dict[str, float]:
+        """Progress totals plus limiter stats for the last run or stream."""
+        return {**(self.progress.summary() if self.progress else {}), **self.limiter.stats()}
+
+
+def format_executor_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"{stats['done']} items in {stats['wall_s']:.1f}s ({stats['items_per_min']:.1f} items/min), "
+        f"{stats['retries']} retries after {stats['rate_limited']} rate limits, "
+        f"concurrency dipped to {stats['min_limit']}"
+    )
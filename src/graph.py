@@ -1,20 +1,35 @@
+from langchain_core.runnables import Runnable, RunnableConfig, ensure_config
 from langgraph.graph import StateGraph, END
+
 from src.states import AgentState
+from src.checkpoint import get_checkpointer
 from src.agents import (
     researcher_node,
+    aresearcher_node,
     analyst_node,
+    aanalyst_node,
     data_enricher_node,
+    adata_enricher_node,
     writer_node,
+    awriter_node,
     fact_checker_node,
+    afact_checker_node,
     editor_node,
+    aeditor_node,
     seo_optimizer_node,
+    aseo_optimizer_node,
     compliance_reviewer_node,
+    acompliance_reviewer_node,
     exec_summarizer_node,
+    aexec_summarizer_node,
     translator_node,
+    atranslator_node,
     quality_gate_node,
+    aquality_gate_node,
 )
 
 
+
 # ─── Conditional Routing Functions ───────────────────────────
 
 def route_fact_checker(state: AgentState) -> str:
@@ -35,17 +50,17 @@ def route_fact_checker(state: AgentState) -> str:
 
 
 def route_compliance(state: AgentState) -> str:
-    """Route based on compliance result: loop back to editor or proceed to summarizer."""
+    """Route based on compliance result: loop back to editor or proceed to translator."""
     compliance_notes = state.get("compliance_notes", "")
     comp_rev = state.get("compliance_revision_count", 0)
 
     if not compliance_notes or compliance_notes == "None":
-        return "exec_summarizer"
+        return "translator"
 
     # Max 2 compliance loops
     if comp_rev >= 2:
-        print("  [Router] Max compliance revisions reached, proceeding to summarizer")
-        return "exec_summarizer"
+        print("  [Router] Max compliance revisions reached, proceeding to translator")
+        return "translator"
 
     print(f"  [Router] Compliance failed (revision {comp_rev}), looping to editor")
     return "editor"
@@ -68,22 +83,64 @@ def route_quality_gate(state: AgentState) -> str:
     return "editor"
 
 
+# ─── Join Node ───────────────────────────────────────────────
+
+def review_join_node(state: AgentState) -> dict:
+    """Barrier for the SEO / Compliance / Exec Summarizer fan-out.
+
+    The three review branches only read ``draft`` and write disjoint keys
+    (``iteration_log`` is an append reducer), so LangGraph merges their
+    updates deterministically before this node runs. Nothing to add here —
+    it only gives the compliance router a single place to fire from.
+    """
+    return {}
+
+
 # ─── Build the Graph ─────────────────────────────────────────
 
+class AgentNode(Runnable):
+    """
+    A graph node with both bodies: ``app.invoke`` runs ``func``,
+    ``app.ainvoke`` awaits ``afunc`` on the event loop instead of a thread.
+
+    Both receive the node's ``config``. The node does not trace itself,
+    just as ``add_node`` leaves plain functions untraced, so each agent
+    still shows up as a single span (``RunnableLambda`` would nest a
+    second one inside it).
+    """
+
+    def __init__(self, name: str, func, afunc):
+        self.name = name
+        self.func = func
+        self.afunc = afunc
+
+    def invoke(self, input, config: RunnableConfig = None, **kwargs):
+        return self.func(input, ensure_config(config))
+
+    async def ainvoke(self, input, config: RunnableConfig = None, **kwargs):
+        return await self.afunc(input, ensure_config(config))
+
+
+def agent_node(name: str, func, afunc) -> AgentNode:
+    """Register a node with a sync and an async body (see AgentNode)."""
+    return AgentNode(name, func, afunc)
+
+
 workflow = StateGraph(AgentState)
 
-# Add all 11 nodes
-workflow.add_node("researcher", researcher_node)
-workflow.add_node("analyst", analyst_node)
-workflow.add_node("data_enricher", data_enricher_node)
-workflow.add_node("writer", writer_node)
-workflow.add_node("fact_checker", fact_checker_node)
-workflow.add_node("editor", editor_node)
-workflow.add_node("seo_optimizer", seo_optimizer_node)
-workflow.add_node("compliance_reviewer", compliance_reviewer_node)
-workflow.add_node("exec_summarizer", exec_summarizer_node)
-workflow.add_node("translator", translator_node)
-workflow.add_node("quality_gate", quality_gate_node)
+# Add all 11 agent nodes (+ the review join barrier)
+workflow.add_node("researcher", agent_node("researcher", researcher_node, aresearcher_node))
+workflow.add_node("analyst", agent_node("analyst", analyst_node, aanalyst_node))
+workflow.add_node("data_enricher", agent_node("data_enricher", data_enricher_node, adata_enricher_node))
+workflow.add_node("writer", agent_node("writer", writer_node, awriter_node))
+workflow.add_node("fact_checker", agent_node("fact_checker", fact_checker_node, afact_checker_node))
+workflow.add_node("editor", agent_node("editor", editor_node, aeditor_node))
+workflow.add_node("seo_optimizer", agent_node("seo_optimizer", seo_optimizer_node, aseo_optimizer_node))
+workflow.add_node("compliance_reviewer", agent_node("compliance_reviewer", compliance_reviewer_node, acompliance_reviewer_node))
+workflow.add_node("exec_summarizer", agent_node("exec_summarizer", exec_summarizer_node, aexec_summarizer_node))
+workflow.add_node("translator", agent_node("translator", translator_node, atranslator_node))
+workflow.add_node("quality_gate", agent_node("quality_gate", quality_gate_node, aquality_gate_node))
+workflow.add_node("review_join", review_join_node)
 
 # ─── Edges ───────────────────────────────────────────────────
 # Linear flow: Researcher → Analyst → Data Enricher → Writer
@@ -102,22 +159,24 @@ workflow.add_conditional_edges(
     {"writer": "writer", "editor": "editor"},
 )
 
-# Editor → SEO Optimizer
+# Fan-out: Editor → SEO Optimizer | Compliance Reviewer | Exec Summarizer
+# All three only read the edited draft, so they run as concurrent branches.
+# If compliance loops back to the editor, the whole fan-out re-runs on the
+# revised draft, so the summary always matches the published text.
 workflow.add_edge("editor", "seo_optimizer")
+workflow.add_edge("editor", "compliance_reviewer")
+workflow.add_edge("editor", "exec_summarizer")
 
-# SEO → Compliance Reviewer
-workflow.add_edge("seo_optimizer", "compliance_reviewer")
+# Join: wait for all three branches before routing
+workflow.add_edge(["seo_optimizer", "compliance_reviewer", "exec_summarizer"], "review_join")
 
-# Conditional 2: Compliance → Editor (loop) or Exec Summarizer
+# Conditional 2: Compliance → Editor (loop) or Translator
 workflow.add_conditional_edges(
-    "compliance_reviewer",
+    "review_join",
     route_compliance,
-    {"editor": "editor", "exec_summarizer": "exec_summarizer"},
+    {"editor": "editor", "translator": "translator"},
 )
 
-# Exec Summarizer → Translator
-workflow.add_edge("exec_summarizer", "translator")
-
 # Translator → Quality Gate
 workflow.add_edge("translator", "quality_gate")
 
@@ -129,4 +188,8 @@ workflow.add_conditional_edges(
 )
 
 # ─── Compile ─────────────────────────────────────────────────
-app = workflow.compile()
+# State is checkpointed to SQLite after every step, keyed by the run's
+# thread_id (we use the trace id), so a failed run can resume from the last
+# completed node instead of starting over at the researcher.
+checkpointer = get_checkpointer()
+app = workflow.compile(checkpointer=checkpointer)
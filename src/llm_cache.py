@@ -0,0 +1,176 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import warnings
+from functools import lru_cache
+from typing import Dict, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+from src.cassette import active_cassette
+
+DEFAULT_CACHE_PATH = ".llm_cache.sqlite"
+DEFAULT_MAX_MB = 256
+DEFAULT_TTL_HOURS = 24 * 7
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Content address for an LLM call.
+
+    LangChain passes the serialized message list as `prompt` and the model
+    config (model, temperature, bound tools, stop words) as `llm_string`,
+    so hashing both covers everything that can change the response.
+    """
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    On-disk LLM response cache with TTL and size-bounded LRU eviction.
+
+    Plugs into any LangChain chat model via `ChatOpenAI(cache=...)`. Entries
+    expire after `ttl_seconds`; once the stored payloads exceed `max_bytes`,
+    the least recently read entries are evicted first.
+
+    The cache stands aside while a cassette is recording or replaying, so the
+    cassette sees every request the pipeline makes.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache (last_access)")
+        self._conn.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if active_cassette():
+            return None
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # `loads` is flagged as beta
+            generations = loads(row[0])
+        for gen in generations:
+            message = getattr(gen, "message", None)
+            if message is not None:
+                message.response_metadata["cache_hit"] = True
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if active_cassette():
+            return
+        key = cache_key(prompt, llm_string)
+        value = dumps(list(return_val))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drops expired entries, then least-recently-read ones until under max_bytes."""
+        expired = self._conn.execute(
+            "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.evictions += expired
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_access ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for this process plus the current on-disk footprint."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> Optional[SQLiteLLMCache]:
+    """
+    Returns the shared response cache for deterministic (temperature 0) models.
+
+    Configured via env vars:
+        LLM_CACHE           — set to "off" to disable caching entirely.
+        LLM_CACHE_PATH      — SQLite file (default ./.llm_cache.sqlite).
+        LLM_CACHE_MAX_MB    — size bound before LRU eviction (default 256).
+        LLM_CACHE_TTL_HOURS — entry lifetime (default 168, one week).
+
+    Returns:
+        The cache instance, or None when caching is disabled.
+    """
+    if os.getenv("LLM_CACHE", "").lower() in ("off", "0", "false"):
+        return None
+    return SQLiteLLMCache(
+        path=os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH,
+        max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+        ttl_seconds=float(os.getenv("LLM_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)) * 3600,
+    )
+
+
+def format_cache_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"{stats['hits']} hits / {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries, "
+        f"{stats['bytes'] / 1024:.0f} KB on disk"
+    )
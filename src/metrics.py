@@ -0,0 +1,74 @@
+import re
+import math
+from typing import Dict, List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100). Returns 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def throughput_summary(latencies: List[float], wall_time: float) -> Dict[str, float]:
+    """
+    Aggregate throughput for a batch of pipeline runs.
+
+    Args:
+        latencies: Per-run latencies in seconds (successful runs only).
+        wall_time: Wall-clock seconds for the whole batch.
+
+    Returns:
+        Dict with runs, runs_per_min, p50/p95/max latency and the mean.
+    """
+    runs = len(latencies)
+    return {
+        "runs": runs,
+        "wall_time": wall_time,
+        "runs_per_min": runs / wall_time * 60.0 if wall_time > 0 else 0.0,
+        "p50_latency": percentile(latencies, 50),
+        "p95_latency": percentile(latencies, 95),
+        "max_latency": max(latencies) if latencies else 0.0,
+        "mean_latency": sum(latencies) / runs if runs else 0.0,
+    }
+
+
+# Review gates that can send a draft back for another pass, keyed by the
+# prefix their nodes write to `iteration_log`.
+LOOP_GATES = ("fact_checker", "compliance", "quality_gate")
+
+
+def loop_counts(iteration_log: List[str]) -> Dict[str, int]:
+    """
+    Feedback-loop iterations per review gate.
+
+    Each gate logs `<gate>_pass_<n>_<verdict>`, where `n` only goes up when
+    that gate itself sent the draft back. A gate can run again at the same
+    `n` when a later gate loops through it (the quality gate's editor pass
+    re-runs compliance), so the loops are the distinct pass numbers minus 1,
+    not the number of entries.
+    """
+    counts = {}
+    for gate in LOOP_GATES:
+        pattern = re.compile(rf"{gate}_pass_(\d+)_")
+        passes = {m.group(1) for entry in iteration_log if (m := pattern.match(entry))}
+        counts[gate] = max(len(passes) - 1, 0)
+    return counts
+
+
+def tool_time_saved(tool_timings: List[dict]) -> Dict[str, float]:
+    """
+    Totals over a run's concurrent tool batches.
+
+    `serial_s` is what the calls would have taken one after another and
+    `saved_s` how much of that running them concurrently took off the wall.
+    """
+    return {
+        "batches": len(tool_timings),
+        "calls": sum(t["calls"] for t in tool_timings),
+        "wall_s": sum(t["wall_s"] for t in tool_timings),
+        "serial_s": sum(t["serial_s"] for t in tool_timings),
+        "saved_s": sum(t["saved_s"] for t in tool_timings),
+    }
@@ -3,6 +3,8 @@ from typing import List, Dict, Optional
 
 from openai import OpenAI
 
+from src.cassette import http_client
+
 
 def get_client(
     api_key: Optional[str] = None,
@@ -11,6 +13,9 @@ def get_client(
     """
     Returns a configured OpenAI client.
 
+    Requests go through the cassette transport, so `--record` / `--replay`
+    also cover calls made via invoke().
+
     Args:
         api_key:  OpenAI API key. Falls back to OPENAI_API_KEY env var if None.
         base_url: Custom endpoint URL. Falls back to OPENAI_BASE_URL env var,
@@ -22,7 +27,7 @@ def get_client(
     resolved_key = api_key or os.getenv("OPENAI_API_KEY")
     resolved_url = base_url or os.getenv("OPENAI_BASE_URL") or None
 
-    return OpenAI(api_key=resolved_key, base_url=resolved_url)
+    return OpenAI(api_key=resolved_key, base_url=resolved_url, http_client=http_client())
 
 
 def invoke(
@@ -0,0 +1,267 @@
+import zlib
+import heapq
+import bisect
+import hashlib
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.text_profile import profile_text
+
+SHINGLE_SIZE = 5
+NUM_BINS = 64            # MinHash signature length
+BANDS = 16               # LSH bands of NUM_BINS // BANDS rows; ~0.5 Jaccard threshold
+PASSAGE_TOKENS = 64      # window over which passages are signed and compared
+PASSAGE_STRIDE = 32      # sources overlap by half; draft windows don't overlap at all
+MAX_BUCKET = 8           # bands shared by more passages than this are boilerplate, not evidence
+INDEX_CACHE_SIZE = 16
+
+_BIN_BITS = NUM_BINS.bit_length() - 1   # NUM_BINS is a power of two
+_BIN_MASK = NUM_BINS - 1
+# Shingle hashes are signed 64-bit, so in-bin values lie in ±2**(63 - _BIN_BITS);
+# densified values are shifted past that range and can't collide with real ones.
+_DENSIFY_OFFSET = 1 << (64 - _BIN_BITS)
+
+
+def shingle_hashes(tokens: Sequence[str], n: int = SHINGLE_SIZE) -> List[int]:
+    """
+    64-bit hash of every n-token window, in position order.
+
+    Tokens are mapped to CRC32 ids once per distinct token and windows are
+    hashed as int tuples (xxHash-mixed by CPython, and not salted per process
+    the way str hashes are), so no joined n-gram strings are ever built.
+    """
+    if len(tokens) < n:
+        return []
+    vocab = {token: zlib.crc32(token.encode("utf-8")) for token in set(tokens)}
+    ids = [vocab[token] for token in tokens]
+    return list(map(hash, zip(*(ids[i:] for i in range(n)))))
+
+
+def minhash_signature(hashes: Iterable[int]) -> Optional[Tuple[int, ...]]:
+    """
+    One-permutation MinHash: the low bits of each hash pick a bin and the
+    signature keeps the minimum of the remaining bits per bin.
+
+    Empty bins borrow the nearest filled bin to their right (rotation
+    densification), so short passages still get comparable signatures.
+    Returns None for an empty set.
+    """
+    mins: Dict[int, int] = {}
+    for h in hashes:
+        b, v = h & _BIN_MASK, h >> _BIN_BITS
+        if b not in mins or v < mins[b]:
+            mins[b] = v
+    if not mins:
+        return None
+
+    filled = sorted(mins)
+    sig = []
+    for b in range(NUM_BINS):
+        v = mins.get(b)
+        if v is None:
+            i = bisect.bisect(filled, b)
+            donor = filled[i] if i < len(filled) else filled[0]
+            v = mins[donor] + ((donor - b) & _BIN_MASK) * _DENSIFY_OFFSET
+        sig.append(v)
+    return tuple(sig)
+
+
+def estimate_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """MinHash estimate of the Jaccard similarity of two shingle sets."""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures: keys sharing any full band become candidates.
+
+    Buckets holding more than `max_bucket` keys are skipped at query time —
+    a band shared by that many passages is repeated boilerplate — which keeps
+    each query bounded however repetitive the corpus is.
+    """
+
+    def __init__(self, bands: int = BANDS, num_bins: int = NUM_BINS, max_bucket: int = MAX_BUCKET):
+        self.bands = bands
+        self.rows = num_bins // bands
+        self.max_bucket = max_bucket
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+
+    def _band_keys(self, sig: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        rows = self.rows
+        return [(band, sig[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def add(self, key: int, sig: Tuple[int, ...]) -> None:
+        for band_key in self._band_keys(sig):
+            self._buckets[band_key].append(key)
+
+    def query(self, sig: Tuple[int, ...]) -> Counter:
+        """Candidate keys → number of bands they share with `sig`."""
+        hits: List[int] = []
+        for band_key in self._band_keys(sig):
+            bucket = self._buckets.get(band_key)
+            if bucket and len(bucket) <= self.max_bucket:
+                hits.extend(bucket)
+        return Counter(hits)
+
+
+def _windows(count: int, stride: int) -> Iterable[Tuple[int, int]]:
+    """Shingle-index ranges of the passages covering `count` shingles."""
+    if count == 0:
+        return
+    start = 0
+    while True:
+        end = min(start + PASSAGE_TOKENS, count)
+        yield start, end
+        if end == count:
+            return
+        start += stride
+
+
+@dataclass
+class Passage:
+    doc: int
+    start: int                 # token offset of the first shingle
+    end: int                   # token offset one past the last token
+    shingles: Set[int]
+    signature: Tuple[int, ...]
+
+
+@dataclass
+class CandidateMatch:
+    """A source passage the LSH index paired with part of the draft."""
+    doc: int
+    passage: Passage
+    similarity: float          # best MinHash Jaccard estimate against a draft window
+    shared: int = 0            # exact shared shingles with the whole draft
+    spans: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PlagiarismReport:
+    matching: int
+    total: int
+    candidates: List[CandidateMatch]
+    sample_matches: List[str]
+
+    @property
+    def overlap_ratio(self) -> float:
+        return round(self.matching / max(self.total, 1), 3)
+
+    @property
+    def verdict(self) -> str:
+        if self.overlap_ratio > 0.3:
+            return "HIGH — significant overlap detected"
+        elif self.overlap_ratio > 0.1:
+            return "MODERATE — some overlap detected"
+        return "LOW — minimal overlap"
+
+
+class SourceIndex:
+    """
+    Shingles, MinHash signatures and an LSH index over a topic's source documents.
+
+    The exact overlap score uses the union of all source shingles (one set
+    intersection, linear in the draft); the LSH index narrows attribution
+    down to the few source passages the draft actually resembles.
+    """
+
+    def __init__(self, documents: Sequence[str]):
+        self.documents = list(documents)
+        self.tokens = [profile_text(doc).tokens for doc in self.documents]
+        self.shingles: Set[int] = set()
+        self.passages: List[Passage] = []
+        self.lsh = LSHIndex()
+
+        for doc, tokens in enumerate(self.tokens):
+            hashes = shingle_hashes(tokens)
+            self.shingles.update(hashes)
+            for start, end in _windows(len(hashes), PASSAGE_STRIDE):
+                window = hashes[start:end]
+                signature = minhash_signature(window)
+                self.lsh.add(len(self.passages), signature)
+                self.passages.append(Passage(doc, start, end + SHINGLE_SIZE - 1, set(window), signature))
+
+    def check(self, draft: str, top_k: int = 3, max_samples: int = 5) -> PlagiarismReport:
+        tokens = profile_text(draft).tokens
+        hashes = shingle_hashes(tokens)
+        draft_set = set(hashes)
+        matching = draft_set & self.shingles
+
+        # Most bands each source passage shares with any draft window, and that window
+        best: Dict[int, Tuple[int, Tuple[int, ...]]] = {}
+        for start, end in _windows(len(hashes), PASSAGE_TOKENS):
+            signature = minhash_signature(hashes[start:end])
+            for key, bands in self.lsh.query(signature).items():
+                if key not in best or bands > best[key][0]:
+                    best[key] = (bands, signature)
+
+        # Only the strongest LSH candidates are verified exactly
+        shortlist = heapq.nsmallest(top_k * 4, best, key=lambda k: (-best[k][0], k))
+        candidates = []
+        for key in shortlist:
+            passage = self.passages[key]
+            similarity = estimate_similarity(best[key][1], passage.signature)
+            candidates.append(CandidateMatch(passage.doc, passage, similarity, len(draft_set & passage.shingles)))
+        candidates.sort(key=lambda c: (-c.shared, -c.similarity, c.doc, c.passage.start))
+        candidates = candidates[:top_k]
+
+        # Exact overlap: draft positions whose shingle appears in the sources
+        positions = [i for i, h in enumerate(hashes) if h in matching]
+        for candidate in candidates:
+            shingles = candidate.passage.shingles
+            candidate.spans = matching_spans(tokens, [i for i in positions if hashes[i] in shingles], max_samples)
+
+        return PlagiarismReport(
+            matching=len(matching),
+            total=len(draft_set),
+            candidates=candidates,
+            sample_matches=matching_spans(tokens, positions, max_samples),
+        )
+
+
+def matching_spans(tokens: Sequence[str], positions: Sequence[int], limit: int) -> List[str]:
+    """The `limit` longest runs of consecutive matching shingle positions, as draft phrases."""
+    runs: List[List[int]] = []
+    for i in positions:
+        if runs and i == runs[-1][1] + 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    runs.sort(key=lambda run: (run[0] - run[1], run[0]))
+    return [" ".join(tokens[a:b + SHINGLE_SIZE]) for a, b in runs[:limit]]
+
+
+_cache: "OrderedDict[bytes, SourceIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_source_index(documents: Sequence[str]) -> SourceIndex:
+    """
+    Returns the SourceIndex for a topic's documents, memoized by content hash.
+
+    Fact-check loops re-check revised drafts against the same research, so
+    the sources are shingled and signed once per topic.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for doc in documents:
+        digest.update(hashlib.blake2b(doc.encode("utf-8"), digest_size=16).digest())
+    key = digest.digest()
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+
+    index = SourceIndex(documents)
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def clear_index_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
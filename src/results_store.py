@@ -0,0 +1,341 @@
+"""
+Local, append-only store of experiment results, with a regression compare.
+
+Every finished item of a `run_dataset_experiment.py` or `main.py` run is
+appended as one row: latency, dataset checks, feedback-loop counts, eval
+scores, tokens and cost. Rows are grouped by experiment name (the
+EXPERIMENT_NAME env var) and run id, and are never updated or deleted:
+triggers reject both, so earlier runs stay a fixed baseline.
+
+Fixed per-item measures are typed columns of `results`, one row per item.
+Named measures whose set can change between runs (eval scores, loops per
+gate) go to `metrics` as (result, name, value) rows, so a new eval needs no
+schema change.
+
+Compare two runs before deploying:
+
+    python -m src.results_store list
+    python -m src.results_store compare baseline candidate
+    python -m src.results_store compare candidate        # previous vs latest run
+    python -m src.results_store compare baseline@3f2a candidate --max-score-drop 0.02
+
+A name picks its latest run, and `name@<run id prefix>` a specific one.
+The compare exits with status 1 when any metric regresses past its
+threshold.
+"""
+
+import os
+import sys
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.metrics import percentile
+
+DEFAULT_RESULTS_PATH = ".results.sqlite"
+
+# Metrics where a higher value is a regression; all others regress downwards.
+LOWER_IS_BETTER = ("latency", "tokens", "cost", "loops")
+
+
+class ResultsStore:
+    """SQLite file of per-item experiment results. Thread-safe."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY,
+                experiment TEXT NOT NULL,
+                run_id TEXT NOT NULL,
+                recorded_at REAL NOT NULL,
+                item TEXT NOT NULL,
+                trace_id TEXT,
+                error TEXT,
+                latency_s REAL,
+                checks_passed INTEGER,
+                checks_total INTEGER,
+                loops INTEGER,
+                tokens INTEGER,
+                cost_usd REAL
+            );
+            CREATE INDEX IF NOT EXISTS results_run ON results (experiment, run_id);
+            CREATE TABLE IF NOT EXISTS metrics (
+                result_id INTEGER NOT NULL REFERENCES results (id),
+                name TEXT NOT NULL,
+                value REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS metrics_result ON metrics (result_id);
+            CREATE TRIGGER IF NOT EXISTS results_no_update BEFORE UPDATE ON results
+                BEGIN SELECT RAISE(ABORT, 'results are append-only'); END;
+            CREATE TRIGGER IF NOT EXISTS results_no_delete BEFORE DELETE ON results
+                BEGIN SELECT RAISE(ABORT, 'results are append-only'); END;
+            CREATE TRIGGER IF NOT EXISTS metrics_no_update BEFORE UPDATE ON metrics
+                BEGIN SELECT RAISE(ABORT, 'results are append-only'); END;
+            CREATE TRIGGER IF NOT EXISTS metrics_no_delete BEFORE DELETE ON metrics
+                BEGIN SELECT RAISE(ABORT, 'results are append-only'); END;"""
+        )
+
+    def begin_run(self, experiment: str, run_id: Optional[str] = None) -> "RunRecorder":
+        """Starts a run of `experiment`; its items are appended through the returned recorder."""
+        return RunRecorder(self, experiment, run_id or uuid.uuid4().hex[:12])
+
+    def record(
+        self,
+        experiment: str,
+        run_id: str,
+        item: str,
+        trace_id: Optional[str] = None,
+        error: Optional[str] = None,
+        latency: Optional[float] = None,
+        checks: Optional[Dict[str, bool]] = None,
+        loops: Optional[Dict[str, int]] = None,
+        scores: Optional[Dict[str, float]] = None,
+        tokens: Optional[int] = None,
+        cost: Optional[float] = None,
+    ) -> None:
+        """Appends one item's result. A failed item passes `error` and leaves the measures empty."""
+        metrics = [(f"score.{name}", float(v)) for name, v in (scores or {}).items()]
+        metrics += [(f"loops.{gate}", float(n)) for gate, n in (loops or {}).items()]
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO results (experiment, run_id, recorded_at, item, trace_id, error, latency_s, "
+                "checks_passed, checks_total, loops, tokens, cost_usd) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    experiment, run_id, time.time(), item, trace_id, error, latency,
+                    sum(1 for v in checks.values() if v) if checks is not None else None,
+                    len(checks) if checks is not None else None,
+                    sum(loops.values()) if loops is not None else None,
+                    tokens, cost,
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO metrics (result_id, name, value) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, name, value) for name, value in metrics],
+            )
+            self._conn.commit()
+
+    def runs(self, experiment: Optional[str] = None) -> List[dict]:
+        """Runs in the store, oldest first, optionally only those of `experiment`."""
+        query = (
+            "SELECT experiment, run_id, MIN(recorded_at), COUNT(*), SUM(error IS NOT NULL) FROM results"
+            + (" WHERE experiment = ?" if experiment else "")
+            + " GROUP BY experiment, run_id ORDER BY MIN(recorded_at)"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, (experiment,) if experiment else ()).fetchall()
+        return [
+            {"experiment": e, "run_id": r, "started_at": t, "items": n, "failed": f}
+            for e, r, t, n, f in rows
+        ]
+
+    def resolve(self, ref: str, previous: bool = False) -> Tuple[str, str]:
+        """
+        Maps `name` or `name@<run id prefix>` to an (experiment, run_id) pair.
+
+        A bare name picks the latest run, or the one before it if `previous`
+        is set. Raises ValueError if no run matches.
+        """
+        experiment, _, prefix = ref.partition("@")
+        runs = [r for r in self.runs(experiment) if r["run_id"].startswith(prefix)]
+        if prefix:
+            if len(runs) != 1:
+                raise ValueError(f"{ref!r} matches {len(runs)} runs")
+            return experiment, runs[0]["run_id"]
+        needed = 2 if previous else 1
+        if len(runs) < needed:
+            raise ValueError(f"experiment {experiment!r} has {len(runs)} recorded runs, need {needed}")
+        return experiment, runs[-needed]["run_id"]
+
+    def summarize(self, experiment: str, run_id: str) -> dict:
+        """Aggregates one run: latency percentiles, means of tokens, cost, loops and each score."""
+        where = "WHERE experiment = ? AND run_id = ?"
+        with self._lock:
+            items, failed, tokens, cost, cost_total, passed, total, loops = self._conn.execute(
+                "SELECT COUNT(*), SUM(error IS NOT NULL), AVG(tokens), AVG(cost_usd), SUM(cost_usd), "
+                f"SUM(checks_passed), SUM(checks_total), AVG(loops) FROM results {where}",
+                (experiment, run_id),
+            ).fetchone()
+            latencies = [row[0] for row in self._conn.execute(
+                f"SELECT latency_s FROM results {where} AND error IS NULL AND latency_s IS NOT NULL",
+                (experiment, run_id),
+            )]
+            named = self._conn.execute(
+                "SELECT m.name, AVG(m.value) FROM metrics m JOIN results r ON r.id = m.result_id "
+                "WHERE r.experiment = ? AND r.run_id = ? GROUP BY m.name ORDER BY m.name",
+                (experiment, run_id),
+            ).fetchall()
+
+        metrics = {
+            "success_rate": (items - failed) / items if items else None,
+            "latency_p50_s": percentile(latencies, 50) if latencies else None,
+            "latency_p95_s": percentile(latencies, 95) if latencies else None,
+            "tokens_mean": tokens,
+            "cost_mean_usd": cost,
+            "checks_pass_rate": passed / total if total else None,
+            "loops_mean": loops,
+        }
+        metrics.update(named)
+        return {
+            "experiment": experiment,
+            "run_id": run_id,
+            "items": items,
+            "failed": failed or 0,
+            "cost_total_usd": cost_total,
+            "metrics": metrics,
+        }
+
+
+class RunRecorder:
+    """Appends the items of one run to a ResultsStore."""
+
+    def __init__(self, store: ResultsStore, experiment: str, run_id: str):
+        self.store = store
+        self.experiment = experiment
+        self.run_id = run_id
+        self.recorded = 0
+
+    def record(self, item: str, **fields) -> None:
+        self.store.record(self.experiment, self.run_id, item, **fields)
+        self.recorded += 1
+
+
+@lru_cache(maxsize=None)
+def get_results_store() -> Optional[ResultsStore]:
+    """
+    Returns the shared results store.
+
+    Configured via env vars:
+        RESULTS_STORE — set to "off" to record nothing.
+        RESULTS_DB    — SQLite file (default ./.results.sqlite).
+
+    Returns:
+        The store, or None when recording is disabled.
+    """
+    if os.getenv("RESULTS_STORE", "").lower() in ("off", "0", "false"):
+        return None
+    return ResultsStore(os.getenv("RESULTS_DB") or DEFAULT_RESULTS_PATH)
+
+
+def experiment_name(default: str) -> str:
+    """The EXPERIMENT_NAME env var, or `default`."""
+    return os.getenv("EXPERIMENT_NAME") or default
+
+
+def compare(
+    base: dict,
+    head: dict,
+    max_latency_increase: float = 0.10,
+    max_cost_increase: float = 0.10,
+    max_loop_increase: float = 0.5,
+    max_score_drop: float = 0.05,
+) -> List[dict]:
+    """
+    Diffs two run summaries metric by metric.
+
+    Latency, token and cost increases are relative to the base; loop counts,
+    scores and rates are compared in absolute terms. Each row says whether
+    the change exceeds its threshold in the bad direction.
+    """
+    rows = []
+    names = list(base["metrics"]) + [n for n in head["metrics"] if n not in base["metrics"]]
+    for name in names:
+        old, new = base["metrics"].get(name), head["metrics"].get(name)
+        row = {"metric": name, "base": old, "head": new, "delta": None, "regression": False}
+        if old is not None and new is not None:
+            row["delta"] = new - old
+            if name.startswith("latency"):
+                row["regression"] = old > 0 and row["delta"] / old > max_latency_increase
+            elif name.startswith(("tokens", "cost")):
+                row["regression"] = old > 0 and row["delta"] / old > max_cost_increase
+            elif name.startswith("loops"):
+                row["regression"] = row["delta"] > max_loop_increase
+            else:
+                row["regression"] = -row["delta"] > max_score_drop
+        rows.append(row)
+    return rows
+
+
+def format_comparison(base: dict, head: dict, rows: List[dict]) -> str:
+    def value(v):
+        return "—" if v is None else f"{v:.3f}"
+
+    lines = [
+        f"  base: {base['experiment']}@{base['run_id']} ({base['items']} items, {base['failed']} failed)",
+        f"  head: {head['experiment']}@{head['run_id']} ({head['items']} items, {head['failed']} failed)",
+        "",
+        f"  {'metric':<28} {'base':>10} {'head':>10} {'delta':>10}",
+    ]
+    for row in rows:
+        if row["delta"] is None:
+            delta = ""
+        elif row["metric"].startswith(("latency", "tokens", "cost")) and row["base"]:
+            delta = f"{row['delta'] / row['base']:+.1%}"
+        else:
+            delta = f"{row['delta']:+.3f}"
+        worse = row["delta"] and (row["delta"] > 0) == row["metric"].startswith(LOWER_IS_BETTER)
+        flag = "  ❌ regression" if row["regression"] else "  ⚠️" if worse else ""
+        lines.append(f"  {row['metric']:<28} {value(row['base']):>10} {value(row['head']):>10} {delta:>10}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and compare recorded experiment runs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    runs_cmd = sub.add_parser("list", help="list recorded runs")
+    runs_cmd.add_argument("experiment", nargs="?")
+
+    compare_cmd = sub.add_parser("compare", help="diff two runs; exits 1 on a regression")
+    compare_cmd.add_argument("base", help="experiment name (latest run) or name@run-id-prefix")
+    compare_cmd.add_argument("head", nargs="?", help="defaults to the latest run of BASE, compared with the one before")
+    compare_cmd.add_argument("--max-latency-increase", type=float, default=0.10, metavar="FRAC",
+                             help="allowed relative p50/p95 latency increase (default 0.10)")
+    compare_cmd.add_argument("--max-cost-increase", type=float, default=0.10, metavar="FRAC",
+                             help="allowed relative token and cost increase per item (default 0.10)")
+    compare_cmd.add_argument("--max-loop-increase", type=float, default=0.5, metavar="N",
+                             help="allowed increase in mean feedback loops per item (default 0.5)")
+    compare_cmd.add_argument("--max-score-drop", type=float, default=0.05, metavar="D",
+                             help="allowed absolute drop in a mean score or pass rate (default 0.05)")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(os.getenv("RESULTS_DB") or DEFAULT_RESULTS_PATH)
+
+    if args.command == "list":
+        for run in store.runs(args.experiment):
+            started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started_at"]))
+            print(f"  {run['experiment']}@{run['run_id']}  {started}  "
+                  f"{run['items']} items" + (f", {run['failed']} failed" if run["failed"] else ""))
+        return 0
+
+    try:
+        if args.head:
+            base_ref, head_ref = store.resolve(args.base), store.resolve(args.head)
+        else:
+            base_ref, head_ref = store.resolve(args.base, previous=True), store.resolve(args.base)
+    except ValueError as e:
+        print(f"  ❌ {e}", file=sys.stderr)
+        return 2
+
+    base, head = store.summarize(*base_ref), store.summarize(*head_ref)
+    rows = compare(
+        base, head,
+        max_latency_increase=args.max_latency_increase,
+        max_cost_increase=args.max_cost_increase,
+        max_loop_increase=args.max_loop_increase,
+        max_score_drop=args.max_score_drop,
+    )
+    print(format_comparison(base, head, rows))
+    regressions = [r["metric"] for r in rows if r["regression"]]
+    print(f"\n  {'❌ Regressions: ' + ', '.join(regressions) if regressions else '✅ No regressions'}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
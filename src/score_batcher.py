@@ -0,0 +1,152 @@
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_PENDING = 1000
+DEFAULT_INTERVAL_S = 2.0
+
+
+class ScoreBatcher:
+    """
+    Buffers Langfuse scores from many traces and submits them from a background thread.
+
+    `add` only appends to an in-memory buffer, so eval code never waits on
+    the SDK. The worker submits whatever is buffered every `interval_s`
+    seconds, or as soon as `batch_size` scores are waiting, and flushes the
+    client whenever a full batch goes out. `close` submits the rest and
+    flushes once. If more than `max_pending` scores pile up, `add` waits for
+    the worker. Every wait a caller spends in `add` or `close` is counted as
+    blocked time.
+    """
+
+    def __init__(
+        self,
+        client,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        interval_s: float = DEFAULT_INTERVAL_S,
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_pending = max(max_pending, batch_size)
+        self.interval_s = interval_s
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "scores": 0, "batches": 0, "flushes": 0, "failed": 0,
+            "submit_s": 0.0, "blocked_s": 0.0, "close_s": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name="score-batcher", daemon=True)
+        self._thread.start()
+
+    def add(self, trace_id: str, name: str, value: float, comment: Optional[str] = None) -> None:
+        start = time.perf_counter()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ScoreBatcher is closed")
+            while len(self._pending) >= self.max_pending:  # backpressure
+                self._cond.notify_all()
+                self._cond.wait()
+            self._pending.append({"trace_id": trace_id, "name": name, "value": value, "comment": comment})
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+            self._stats["blocked_s"] += time.perf_counter() - start
+
+    def _submit(self, batch: list, flush: bool) -> None:
+        start = time.perf_counter()
+        failed = 0
+        for score in batch:
+            try:
+                self.client.create_score(**score)
+            except Exception as e:
+                failed += 1
+                logger.warning("Score %s for trace %s not submitted: %s", score["name"], score["trace_id"], e)
+        if flush:
+            try:
+                self.client.flush()
+            except Exception as e:
+                flush = False
+                logger.warning("Flush after a batch of %d scores failed: %s", len(batch), e)
+        with self._cond:
+            self._stats["scores"] += len(batch) - failed
+            self._stats["failed"] += failed
+            self._stats["batches"] += 1
+            self._stats["flushes"] += int(flush)
+            self._stats["submit_s"] += time.perf_counter() - start
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or len(self._pending) >= self.batch_size,
+                                    timeout=self.interval_s)
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.batch_size))]
+                closing = self._closed and not self._pending
+                self._cond.notify_all()  # wake producers held back by max_pending
+            if batch:
+                self._submit(batch, flush=len(batch) >= self.batch_size and not closing)
+            if closing:
+                return
+
+    def close(self) -> Dict[str, float]:
+        """Submits everything still buffered, flushes the client once and returns the stats."""
+        start = time.perf_counter()
+        with self._cond:
+            already_closed = self._closed
+            self._closed = True
+            self._cond.notify_all()
+        if not already_closed:
+            self._thread.join()
+            self.client.flush()
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                self._stats["flushes"] += 1
+                self._stats["close_s"] = elapsed
+                self._stats["blocked_s"] += elapsed
+        return self.stats()
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {**self._stats, "pending": len(self._pending)}
+
+
+_batcher: Optional[ScoreBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_score_batcher(client) -> ScoreBatcher:
+    """
+    Returns the process-wide batcher for `client`, starting it on first use.
+
+    It is closed at interpreter exit if nobody closed it first, so buffered
+    scores are never dropped.
+    """
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = ScoreBatcher(client)
+            atexit.register(_batcher.close)
+        return _batcher
+
+
+def close_score_batcher() -> Optional[Dict[str, float]]:
+    """Closes the process-wide batcher (single flush) and returns its stats; None if it never started."""
+    global _batcher
+    with _batcher_lock:
+        batcher, _batcher = _batcher, None
+    return batcher.close() if batcher else None
+
+
+def format_batcher_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"{stats['scores']} scores in {stats['batches']} batches, {stats['flushes']} flushes"
+        + (f", {stats['failed']} failed" if stats["failed"] else "")
+        + f"; callers blocked {stats['blocked_s']:.2f}s (final flush {stats['close_s']:.2f}s), "
+        f"background submit {stats['submit_s']:.2f}s"
+    )
@@ -0,0 +1,248 @@
+"""
+BM25 search over a local JSONL corpus, backing `search_tool`.
+
+Each corpus line is a JSON object with `url`, `title` and `snippet` (and an
+optional longer `text`, indexed but not returned). The inverted index is
+built once per corpus version into flat binary files that are memory-mapped
+on load, so opening a 100k-document index costs a few page faults rather
+than a parse:
+
+    meta.json       corpus fingerprint, document count, BM25 parameters
+    terms.bin       sorted vocabulary, UTF-8, concatenated
+    terms.off       uint64 offsets into terms.bin (V + 1)
+    postings.off    uint64 offsets into the postings arrays per term (V + 1)
+    postings.doc    uint32 document ids, ascending within a term
+    postings.wt     float32 precomputed BM25 term weights, parallel to postings.doc
+    terms.max       float32 largest weight in each term's postings (V)
+    docs.off        uint64 byte offsets of each document's line in the corpus (N + 1)
+
+Because the BM25 weight of a posting only depends on its term frequency and
+document length, it is computed at build time; a query is a sum of weights.
+Query terms are scored rarest first, and once the remaining terms' maximum
+weights can no longer lift an unseen document into the top k, common terms
+are only looked up (by binary search) for the documents still in contention
+instead of having their whole posting lists scanned.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import bisect
+import shutil
+import mmap
+import threading
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.text_profile import STOP_WORDS
+
+DEFAULT_CORPUS_PATH = os.path.join("data", "search_corpus.jsonl")
+DEFAULT_INDEX_DIR = ".search_index"
+INDEX_VERSION = 1
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric terms, stop words removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def _fingerprint(corpus_path: str) -> Dict[str, object]:
+    stat = os.stat(corpus_path)
+    return {
+        "version": INDEX_VERSION,
+        "corpus": os.path.abspath(corpus_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "k1": BM25_K1,
+        "b": BM25_B,
+    }
+
+
+def build_index(corpus_path: str, index_dir: str) -> None:
+    """Tokenizes the corpus and writes the memory-mappable index files."""
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    doc_offsets = array("Q", [0])
+    doc_lengths: List[int] = []
+
+    with open(corpus_path, "rb") as f:
+        offset = 0
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                doc_offsets[-1] = offset  # fold blank lines into the previous slice
+                continue
+            record = json.loads(line)
+            terms = Counter(tokenize(
+                f"{record.get('title', '')} {record.get('snippet', '')} {record.get('text', '')}"
+            ))
+            doc_id = len(doc_lengths)
+            for term, tf in terms.items():
+                postings[term].append((doc_id, tf))
+            doc_lengths.append(sum(terms.values()))
+            doc_offsets.append(offset)
+
+    n_docs = len(doc_lengths)
+    avgdl = sum(doc_lengths) / n_docs if n_docs else 0.0
+
+    terms_bin = bytearray()
+    terms_off = array("Q", [0])
+    post_off = array("Q", [0])
+    post_doc = array("I")
+    post_wt = array("f")
+    term_max = array("f")
+    for term in sorted(postings):
+        entries = postings[term]
+        df = len(entries)
+        idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        for doc_id, tf in entries:
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_lengths[doc_id] / avgdl)
+            post_doc.append(doc_id)
+            post_wt.append(idf * tf * (BM25_K1 + 1.0) / (tf + norm))
+        term_max.append(max(post_wt[post_off[-1]:]))
+        terms_bin += term.encode("utf-8")
+        terms_off.append(len(terms_bin))
+        post_off.append(len(post_doc))
+
+    # Write to a scratch directory and swap it in, so readers never see a half-built index
+    tmp_dir = f"{index_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for name, data in (
+        ("terms.bin", terms_bin),
+        ("terms.off", terms_off),
+        ("terms.max", term_max),
+        ("postings.off", post_off),
+        ("postings.doc", post_doc),
+        ("postings.wt", post_wt),
+        ("docs.off", doc_offsets),
+    ):
+        with open(os.path.join(tmp_dir, name), "wb") as f:
+            f.write(bytes(data))
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({**_fingerprint(corpus_path), "docs": n_docs, "terms": len(terms_off) - 1, "avgdl": avgdl}, f)
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+
+
+def mmap_array(path: str, fmt: str) -> memoryview:
+    """Read-only memoryview over a file, cast to the array typecode `fmt`."""
+    if os.path.getsize(path) == 0:
+        return memoryview(array(fmt))
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(fmt)
+
+
+class SearchIndex:
+    """Memory-mapped BM25 index over a JSONL corpus. Safe to share across threads."""
+
+    def __init__(self, corpus_path: str, index_dir: str):
+        self.corpus_path = corpus_path
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+
+        self._terms = mmap_array(os.path.join(index_dir, "terms.bin"), "B")
+        self._terms_off = mmap_array(os.path.join(index_dir, "terms.off"), "Q")
+        self._term_max = mmap_array(os.path.join(index_dir, "terms.max"), "f")
+        self._post_off = mmap_array(os.path.join(index_dir, "postings.off"), "Q")
+        self._post_doc = mmap_array(os.path.join(index_dir, "postings.doc"), "I")
+        self._post_wt = mmap_array(os.path.join(index_dir, "postings.wt"), "f")
+        self._docs_off = mmap_array(os.path.join(index_dir, "docs.off"), "Q")
+        self._corpus = mmap_array(corpus_path, "B")
+
+    @classmethod
+    def open(cls, corpus_path: str, index_dir: str) -> "SearchIndex":
+        """Opens the index for `corpus_path`, (re)building it if missing or stale."""
+        meta_path = os.path.join(index_dir, "meta.json")
+        stale = True
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            stale = any(meta.get(k) != v for k, v in _fingerprint(corpus_path).items())
+        if stale:
+            build_index(corpus_path, index_dir)
+        return cls(corpus_path, index_dir)
+
+    def __len__(self) -> int:
+        return self.meta["docs"]
+
+    def _term_id(self, term: str) -> Optional[int]:
+        """Binary search over the sorted vocabulary."""
+        target = term.encode("utf-8")
+        lo, hi = 0, self.meta["terms"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self._terms[self._terms_off[mid]:self._terms_off[mid + 1]].tobytes()
+            if current < target:
+                lo = mid + 1
+            elif current > target:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def document(self, doc_id: int) -> dict:
+        return json.loads(self._corpus[self._docs_off[doc_id]:self._docs_off[doc_id + 1]].tobytes())
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[float, dict]]:
+        """
+        Top-k documents by BM25 score, as (score, record) pairs.
+
+        Ties are broken by corpus order, so the same query always returns the
+        same results.
+        """
+        term_ids = [t for t in map(self._term_id, set(tokenize(query))) if t is not None]
+        # Rarest first, in a fixed order so float sums are reproducible
+        term_ids.sort(key=lambda t: (self._post_off[t + 1] - self._post_off[t], t))
+        remaining = [0.0] * (len(term_ids) + 1)  # upper bound on what term_ids[i:] can still add
+        for i in range(len(term_ids) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + self._term_max[term_ids[i]]
+
+        scores: Dict[int, float] = defaultdict(float)
+        for i, term_id in enumerate(term_ids):
+            start, end = self._post_off[term_id], self._post_off[term_id + 1]
+            threshold = heapq.nlargest(k, scores.values())[-1] if k and len(scores) >= k else None
+            if threshold is not None and remaining[i] < threshold:
+                # No unseen document can reach the top k any more: only update contenders
+                for doc_id in [d for d, s in scores.items() if s + remaining[i] >= threshold]:
+                    pos = bisect.bisect_left(self._post_doc, doc_id, start, end)
+                    if pos < end and self._post_doc[pos] == doc_id:
+                        scores[doc_id] += self._post_wt[pos]
+                continue
+            for doc_id, weight in zip(self._post_doc[start:end], self._post_wt[start:end]):
+                scores[doc_id] += weight
+
+        top = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(score, self.document(doc_id)) for doc_id, score in top]
+
+
+_open_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _open_index(corpus_path: str, index_dir: str) -> SearchIndex:
+    with _open_lock:  # parallel tool calls must not build the index twice
+        return SearchIndex.open(corpus_path, index_dir)
+
+
+def get_search_index() -> SearchIndex:
+    """
+    Returns the shared search index, building it on first use.
+
+    Configured via env vars:
+        SEARCH_CORPUS    — JSONL corpus (default data/search_corpus.jsonl).
+        SEARCH_INDEX_DIR — where the index files live (default ./.search_index).
+    """
+    return _open_index(
+        os.getenv("SEARCH_CORPUS") or DEFAULT_CORPUS_PATH,
+        os.getenv("SEARCH_INDEX_DIR") or DEFAULT_INDEX_DIR,
+    )
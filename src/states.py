@@ -1,5 +1,5 @@
 from typing import List, TypedDict, Annotated
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, HumanMessage
 import operator
 
 
@@ -17,7 +17,9 @@ class AgentState(TypedDict):
     executive_summary: str
     translated_summaries: dict  # {"es": "...", "fr": "..."}
     final_output: str
-    iteration_log: List[str]  # tracks which loops were triggered
+    # tracks which loops were triggered; nodes return only their own entries so
+    # parallel branches can append in the same step (merged in node-name order)
+    iteration_log: Annotated[List[str], operator.add]
     messages: Annotated[List[BaseMessage], operator.add]
     # ── New fields for enhanced pipeline ──
     enrichment_data: List[str]  # data from second research pass (Data Enricher)
@@ -25,3 +27,38 @@ class AgentState(TypedDict):
     quality_revision_count: int  # quality gate loop counter
     sentiment_scores: dict  # sentiment analysis results from Analyst
     readability_grade: float  # Flesch-Kincaid grade level
+    # one entry per concurrent tool batch (node, calls, wall_s, serial_s, saved_s)
+    tool_timings: Annotated[List[dict], operator.add]
+    # memoized tool hits/misses per node run (node, hits, misses, tools)
+    tool_cache: Annotated[List[dict], operator.add]
+    # LLM calls, tokens and cost per node run (node, calls, prompt_tokens, ..., cost_usd)
+    llm_usage: Annotated[List[dict], operator.add]
+
+
+def initial_state(task: str) -> AgentState:
+    """Fresh pipeline state for a research task, with every field populated."""
+    return {
+        "task": task,
+        "topic_label": task,
+        "research_data": [],
+        "analysis": "",
+        "draft": "",
+        "critique": "",
+        "revision_count": 0,
+        "compliance_notes": "",
+        "compliance_revision_count": 0,
+        "seo_keywords": [],
+        "executive_summary": "",
+        "translated_summaries": {},
+        "final_output": "",
+        "iteration_log": [],
+        "messages": [HumanMessage(content=task)],
+        "enrichment_data": [],
+        "quality_score": 0.0,
+        "quality_revision_count": 0,
+        "sentiment_scores": {},
+        "readability_grade": 0.0,
+        "tool_timings": [],
+        "tool_cache": [],
+        "llm_usage": [],
+    }
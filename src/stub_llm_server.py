@@ -0,0 +1,317 @@
+"""
+Offline OpenAI-compatible stub server for load and benchmark testing.
+
+Serves POST /v1/chat/completions with canned but structurally valid answers
+for every agent and judge in the pipeline (tool_calls for the Researcher and
+Data Enricher, APPROVED / COMPLIANT / SCORE formats for the reviewers, integer
+scores for the judges). Latency and token counts are drawn from configurable
+distributions so the graph's throughput and tail latency can be measured on
+a plain Linux box without an API key.
+
+Usage:
+    .venv/bin/python -m src.stub_llm_server --port 8765 --latency-ms 800
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub .venv/bin/python main.py
+"""
+
+import re
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 500.0        # median response latency
+    latency_sigma: float = 0.5       # lognormal shape; 0 makes latency constant
+    ms_per_token: float = 0.0        # extra generation time per completion token
+    report_words: int = 650          # length of Writer / Editor drafts
+    reject_rate: float = 0.0         # chance a reviewer fails the draft (exercises loops)
+    seed: Optional[int] = None
+
+
+# Canned sources per topic — mirrors the URLs search_tool knows about
+_TOPIC_SOURCES = [
+    (("quantum", "qml"), "quantum machine learning NISQ hardware", "https://quantum-digest.com/qml-2026"),
+    (("regulation", "governance", "policy", "ai act"), "AI regulation EU AI Act enforcement", "https://eu-policy-watch.com/ai-act-2026"),
+    ((), "edge computing 6G latency", "https://tech-trends-2026.com/edge-computing"),
+]
+
+_REPORT_SECTIONS = [
+    "Executive Summary", "Introduction", "Key Findings", "Analysis",
+    "Implications", "Conclusion",
+]
+
+_FILLER = (
+    "Analysts expect adoption to grow 30% per year through 2028 as costs fall and tooling matures. "
+    "Security, interoperability and energy use remain the main risks, and regulators are watching closely. "
+    "Early deployments show measurable gains in latency and reliability for specific workloads. "
+    "Organisations should pilot carefully, measure outcomes, and invest in skills before scaling. "
+)
+
+
+def _topic_of(prompt: str) -> str:
+    quoted = re.search(r'"([^"]{8,120})"', prompt)
+    if quoted:
+        return quoted.group(1)
+    tail = re.search(r"tools:\s*(.+)$", prompt.strip())
+    return tail.group(1) if tail else "emerging technology in 2026"
+
+
+def _source_for(topic: str) -> Tuple[str, str]:  # last entry is the catch-all
+    lowered = topic.lower()
+    for keywords, query, url in _TOPIC_SOURCES:
+        if not keywords or any(k in lowered for k in keywords):
+            return query, url
+
+
+def _report(topic: str, words: int) -> str:
+    per_section = max(words // len(_REPORT_SECTIONS), 20)
+    filler_words = _FILLER.split()
+    _, url = _source_for(topic)
+    parts = [f"# {topic}"]
+    for i, section in enumerate(_REPORT_SECTIONS):
+        body = " ".join(filler_words[j % len(filler_words)] for j in range(per_section))
+        parts.append(f"## {section}\n\n{body} [{i % 2 + 1}]")
+    parts.append(f"## References\n\n[1] {url}\n[2] https://market-research.com/edge-growth")
+    return "\n\n".join(parts)
+
+
+def _tool_call(name: str, args: dict) -> dict:
+    return {
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(args)},
+    }
+
+
+def _from_schema(schema: dict, rng: random.Random, defs: dict) -> object:
+    """A value matching a JSON schema: judge-like integers, short reasons, nested objects."""
+    if "$ref" in schema:
+        return _from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], rng, defs)
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _from_schema(prop, rng, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_from_schema(schema.get("items", {}), rng, defs)]
+    if kind == "integer":
+        return rng.randint(6, 9)
+    if kind == "number":
+        return round(rng.uniform(0.6, 1.0), 2)
+    if kind == "boolean":
+        return True
+    if "enum" in schema:
+        return schema["enum"][0]
+    return "Clear structure and specific data points; risks are covered briefly."
+
+
+def canned_response(messages: List[dict], tools: Optional[list], config: StubConfig, rng: random.Random,
+                    response_format: Optional[dict] = None) -> dict:
+    """Builds the assistant message the real model would plausibly return for this prompt."""
+    if (response_format or {}).get("type") == "json_schema":
+        schema = response_format["json_schema"].get("schema", {})
+        return {"content": json.dumps(_from_schema(schema, rng, schema.get("$defs", {})))}
+
+    # After tool results the task prompt is the last user message, not the last message
+    tool_turns = sum(1 for m in messages if m.get("role") == "assistant" and m.get("tool_calls"))
+    prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    if isinstance(prompt, list):  # content parts
+        prompt = " ".join(part.get("text", "") for part in prompt if isinstance(part, dict))
+    tool_names = {t["function"]["name"] for t in tools or [] if t.get("type") == "function"}
+    topic = _topic_of(prompt)
+    rejected = rng.random() < config.reject_rate
+
+    if {"search_tool", "scrape_tool"} <= tool_names and tool_turns:
+        # One follow-up search on what the first results raised, then a wrap-up
+        if tool_turns == 1 and "knowledge gap" not in prompt:
+            query, _ = _source_for(topic)
+            return {"content": None, "tool_calls": [_tool_call("search_tool", {"query": f"{query} market outlook"})]}
+        return {"content": f"Research notes on {topic}: adoption is growing ~30% a year; security and cost remain open risks."}
+    if {"search_tool", "scrape_tool"} <= tool_names:
+        query, url = _source_for(topic)
+        if "knowledge gap" in prompt:
+            query = f"{query} risks and open questions"
+        return {"content": None, "tool_calls": [
+            _tool_call("search_tool", {"query": query}),
+            _tool_call("scrape_tool", {"url": url}),
+        ]}
+    if "Fact-Checker" in prompt:
+        return {"content": "1. The market size claim is not supported by the research." if rejected else "APPROVED"}
+    if "Compliance Reviewer" in prompt:
+        return {"content": "- Readability grade is above 14." if rejected else "COMPLIANT"}
+    if "Quality Gate" in prompt:
+        if rejected:
+            return {"content": "SCORE: 6 | VERDICT: FAILED | NOTES: Conclusion does not follow from findings."}
+        return {"content": "SCORE: 9 | VERDICT: PASSED | NOTES: Clear narrative, summary and translations present."}
+    if "Output ONLY a single integer" in prompt:
+        return {"content": str(rng.randint(6, 9))}
+    if "Return ONLY a number between 0.0" in prompt:
+        return {"content": f"{rng.uniform(0.6, 1.0):.2f}"}
+    if "Translate the following" in prompt:
+        return {"content": (
+            "SPANISH:\nSe espera que la adopción crezca un 30% en 2026. Los riesgos persisten. Se recomienda un piloto.\n\n"
+            "FRENCH:\nL'adoption devrait croître de 30% en 2026. Les risques persistent. Un pilote est recommandé."
+        )}
+    if "Executive Summarizer" in prompt:
+        return {"content": (
+            f"{topic} is moving from pilots to production, with adoption growing about 30% per year. "
+            "Security and interoperability gaps are the main constraint on scaling. "
+            "Teams should run measured pilots now and invest in skills before broad rollout."
+        )}
+    if "SEO Specialist" in prompt:
+        return {"content": f"Title: {topic[:60]}\nMeta: What changes in 2026 and why it matters.\nKeywords: AI, latency, security, cloud, 2026"}
+    if "Senior Data Analyst" in prompt:
+        return {"content": "\n\n".join(
+            f"**{s}** — {_FILLER}" for s in
+            ("Key Trends", "Market Data", "Sentiment Overview", "Contradictions", "Gaps", "Risk Factors")
+        )}
+    if "Tech Writer" in prompt or "Senior Editor" in prompt:
+        return {"content": _report(topic, config.report_words)}
+    if "ReAct" in prompt or "Final Answer" in prompt:
+        return {"content": "Thought: I can answer directly.\nFinal Answer: 42"}
+    return {"content": _FILLER.strip()}
+
+
+def _token_count(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: StubConfig):
+        super().__init__(address, _StubHandler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def sample_latency(self, completion_tokens: int) -> float:
+        cfg = self.config
+        with self.rng_lock:
+            jitter = self.rng.lognormvariate(0.0, cfg.latency_sigma) if cfg.latency_sigma > 0 else 1.0
+        return (cfg.latency_ms * jitter + cfg.ms_per_token * completion_tokens) / 1000.0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, {
+                "requests": self.server.requests,
+                "prompt_tokens": self.server.prompt_tokens,
+                "completion_tokens": self.server.completion_tokens,
+                "config": asdict(self.server.config),
+            })
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        with self.server.rng_lock:
+            message = canned_response(messages, body.get("tools"), self.server.config, self.server.rng,
+                                      body.get("response_format"))
+
+        prompt_tokens = sum(_token_count(str(m.get("content") or "")) for m in messages)
+        completion_text = message.get("content") or json.dumps(message.get("tool_calls"))
+        completion_tokens = _token_count(completion_text)
+        time.sleep(self.server.sample_latency(completion_tokens))
+
+        with self.server.rng_lock:
+            self.server.requests += 1
+            self.server.prompt_tokens += prompt_tokens
+            self.server.completion_tokens += completion_tokens
+
+        self._send_json(200, {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", **message},
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+def start_stub_server(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> StubServer:
+    """
+    Starts the stub in a daemon thread and returns it.
+
+    Point clients at `server.base_url` (port 0 picks a free port); call
+    `server.shutdown()` when done.
+    """
+    server = StubServer((host, port), config or StubConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stub for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=StubConfig.latency_ms, help="median latency per call")
+    parser.add_argument("--latency-sigma", type=float, default=StubConfig.latency_sigma, help="lognormal spread (0 = fixed)")
+    parser.add_argument("--ms-per-token", type=float, default=StubConfig.ms_per_token, help="extra latency per completion token")
+    parser.add_argument("--report-words", type=int, default=StubConfig.report_words, help="draft length from Writer/Editor")
+    parser.add_argument("--reject-rate", type=float, default=StubConfig.reject_rate, help="chance reviewers fail a draft")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        ms_per_token=args.ms_per_token,
+        report_words=args.report_words,
+        reject_rate=args.reject_rate,
+        seed=args.seed,
+    )
+    server = StubServer((args.host, args.port), config)
+    p95 = config.latency_ms * math.exp(1.645 * config.latency_sigma)
+    print(f"Stub LLM server on {server.base_url}")
+    print(f"  latency: median {config.latency_ms:.0f}ms, p95 ≈ {p95:.0f}ms | reject rate {config.reject_rate:.0%}")
+    print(f"  export OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=stub")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import os
+import re
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+# Characters trimmed from a word before counting its syllables / its term frequency
+_SYLLABLE_STRIP = ".,!?;:'\""
+_TERM_STRIP = ".,!?;:'\"()[]"
+
+STOP_WORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "in", "on", "at", "to",
+    "for", "of", "and", "or", "but", "with", "by", "from", "that", "this",
+    "it", "as", "be", "has", "have", "had", "not", "will", "can", "do",
+})
+
+_URL_RE = re.compile(r"https?://\S+")
+_CITATION_RE = re.compile(r"\[\d+\]")
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+
+# Cache budget in millions of characters, summed over every string a cached
+# profile holds (text, lowercase copy, tokens, sentences), not its entry count
+DEFAULT_CACHE_MB = 8
+PROFILE_CACHE_CHARS = int(float(os.getenv("PROFILE_CACHE_MB") or DEFAULT_CACHE_MB) * 1024 * 1024)
+
+
+def count_syllables(word: str) -> int:
+    """Approximate syllable count: vowel groups in the word, minimum 1."""
+    word = word.lower().strip(_SYLLABLE_STRIP)
+    vowels = "aeiouy"
+    count = 0
+    prev_vowel = False
+    for char in word:
+        is_vowel = char in vowels
+        if is_vowel and not prev_vowel:
+            count += 1
+        prev_vowel = is_vowel
+    return max(count, 1)
+
+
+@dataclass(frozen=True)
+class TextProfile:
+    """
+    Everything the tools and deterministic evals need to know about a text,
+    computed in one pass and shared (see `profile_text`). Cached profiles
+    are shared by every caller, so all fields are immutable.
+
+    Attributes:
+        text:           The original text.
+        lower:          `text.lower()`, for substring checks.
+        words:          Whitespace tokens of the original text.
+        tokens:         Whitespace tokens of the lowercased text.
+        sentences:      Fragments between `.`, `!` and `?` (terminators dropped), stripped.
+        full_sentences: Sentences split after a terminator, terminators kept, stripped.
+        syllables:      Total syllables over `words`.
+        term_freq:      Lowercased tokens with punctuation trimmed → count.
+        headings:       Markdown heading titles, in order.
+        urls:           Raw `http(s)://` URLs, in order, duplicates kept.
+        citations:      Numeric citation markers like `[3]`, in order.
+    """
+
+    text: str
+    lower: str
+    words: Tuple[str, ...]
+    tokens: Tuple[str, ...]
+    sentences: Tuple[str, ...]
+    full_sentences: Tuple[str, ...]
+    syllables: int
+    term_freq: Mapping[str, int]
+    headings: Tuple[str, ...]
+    urls: Tuple[str, ...]
+    citations: Tuple[str, ...]
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def size_chars(self) -> int:
+        """Characters held across the profile's strings, its weight in the cache."""
+        return (
+            len(self.text) + len(self.lower)
+            + sum(map(len, self.words)) + sum(map(len, self.tokens))
+            + sum(map(len, self.sentences)) + sum(map(len, self.full_sentences))
+        )
+
+    def content_terms(self) -> Dict[str, int]:
+        """Term frequencies without stop words and words of two letters or fewer."""
+        return {w: c for w, c in self.term_freq.items() if w not in STOP_WORDS and len(w) > 2}
+
+
+def build_profile(text: str) -> TextProfile:
+    """Computes a TextProfile without consulting the cache."""
+    lower = text.lower()
+    words = text.split()
+
+    # Syllables and trimmed terms are computed once per distinct word, not per occurrence
+    syllables = 0
+    term_freq: Dict[str, int] = Counter()
+    for word, count in Counter(words).items():
+        syllables += count_syllables(word) * count
+        term = word.lower().strip(_TERM_STRIP)
+        if term:
+            term_freq[term] += count
+
+    return TextProfile(
+        text=text,
+        lower=lower,
+        words=tuple(words),
+        tokens=tuple(lower.split()),
+        sentences=tuple(s.strip() for s in re.split(r"[.!?]+", text) if s.strip()),
+        full_sentences=tuple(s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()),
+        syllables=syllables,
+        term_freq=MappingProxyType(dict(term_freq)),
+        headings=tuple(_HEADING_RE.findall(text)),
+        urls=tuple(_URL_RE.findall(text)),
+        citations=tuple(_CITATION_RE.findall(text)),
+    )
+
+
+_cache: "OrderedDict[bytes, Tuple[TextProfile, int]]" = OrderedDict()  # key → (profile, size_chars)
+_cache_lock = threading.Lock()
+_cached_chars = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def profile_text(text: str) -> TextProfile:
+    """
+    Returns the TextProfile for `text`, memoized by content hash.
+
+    The same draft version is analysed by several tools and nodes (and again
+    by the eval suite); only the first caller pays for the analysis. The
+    cache is an LRU bounded by PROFILE_CACHE_CHARS; a profile larger than
+    the whole budget is returned without being cached.
+    """
+    global _cached_chars
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[0]
+        _stats["misses"] += 1
+
+    profile = build_profile(text)
+    size = profile.size_chars
+    if size <= PROFILE_CACHE_CHARS:
+        with _cache_lock:
+            if key not in _cache:
+                _cache[key] = (profile, size)
+                _cached_chars += size
+            while _cached_chars > PROFILE_CACHE_CHARS:
+                _, (_, evicted) = _cache.popitem(last=False)
+                _cached_chars -= evicted
+                _stats["evictions"] += 1
+    return profile
+
+
+def profile_cache_stats() -> Dict[str, int]:
+    with _cache_lock:
+        return {**_stats, "entries": len(_cache), "cached_chars": _cached_chars}
+
+
+def clear_profile_cache() -> None:
+    global _cached_chars
+    with _cache_lock:
+        _cache.clear()
+        _cached_chars = 0
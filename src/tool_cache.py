@@ -0,0 +1,133 @@
+import os
+import json
+import hashlib
+import threading
+import contextlib
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_SIZE = 256
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats: Dict[str, Counter] = {"hits": Counter(), "misses": Counter()}
+
+# Hit/miss tally for whatever node is currently running (see `node_scope`)
+_scope: ContextVar[Optional[Dict[str, Counter]]] = ContextVar("tool_cache_scope", default=None)
+
+
+def _enabled() -> bool:
+    return os.getenv("TOOL_CACHE", "").lower() not in ("off", "0", "false")
+
+
+def _max_entries() -> int:
+    return int(os.getenv("TOOL_CACHE_SIZE") or DEFAULT_CACHE_SIZE)
+
+
+def _key(name: str, args: tuple, kwargs: dict) -> str:
+    call = json.dumps({"args": list(args), "kwargs": kwargs}, sort_keys=True, ensure_ascii=False)
+    return f"{name}:{hashlib.blake2b(call.encode('utf-8'), digest_size=16).hexdigest()}"
+
+
+def _count(outcome: str, name: str) -> None:
+    with _cache_lock:
+        _stats[outcome][name] += 1
+    scope = _scope.get()
+    if scope is not None:
+        scope[outcome][name] += 1
+
+
+def memoized(func):
+    """
+    Memoizes a pure tool function's output, keyed by its name and an argument hash.
+
+    Apply it under `@tool` on tools whose output depends only on their
+    arguments; the cache is shared by all memoized tools and bounded to
+    TOOL_CACHE_SIZE entries (LRU). TOOL_CACHE=off disables it.
+
+        @tool
+        @memoized
+        def word_count_tool(text: str) -> str: ...
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled():
+            return func(*args, **kwargs)
+
+        key = _key(name, args, kwargs)
+        with _cache_lock:
+            output = _cache.get(key)
+            if output is not None:
+                _cache.move_to_end(key)
+        if output is not None:
+            _count("hits", name)
+            print(f"  [Tool] {name}: cached result")
+            return output
+
+        _count("misses", name)
+        output = func(*args, **kwargs)
+        with _cache_lock:
+            _cache[key] = output
+            while len(_cache) > _max_entries():
+                _cache.popitem(last=False)
+        return output
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def node_scope():
+    """
+    Tallies memoized tool hits and misses made while the block runs.
+
+    Yields a dict of per-tool Counters; `scope_summary` turns it into the
+    entry a node adds to the `tool_cache` state field. Threads started with
+    a copied context (ContextThreadPoolExecutor) report into the same tally.
+    """
+    tally = {"hits": Counter(), "misses": Counter()}
+    token = _scope.set(tally)
+    try:
+        yield tally
+    finally:
+        _scope.reset(token)
+
+
+def scope_summary(node: str, tally: Dict[str, Counter]) -> Optional[dict]:
+    """`{node, hits, misses, tools: {name: {hits, misses}}}`, or None if no memoized tool ran."""
+    names = sorted(set(tally["hits"]) | set(tally["misses"]))
+    if not names:
+        return None
+    return {
+        "node": node,
+        "hits": sum(tally["hits"].values()),
+        "misses": sum(tally["misses"].values()),
+        "tools": {n: {"hits": tally["hits"][n], "misses": tally["misses"][n]} for n in names},
+    }
+
+
+def summarize(entries: List[dict]) -> Dict[str, float]:
+    """Totals over a run's `tool_cache` entries."""
+    hits = sum(e["hits"] for e in entries)
+    misses = sum(e["misses"] for e in entries)
+    return {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+
+
+def tool_cache_stats() -> Dict[str, object]:
+    """Process-wide hits and misses per tool, plus the current entry count."""
+    with _cache_lock:
+        return {
+            "hits": sum(_stats["hits"].values()),
+            "misses": sum(_stats["misses"].values()),
+            "entries": len(_cache),
+            "tools": {n: {"hits": _stats["hits"][n], "misses": _stats["misses"][n]}
+                      for n in sorted(set(_stats["hits"]) | set(_stats["misses"]))},
+        }
+
+
+def clear_tool_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
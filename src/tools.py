@@ -1,150 +1,53 @@
 import re
-import random
 import math
+from typing import List, Optional
 from langchain_core.tools import tool
 
+from src.cassette import recorded_tool
+from src.tool_cache import memoized
+from src.text_profile import profile_text
+from src.plagiarism import get_source_index
+from src.search_index import get_search_index
+from src.document_store import get_document_store
+
 
 @tool
+@recorded_tool
 def search_tool(query: str) -> str:
     """
-    Simulates a web search engine. Returns a list of search results with snippets.
+    Searches the local document corpus (BM25 ranking). Returns the top 3 results with snippets.
     Useful for finding information about a topic.
     """
     print(f"  [Tool] Searching for: {query}")
 
-    edge_computing_results = [
-        {
-            "title": "The State of Edge Computing in 2026",
-            "snippet": "By 2026, edge computing is expected to process 75% of enterprise data. Key drivers include 6G rollouts and AI at the edge.",
-            "url": "https://tech-trends-2026.com/edge-computing",
-        },
-        {
-            "title": "Challenges in Edge AI Deployment",
-            "snippet": "Security, latency consistency, and hardware fragmentation remain top challenges for edge AI deployments in 2025-2026.",
-            "url": "https://ai-daily.org/edge-ai-challenges",
-        },
-        {
-            "title": "Market Size of Edge Computing",
-            "snippet": "The global edge computing market is projected to reach $150 billion by 2028, growing at a CAGR of 30%.",
-            "url": "https://market-research.com/edge-growth",
-        },
-        {
-            "title": "Edge vs Cloud: The Shift",
-            "snippet": "The pendulum swings back to decentralized processing as bandwidth costs rise and privacy concerns mount.",
-            "url": "https://cloud-insider.net/edge-vs-cloud",
-        },
-    ]
-
-    quantum_ml_results = [
-        {
-            "title": "Quantum Machine Learning Breakthroughs in 2026",
-            "snippet": "Hybrid quantum-classical algorithms show 100x speedup for specific optimization problems. Google and IBM lead race.",
-            "url": "https://quantum-digest.com/qml-2026",
-        },
-        {
-            "title": "NISQ Era Limitations for ML",
-            "snippet": "Current noisy quantum hardware limits ML to toy problems. Error correction at scale expected by 2028.",
-            "url": "https://quantum-research.org/nisq-limits",
-        },
-        {
-            "title": "Quantum Feature Maps for Classification",
-            "snippet": "Researchers demonstrate quantum kernel methods outperforming classical SVMs on 5 benchmark datasets.",
-            "url": "https://arxiv-summary.com/quantum-kernels",
-        },
-    ]
-
-    ai_regulation_results = [
-        {
-            "title": "EU AI Act 2026 Updates",
-            "snippet": "The EU finalized tiered risk classification. High-risk AI systems now require conformity assessments and audit trails.",
-            "url": "https://eu-policy-watch.com/ai-act-2026",
-        },
-        {
-            "title": "US Executive Order on AI Safety",
-            "snippet": "New NIST guidelines mandate red-teaming for frontier models. Reporting requirements for models above 10^26 FLOPs.",
-            "url": "https://ai-policy-us.gov/executive-order",
-        },
-        {
-            "title": "Global AI Governance Gap",
-            "snippet": "While EU and US advance regulation, Asia-Pacific nations diverge. China favors state-led AI governance; India proposes voluntary codes.",
-            "url": "https://global-ai-tracker.org/governance-gap",
-        },
-    ]
-
-    # pick results based on keywords
-    q = query.lower()
-    if "quantum" in q or "qml" in q:
-        results = quantum_ml_results
-    elif "regulation" in q or "governance" in q or "policy" in q or "ai act" in q:
-        results = ai_regulation_results
-    else:
-        results = edge_computing_results
-
-    random.shuffle(results)
+    results = get_search_index().search(query, k=3)
+    if not results:
+        return f"No results found for: {query}\n"
 
     formatted = ""
-    for i, res in enumerate(results[:3]):
+    for i, (_, res) in enumerate(results):
         formatted += f"{i+1}. [{res['title']}]({res['url']}): {res['snippet']}\n"
 
     return formatted
 
 
 @tool
+@recorded_tool
 def scrape_tool(url: str) -> str:
     """
-    Simulates scraping a web page. Returns the text content of the page.
+    Fetches a web page from the local document store. Returns the text content of the page.
     """
     print(f"  [Tool] Scraping: {url}")
 
-    content_map = {
-        "tech-trends-2026": (
-            "Full Article: The State of Edge Computing in 2026.\n\n"
-            "Edge computing is rapidly evolving. In 2026, we see a massive shift towards processing data locally. "
-            "6G networks are starting to appear, providing the low latency needed for real-time edge AI. "
-            "Autonomous vehicles and smart cities are the primary beneficiaries. "
-            "However, energy consumption of edge nodes is a growing concern. "
-            "Market analysts project $150B market size by 2028."
-        ),
-        "ai-daily": (
-            "Full Report: Challenges in Edge AI.\n\n"
-            "While promising, running AI at the edge is hard. Models need to be compressed. "
-            "Security is a nightmare because devices are physically accessible. "
-            "Fragmentation of hardware accelerators (TPUs, NPUs, GPUs) makes standardizing software difficult."
-        ),
-        "quantum-digest": (
-            "Full Article: Quantum ML Breakthroughs.\n\n"
-            "2026 marks a turning point for quantum machine learning. Hybrid quantum-classical models "
-            "are achieving practical speedups on optimization tasks. Google's 72-qubit processor demonstrated "
-            "quantum advantage for combinatorial problems. IBM's Heron chip enables error-corrected circuits."
-        ),
-        "quantum-research": (
-            "Full Report: NISQ Limitations.\n\n"
-            "The NISQ (Noisy Intermediate-Scale Quantum) era continues. Current hardware has 50-1000 qubits "
-            "but error rates remain 0.1-1%. For real-world ML, we need millions of logical qubits. "
-            "Error correction overhead means practical quantum ML is at least 3-5 years away."
-        ),
-        "eu-policy-watch": (
-            "Full Article: EU AI Act 2026.\n\n"
-            "The AI Act now enforces a four-tier risk system: Unacceptable, High, Limited, and Minimal risk. "
-            "High-risk systems (healthcare, law enforcement) require conformity assessments. "
-            "Foundation models must disclose training data summaries. Fines up to €35M or 7% of global revenue."
-        ),
-        "ai-policy-us": (
-            "Full Report: US AI Executive Order.\n\n"
-            "The Order mandates NIST to develop AI safety standards within 270 days. "
-            "Companies training models using >10^26 FLOPs must report to the government. "
-            "Red-teaming is now a requirement for frontier AI models before deployment."
-        ),
-    }
-
-    for key, content in content_map.items():
-        if key in url:
-            return content
+    content = get_document_store().get(url)
+    if content is not None:
+        return content
 
     return f"Content for {url}: (Simulated content) This page discusses emerging technology trends."
 
 
 @tool
+@memoized
 def keyword_extraction_tool(text: str) -> str:
     """
     Extracts SEO-relevant keywords from text.
@@ -172,7 +75,7 @@ def keyword_extraction_tool(text: str) -> str:
     }
 
     found = []
-    text_lower = text.lower()
+    text_lower = profile_text(text).lower
     for kw, _ in sorted(common_keywords.items(), key=lambda x: -x[1]):
         if kw.lower() in text_lower:
             found.append(kw)
@@ -181,17 +84,19 @@ def keyword_extraction_tool(text: str) -> str:
 
 
 @tool
+@memoized
 def word_count_tool(text: str) -> str:
     """
     Returns the word count of the given text.
     """
-    count = len(text.split())
+    count = profile_text(text).word_count
     print(f"  [Tool] Word count: {count}")
     return f"Word count: {count}"
 
 
 
 @tool
+@memoized
 def sentiment_analysis_tool(text: str) -> str:
     """
     Analyzes the sentiment of text. Returns a sentiment score from -1.0 (very negative)
@@ -215,7 +120,7 @@ def sentiment_analysis_tool(text: str) -> str:
         "expected", "projected", "continue", "remain",
     ]
 
-    text_lower = text.lower()
+    text_lower = profile_text(text).lower
     pos_count = sum(1 for w in positive_words if w in text_lower)
     neg_count = sum(1 for w in negative_words if w in text_lower)
     neu_count = sum(1 for w in neutral_words if w in text_lower)
@@ -235,6 +140,7 @@ def sentiment_analysis_tool(text: str) -> str:
 
 
 @tool
+@memoized
 def readability_score_tool(text: str) -> str:
     """
     Calculates a Flesch-Kincaid readability grade level for the given text.
@@ -243,27 +149,11 @@ def readability_score_tool(text: str) -> str:
     """
     print(f"  [Tool] Calculating readability ({len(text)} chars)")
 
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    num_sentences = max(len(sentences), 1)
-
-    words = text.split()
-    num_words = max(len(words), 1)
-
-    # Approximate syllable count: count vowel groups per word
-    def count_syllables(word: str) -> int:
-        word = word.lower().strip(".,!?;:'\"")
-        vowels = "aeiouy"
-        count = 0
-        prev_vowel = False
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not prev_vowel:
-                count += 1
-            prev_vowel = is_vowel
-        return max(count, 1)
-
-    num_syllables = sum(count_syllables(w) for w in words)
+    profile = profile_text(text)
+    num_sentences = max(len(profile.sentences), 1)
+    num_words = max(profile.word_count, 1)
+    # Approximate syllable count: vowel groups per word
+    num_syllables = profile.syllables
 
     # Flesch-Kincaid Grade Level formula
     grade = 0.39 * (num_words / num_sentences) + 11.8 * (num_syllables / num_words) - 15.59
@@ -292,42 +182,41 @@ def readability_score_tool(text: str) -> str:
 
 
 @tool
-def plagiarism_check_tool(draft: str, source_text: str) -> str:
+@memoized
+def plagiarism_check_tool(draft: str, source_text: str = "", sources: Optional[List[str]] = None) -> str:
     """
     Checks a draft for potential plagiarism by comparing it against source research text.
     Finds overlapping phrases (5+ words) between draft and source.
-    Returns a plagiarism score and list of matching phrases.
+    Pass the individual research documents as `sources` to see which ones the overlap comes
+    from; `source_text` is only used, as a single document, when `sources` is not given.
+    Returns a plagiarism score, the closest source passages and the matching phrases.
     """
-    print(f"  [Tool] Checking plagiarism (draft={len(draft)} chars, source={len(source_text)} chars)")
-
-    def get_ngrams(text: str, n: int = 5):
-        words = text.lower().split()
-        return set(" ".join(words[i:i+n]) for i in range(len(words) - n + 1))
-
-    draft_ngrams = get_ngrams(draft, 5)
-    source_ngrams = get_ngrams(source_text, 5)
-
-    overlaps = draft_ngrams & source_ngrams
-    total_draft = max(len(draft_ngrams), 1)
-    overlap_ratio = round(len(overlaps) / total_draft, 3)
-
-    if overlap_ratio > 0.3:
-        verdict = "HIGH — significant overlap detected"
-    elif overlap_ratio > 0.1:
-        verdict = "MODERATE — some overlap detected"
-    else:
-        verdict = "LOW — minimal overlap"
-
-    sample_matches = list(overlaps)[:5]
+    documents = sources or [source_text]
+    print(f"  [Tool] Checking plagiarism (draft={len(draft)} chars, "
+          f"sources={sum(len(d) for d in documents)} chars in {len(documents)} documents)")
+
+    report = get_source_index(documents).check(draft)
+
+    closest = ""
+    for candidate in report.candidates:
+        preview = " ".join(profile_text(documents[candidate.doc]).words[:8])
+        closest += (
+            f"\n  [{candidate.doc + 1}] similarity≈{candidate.similarity:.2f}, "
+            f"{candidate.shared} shared 5-grams — \"{preview}...\""
+        )
+        if candidate.spans:
+            closest += f"\n      longest match: {candidate.spans[0]}"
 
     return (
-        f"Plagiarism Score: {overlap_ratio} ({len(overlaps)}/{total_draft} matching 5-grams)\n"
-        f"Verdict: {verdict}\n"
-        f"Sample matches: {'; '.join(sample_matches) if sample_matches else 'None'}"
+        f"Plagiarism Score: {report.overlap_ratio} ({report.matching}/{max(report.total, 1)} matching 5-grams)\n"
+        f"Verdict: {report.verdict}\n"
+        f"Sample matches: {'; '.join(report.sample_matches) if report.sample_matches else 'None'}\n"
+        f"Closest sources:{closest if closest else ' None above similarity threshold'}"
     )
 
 
 @tool
+@memoized
 def citation_formatter_tool(text: str) -> str:
     """
     Finds raw URLs in the text and formats them as proper numbered markdown citations.
@@ -335,8 +224,7 @@ def citation_formatter_tool(text: str) -> str:
     """
     print(f"  [Tool] Formatting citations ({len(text)} chars)")
 
-    urls = re.findall(r'https?://\S+', text)
-    urls = list(dict.fromkeys(urls))  # deduplicate preserving order
+    urls = list(dict.fromkeys(profile_text(text).urls))  # deduplicate preserving order
 
     if not urls:
         return text + "\n\n_No URLs found to format as citations._"
@@ -362,6 +250,7 @@ def citation_formatter_tool(text: str) -> str:
 
 
 @tool
+@memoized
 def translation_quality_tool(original: str, translation: str) -> str:
     """
     Evaluates translation quality by comparing the structure and length of the
@@ -370,8 +259,8 @@ def translation_quality_tool(original: str, translation: str) -> str:
     """
     print(f"  [Tool] Checking translation quality (original={len(original)} chars, translation={len(translation)} chars)")
 
-    orig_sentences = [s.strip() for s in re.split(r'[.!?]+', original) if s.strip()]
-    trans_sentences = [s.strip() for s in re.split(r'[.!?]+', translation) if s.strip()]
+    orig_sentences = profile_text(original).sentences
+    trans_sentences = profile_text(translation).sentences
 
     # Length ratio check (translations are typically 1.0-1.3x length of original)
     len_ratio = len(translation) / max(len(original), 1)
@@ -399,6 +288,7 @@ def translation_quality_tool(original: str, translation: str) -> str:
 
 
 @tool
+@memoized
 def headline_generator_tool(topic: str) -> str:
     """
     Generates multiple alternative headline options for a given topic.
@@ -423,6 +313,7 @@ def headline_generator_tool(topic: str) -> str:
 
 
 @tool
+@memoized
 def statistics_extractor_tool(text: str) -> str:
     """
     Extracts numeric statistics, percentages, financial figures, and date references from text.
@@ -454,6 +345,7 @@ def statistics_extractor_tool(text: str) -> str:
 
 
 @tool
+@memoized
 def text_summarizer_tool(text: str) -> str:
     """
     Performs extractive summarization by scoring and selecting the most important sentences.
@@ -462,22 +354,14 @@ def text_summarizer_tool(text: str) -> str:
     """
     print(f"  [Tool] Summarizing text ({len(text)} chars)")
 
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+    profile = profile_text(text)
+    sentences = [s for s in profile.full_sentences if len(s) > 20]
 
     if len(sentences) <= 3:
         return "Text is already short enough. Summary: " + " ".join(sentences)
 
     # Simple TF-based scoring
-    all_words = text.lower().split()
-    word_freq = {}
-    stop_words = {"the", "a", "an", "is", "are", "was", "were", "in", "on", "at", "to",
-                  "for", "of", "and", "or", "but", "with", "by", "from", "that", "this",
-                  "it", "as", "be", "has", "have", "had", "not", "will", "can", "do"}
-    for w in all_words:
-        w_clean = w.strip(".,!?;:'\"()[]")
-        if w_clean and w_clean not in stop_words and len(w_clean) > 2:
-            word_freq[w_clean] = word_freq.get(w_clean, 0) + 1
+    word_freq = profile.content_terms()
 
     # Score each sentence
     scored = []
@@ -0,0 +1,213 @@
+"""
+Token and dollar accounting for every LLM call.
+
+`usage_tracker` is a LangChain callback handler attached to each chat model
+in the pipeline and the eval judges. It reads the token usage of every
+response and prices it from the price table. The counts go to the scope
+of whatever is running (see `usage_scope`): a graph node, or the judges of
+one eval suite. Each node adds its tally to the `llm_usage` state field,
+so `summarize` can total a run per node and per loop pass.
+
+A response served from the LLM response cache (`cache_hit` in its
+metadata) cost nothing, so its tokens are not counted; only the call is.
+
+Prices are USD per million tokens. LLM_PRICES overrides or extends the
+defaults, either as inline JSON or as the path of a JSON file:
+
+    LLM_PRICES='{"gpt-4o-mini": {"prompt": 0.15, "completion": 0.6}}'
+
+A model matches the longest table key it starts with, so dated snapshots
+such as gpt-4o-mini-2024-07-18 use their base model's price. Calls to a
+model with no entry are counted but cost 0.
+"""
+
+import os
+import json
+import threading
+import contextlib
+from contextvars import ContextVar
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# USD per 1M tokens
+DEFAULT_PRICES = {
+    "gpt-4o-mini": {"prompt": 0.15, "completion": 0.60},
+    "gpt-4o": {"prompt": 2.50, "completion": 10.00},
+    "gpt-4.1-nano": {"prompt": 0.10, "completion": 0.40},
+    "gpt-4.1-mini": {"prompt": 0.40, "completion": 1.60},
+    "gpt-4.1": {"prompt": 2.00, "completion": 8.00},
+}
+
+_FIELDS = ("calls", "cached_calls", "unpriced_calls", "prompt_tokens", "completion_tokens", "cost_usd")
+
+# Usage tally for whatever node or eval suite is currently running
+_scope: ContextVar[Optional[Counter]] = ContextVar("llm_usage_scope", default=None)
+
+
+@lru_cache(maxsize=None)
+def price_table() -> Dict[str, Dict[str, float]]:
+    """DEFAULT_PRICES updated with the LLM_PRICES env var (inline JSON or a JSON file path)."""
+    prices = {model: dict(p) for model, p in DEFAULT_PRICES.items()}
+    override = os.getenv("LLM_PRICES", "").strip()
+    if override:
+        if not override.startswith("{"):
+            with open(override, "r") as f:
+                override = f.read()
+        prices.update(json.loads(override))
+    return prices
+
+
+def price(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Dollar cost of one call, or None if the model is not in the price table."""
+    table = price_table()
+    matches = [key for key in table if model.startswith(key)]
+    if not matches:
+        return None
+    rates = table[max(matches, key=len)]
+    return (prompt_tokens * rates["prompt"] + completion_tokens * rates["completion"]) / 1_000_000
+
+
+class UsageTracker(BaseCallbackHandler):
+    """
+    Counts tokens and cost of every chat model response it sees.
+
+    Runs inline, in the caller's context, so calls made under `usage_scope`
+    (including in threads started with a copied context) land in that
+    scope's tally. Process-wide totals are kept as well.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = Counter()
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        model_name = (response.llm_output or {}).get("model_name", "")
+        for generations in response.generations:
+            for gen in generations:
+                message = getattr(gen, "message", None)
+                if message is not None:
+                    self._add(self._measure(message, model_name))
+
+    @staticmethod
+    def _measure(message, model_name: str) -> Counter:
+        metadata = message.response_metadata or {}
+        if metadata.get("cache_hit"):
+            return Counter(calls=1, cached_calls=1)
+        usage = message.usage_metadata or {}
+        prompt, completion = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        cost = price(metadata.get("model_name") or model_name, prompt, completion)
+        return Counter(
+            calls=1,
+            unpriced_calls=int(cost is None),
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+            cost_usd=cost or 0.0,
+        )
+
+    def _add(self, counts: Counter) -> None:
+        with self._lock:
+            self._totals.update(counts)
+            scope = _scope.get()
+            if scope is not None:
+                scope.update(counts)
+
+    def stats(self) -> Dict[str, float]:
+        """Process-wide totals over every tracked call, pipeline and judges alike."""
+        with self._lock:
+            return _entry(self._totals)
+
+
+usage_tracker = UsageTracker()
+
+
+@contextlib.contextmanager
+def usage_scope():
+    """
+    Tallies the LLM usage of calls made while the block runs.
+
+    Yields a Counter; `scope_entry` turns it into the entry a node adds to
+    the `llm_usage` state field.
+    """
+    tally = Counter()
+    token = _scope.set(tally)
+    try:
+        yield tally
+    finally:
+        _scope.reset(token)
+
+
+def _entry(counts: Counter) -> Dict[str, float]:
+    entry = {field: counts[field] for field in _FIELDS}
+    entry["cost_usd"] = float(entry["cost_usd"])
+    entry["total_tokens"] = entry["prompt_tokens"] + entry["completion_tokens"]
+    return entry
+
+
+def scope_entry(node: str, tally: Counter) -> Optional[dict]:
+    """`{node, calls, cached_calls, prompt_tokens, completion_tokens, ...}`, or None if no LLM was called."""
+    if not tally["calls"]:
+        return None
+    return {"node": node, **_entry(tally)}
+
+
+def summarize(entries: List[dict]) -> dict:
+    """
+    Totals over a run's `llm_usage` entries, plus per node.
+
+    Each node's `passes` lists its cost per run of that node, in order, so a
+    feedback loop shows up as one extra pass per revision of the nodes it
+    sent the draft back through.
+    """
+    totals = Counter()
+    nodes: Dict[str, Counter] = defaultdict(Counter)
+    passes: Dict[str, List[float]] = defaultdict(list)
+    for entry in entries:
+        counts = Counter({field: entry.get(field, 0) for field in _FIELDS})
+        totals.update(counts)
+        nodes[entry["node"]].update(counts)
+        passes[entry["node"]].append(round(entry.get("cost_usd", 0.0), 6))
+    summary = _entry(totals)
+    summary["nodes"] = {
+        node: {**_entry(counts), "passes": passes[node]} for node, counts in nodes.items()
+    }
+    return summary
+
+
+def annotate_trace(langfuse, trace_id: str, summary: dict) -> None:
+    """Adds a run's usage summary to its trace metadata, via a short `llm-usage` span on the trace."""
+    span = langfuse.start_span(
+        name="llm-usage",
+        trace_context={"trace_id": trace_id},
+        output=summary,
+    )
+    span.update_trace(metadata={
+        "llm_usage": {k: v for k, v in summary.items() if k != "nodes"},
+        "llm_usage_by_node": {
+            node: {"total_tokens": n["total_tokens"], "cost_usd": n["cost_usd"], "passes": n["passes"]}
+            for node, n in summary["nodes"].items()
+        },
+    })
+    span.end()
+
+
+def format_usage(summary: dict) -> str:
+    return (
+        f"{summary['total_tokens']} tokens ({summary['prompt_tokens']} prompt / "
+        f"{summary['completion_tokens']} completion), ${summary['cost_usd']:.4f} over {summary['calls']} calls"
+        + (f", {summary['cached_calls']} cached" if summary["cached_calls"] else "")
+        + (f", {summary['unpriced_calls']} unpriced" if summary["unpriced_calls"] else "")
+    )
+
+
+def format_nodes(summary: dict) -> str:
+    """One `node $cost (passes)` item per node, costliest first."""
+    nodes = sorted(summary["nodes"].items(), key=lambda kv: kv[1]["cost_usd"], reverse=True)
+    return ", ".join(
+        f"{node} ${n['cost_usd']:.4f}" + (f" ×{len(n['passes'])}" if len(n["passes"]) > 1 else "")
+        for node, n in nodes
+    )
@@ -0,0 +1,22 @@
+from src.metrics import loop_counts
+
+
+def test_quality_gate_loop_is_not_counted_as_compliance_loop():
+    log = [
+        "compliance_pass_1_passed",
+        "quality_gate_pass_1_failed",
+        "compliance_pass_1_passed",
+        "quality_gate_pass_2_passed",
+    ]
+    assert loop_counts(log) == {"fact_checker": 0, "compliance": 0, "quality_gate": 1}
+
+
+def test_each_gate_counts_its_own_revisions():
+    log = [
+        "fact_checker_pass_1_failed",
+        "fact_checker_pass_2_passed",
+        "compliance_pass_1_failed",
+        "compliance_pass_2_passed",
+        "quality_gate_pass_1_passed",
+    ]
+    assert loop_counts(log) == {"fact_checker": 1, "compliance": 1, "quality_gate": 0}
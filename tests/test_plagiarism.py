@@ -0,0 +1,51 @@
+import random
+
+from src.plagiarism import (
+    SourceIndex,
+    estimate_similarity,
+    minhash_signature,
+    shingle_hashes,
+)
+
+
+def _words(seed: int, vocab: str, count: int = 400) -> list:
+    rng = random.Random(seed)
+    pool = [f"{vocab}{i}" for i in range(300)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b)
+
+
+SOURCE = _words(1, "alpha")
+# Every 40th word replaced: each edit breaks 5 shingles, so Jaccard ≈ 0.78
+NEAR_DUPLICATE = [f"edit{i}" if i % 40 == 20 else w for i, w in enumerate(SOURCE)]
+DISJOINT = _words(2, "omega")
+
+
+def test_signature_estimates_jaccard():
+    source, near = shingle_hashes(SOURCE), shingle_hashes(NEAR_DUPLICATE)
+    true = _jaccard(set(source), set(near))
+    estimate = estimate_similarity(minhash_signature(source), minhash_signature(near))
+    assert 0.6 < true < 0.9
+    assert abs(estimate - true) < 0.2
+
+
+def test_near_duplicate_is_attributed_to_its_source():
+    index = SourceIndex([" ".join(DISJOINT), " ".join(SOURCE)])
+    report = index.check(" ".join(NEAR_DUPLICATE))
+
+    assert report.candidates, "near-duplicate passages should pass the LSH threshold"
+    assert {c.doc for c in report.candidates} == {1}
+    assert report.candidates[0].similarity > 0.5
+    assert report.verdict.startswith("HIGH")
+
+
+def test_disjoint_source_is_not_a_candidate():
+    index = SourceIndex([" ".join(SOURCE)])
+    report = index.check(" ".join(DISJOINT))
+
+    assert report.candidates == []
+    assert report.matching == 0
+    assert report.verdict.startswith("LOW")
@@ -0,0 +1,28 @@
+import threading
+
+from src.score_batcher import ScoreBatcher
+
+
+class FlakyClient:
+    def __init__(self):
+        self.scores = []
+
+    def create_score(self, **score):
+        self.scores.append(score)
+
+    def flush(self):
+        raise RuntimeError("flush failed")
+
+
+def test_failed_flush_does_not_stop_the_worker():
+    client = FlakyClient()
+    batcher = ScoreBatcher(client, batch_size=5, max_pending=10, interval_s=0.05)
+
+    # More scores than max_pending: add blocks unless the worker keeps draining
+    producer = threading.Thread(target=lambda: [batcher.add("t", f"s{i}", 1.0) for i in range(50)], daemon=True)
+    producer.start()
+    producer.join(timeout=5)
+
+    assert not producer.is_alive(), "add blocked after a failed flush"
+    assert batcher._thread.is_alive()
+    assert len(client.scores) >= 40